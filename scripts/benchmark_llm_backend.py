@@ -0,0 +1,85 @@
+#!/usr/bin/env python
+"""
+LLM Backend Load Test
+
+Runs concurrent agents against a local StubLLMServer through HTTPBackend,
+reporting request latency percentiles, throughput and connection reuse.
+No network access or API key is needed.
+
+Usage:
+    python scripts/benchmark_llm_backend.py
+    python scripts/benchmark_llm_backend.py --agents 200 --requests 5 --connections 16
+"""
+
+import argparse
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from mindchain import Agent, AgentConfig
+from mindchain.llm import HTTPBackend, LatencyModel, StubLLMServer
+
+
+async def run_agent(agent, requests, latencies):
+    """Send sequential requests from one agent, recording latency in ms."""
+    for i in range(requests):
+        start = time.perf_counter()
+        await agent.run(f"Task {i} for {agent.name}")
+        latencies.append((time.perf_counter() - start) * 1000)
+
+
+async def run(args):
+    latency = LatencyModel(
+        first_token_median=args.first_token,
+        tokens_per_second=args.tokens_per_second,
+        completion_tokens_median=args.completion_tokens,
+    )
+    async with StubLLMServer(latency, seed=args.seed) as server:
+        backend = HTTPBackend(
+            server.url,
+            max_connections=args.connections,
+            max_concurrency=args.concurrency,
+        )
+        agents = [
+            Agent(AgentConfig(name=f"Agent{i}", model_name="stub-model"), backend=backend)
+            for i in range(args.agents)
+        ]
+        latencies = []
+        start = time.perf_counter()
+        await asyncio.gather(*(run_agent(agent, args.requests, latencies) for agent in agents))
+        elapsed = time.perf_counter() - start
+        await backend.aclose()
+
+    stats = backend.get_stats()
+    latencies = np.array(latencies)
+    print(f"{args.agents} agents x {args.requests} requests, {args.connections} connections\n")
+    print(f"throughput   {len(latencies) / elapsed:>10.1f} req/s")
+    for pct in (50, 90, 99):
+        print(f"p{pct:<11} {np.percentile(latencies, pct):>10.1f} ms")
+    print(f"opened       {stats['connections_opened']:>10}")
+    print(f"reused       {stats['connections_reused']:>10}")
+    print(f"retries      {stats['retries']:>10}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load-test agents against a stub LLM server")
+    parser.add_argument("--agents", type=int, default=50, help="Concurrent agents")
+    parser.add_argument("--requests", type=int, default=4, help="Requests per agent")
+    parser.add_argument("--connections", type=int, default=8, help="Pooled connections per host")
+    parser.add_argument("--concurrency", type=int, default=64, help="Maximum in-flight requests")
+    parser.add_argument("--first-token", type=float, default=0.05, help="Median seconds to first token")
+    parser.add_argument("--tokens-per-second", type=float, default=500.0, help="Median decode rate")
+    parser.add_argument("--completion-tokens", type=int, default=32, help="Median completion length")
+    parser.add_argument("--seed", type=int, default=7, help="Random seed")
+    args = parser.parse_args()
+    asyncio.run(run(args))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,118 @@
+#!/usr/bin/env python
+"""
+Memory Quantization Benchmark
+
+Compares float32, float16 and int8 embedding storage for memory indexes,
+reporting recall@k against exact float32 search, embedding memory and
+query latency on a synthetic corpus.
+
+Two re-ranking variants are measured: "int8+exact" rescores the shortlist
+from a memory-mapped float32 file, "int8+re-embed" re-embeds the shortlist
+texts on every query. The local hash embedder makes re-embedding look
+cheap here; with a model embedder it adds a model call to every search.
+
+Usage:
+    python scripts/benchmark_memory_quantization.py
+    python scripts/benchmark_memory_quantization.py --items 100000 --k 5
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from mindchain.memory import HashEmbeddingProvider, QuantizedVectorIndex, VectorIndex
+
+
+def build_corpus(items, vocabulary, words_per_item, seed):
+    """Generate Zipf-distributed synthetic documents."""
+    rng = np.random.default_rng(seed)
+    ranks = np.minimum(rng.zipf(1.3, size=(items, words_per_item)), vocabulary) - 1
+    return [" ".join(f"w{rank}" for rank in row) for row in ranks]
+
+
+def build_queries(corpus, queries, words_per_query, seed):
+    """Sample queries as word subsets of random documents."""
+    rng = np.random.default_rng(seed + 1)
+    sampled = []
+    for position in rng.integers(0, len(corpus), size=queries):
+        words = corpus[position].split()
+        picked = rng.choice(len(words), size=min(words_per_query, len(words)), replace=False)
+        sampled.append(" ".join(words[i] for i in picked))
+    return sampled
+
+
+def run_queries(index, queries, k):
+    """Run the queries, returning result id sets and latencies in ms."""
+    results, latencies = [], []
+    for query in queries:
+        start = time.perf_counter()
+        hits = index.search(query, k)
+        latencies.append((time.perf_counter() - start) * 1000)
+        results.append({item_id for item_id, _ in hits})
+    return results, np.array(latencies)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark quantized memory indexes")
+    parser.add_argument("--items", type=int, default=50000, help="Number of stored items")
+    parser.add_argument("--queries", type=int, default=200, help="Number of queries")
+    parser.add_argument("--k", type=int, default=5, help="Results per query")
+    parser.add_argument("--dimension", type=int, default=128, help="Embedding dimension")
+    parser.add_argument("--rerank", type=int, default=50, help="Candidates re-ranked exactly (re-embedded per query without an exact file)")
+    parser.add_argument("--seed", type=int, default=7, help="Random seed")
+    args = parser.parse_args()
+
+    corpus = build_corpus(args.items, vocabulary=20000, words_per_item=24, seed=args.seed)
+    queries = build_queries(corpus, args.queries, words_per_query=4, seed=args.seed)
+    embedder = HashEmbeddingProvider(dimension=args.dimension)
+    ids = list(range(args.items))
+    vectors = embedder.embed(corpus)
+
+    exact = VectorIndex(embedder, initial_capacity=args.items)
+    exact.add_vectors(ids, vectors)
+    truth, _ = run_queries(exact, queries, args.k)
+
+    exact_file = tempfile.NamedTemporaryFile(suffix=".f32", delete=False)
+    exact_file.close()
+    variants = [
+        ("float32", exact),
+        ("float16", QuantizedVectorIndex(embedder, storage="float16", initial_capacity=args.items)),
+        ("int8", QuantizedVectorIndex(embedder, storage="int8", initial_capacity=args.items)),
+        ("int8+exact", QuantizedVectorIndex(
+            embedder, storage="int8", rerank=args.rerank,
+            exact_path=exact_file.name, initial_capacity=args.items,
+        )),
+        ("int8+re-embed", QuantizedVectorIndex(
+            embedder, storage="int8", rerank=args.rerank,
+            text_lookup=corpus.__getitem__, initial_capacity=args.items,
+        )),
+    ]
+
+    print(f"{args.items} items, dimension {args.dimension}, {args.queries} queries, k={args.k}\n")
+    print(f"{'storage':<14} {'MB':>8} {'bytes/vec':>10} {'recall@k':>9} {'p50 ms':>8} {'p99 ms':>8}")
+    for name, index in variants:
+        if index is not exact:
+            index.add_vectors(ids, vectors)
+        nbytes = getattr(index, "nbytes", index.vectors.nbytes)
+        results, latencies = run_queries(index, queries, args.k)
+        recall = np.mean([
+            len(found & expected) / len(expected) if expected else 1.0
+            for found, expected in zip(results, truth)
+        ])
+        print(
+            f"{name:<14} {nbytes / 2**20:>8.1f} {nbytes / args.items:>10.0f} {recall:>9.3f} "
+            f"{np.percentile(latencies, 50):>8.2f} {np.percentile(latencies, 99):>8.2f}"
+        )
+    os.unlink(exact_file.name)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
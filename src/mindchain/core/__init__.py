@@ -4,15 +4,27 @@ Core module for MindChain
 This module provides the core components of the MindChain framework.
 """
 
-from .agent import Agent, AgentConfig, AgentStatus
+from .agent import Agent, AgentConfig, AgentStatus, BatchResult
+from .coalescing import SingleFlight
+from .context import ApproximateTokenizer, ContextPacker, PackedContext, Tokenizer
+from .response_cache import ResponseCache
+from .session import SessionTable
 from .errors import (MindChainError, MCPError, AgentError, MemoryError,
                    ToolError, ExecutionError, ResourceExhaustedError,
-                   PlanningError, OrchestrationError)
+                   PlanningError, OrchestrationError, BackendError)
 
 __all__ = [
     'Agent', 
     'AgentConfig',
     'AgentStatus',
+    'BatchResult',
+    'ResponseCache',
+    'SingleFlight',
+    'SessionTable',
+    'ContextPacker',
+    'PackedContext',
+    'Tokenizer',
+    'ApproximateTokenizer',
     'MindChainError',
     'MCPError',
     'AgentError',
@@ -21,5 +33,6 @@ __all__ = [
     'ExecutionError',
     'ResourceExhaustedError',
     'PlanningError',
-    'OrchestrationError'
+    'OrchestrationError',
+    'BackendError'
 ]
\ No newline at end of file
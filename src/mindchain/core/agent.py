@@ -1,14 +1,23 @@
 """
 Agent base class implementation
 """
+import asyncio
+import time
 import uuid
 import logging
-from typing import Dict, List, Any, Optional, Callable, Union
+from typing import AsyncGenerator, AsyncIterator, Dict, Iterable, List, Any, Optional, Callable, Tuple, Union
 from dataclasses import dataclass, field
 from enum import Enum
 
+from .coalescing import SingleFlight
+from .context import ContextPacker
 from .errors import AgentError
+from .response_cache import ResponseCache
+from .session import Session, SessionTable
+from ..llm.base import LLMBackend, LLMRequest, LLMResponse
 from ..memory.memory_manager import MemoryManager
+from ..memory.snapshot import read_snapshot_meta
+from ..memory.text import item_text
 
 logger = logging.getLogger(__name__)
 
@@ -30,29 +39,77 @@ class AgentConfig:
     model_name: str = "gpt-4"
     temperature: float = 0.7
     max_tokens: int = 1000
+    # Model context size in tokens; when set, prompts are packed to fit it
+    context_window: Optional[int] = None
     tools: List[str] = field(default_factory=list)
     system_prompt: str = "You are a helpful AI assistant."
     metadata: Dict[str, Any] = field(default_factory=dict)
 
 
+@dataclass
+class BatchResult:
+    """Outcome of one input of a batch run"""
+    index: int
+    input: str
+    response: Optional[str] = None
+    error: Optional[Exception] = None
+    latency: float = 0.0
+    
+    @property
+    def ok(self) -> bool:
+        """Whether the input was processed without error"""
+        return self.error is None
+
+
 class Agent:
     """
     Base Agent class that encapsulates LLM-powered agent capabilities
     """
     
-    def __init__(self, config: AgentConfig, memory_manager: Optional[MemoryManager] = None):
+    def __init__(
+        self,
+        config: AgentConfig,
+        memory_manager: Optional[MemoryManager] = None,
+        backend: Optional[LLMBackend] = None,
+        response_cache: Optional[ResponseCache] = None,
+        coalescer: Optional[SingleFlight] = None,
+        sessions: Optional[SessionTable] = None,
+        context_packer: Optional[ContextPacker] = None,
+    ):
         """
         Initialize the agent with the given configuration
         
         Args:
             config: Agent configuration parameters
-            memory_manager: Optional memory manager for the agent
+            memory_manager: Optional memory manager for the agent, or a
+                MemoryView of a SharedMemoryPool shared with other agents
+            backend: LLM backend generating responses (HTTPBackend for a
+                real endpoint, SimulatedBackend for load tests). Without
+                one the agent answers with a placeholder.
+            response_cache: Optional cache answering repeated requests
+                without calling the backend
+            coalescer: Optional SingleFlight merging identical concurrent
+                requests into one backend call; share one between agents
+                with the same configuration
+            sessions: Session table used by run(..., session_id=...)
+                (defaults to a SessionTable())
+            context_packer: Packer fitting prompts into config.context_window
+                minus config.max_tokens (defaults to a ContextPacker() when
+                context_window is set; without a window, the last 6
+                history messages and all context are sent)
         """
         self.id = str(uuid.uuid4())
         self.config = config
         self.name = config.name
         self.status = AgentStatus.INITIALIZING
         self.memory = memory_manager or MemoryManager()
+        self.backend = backend
+        self.response_cache = response_cache
+        self.coalescer = coalescer
+        self.sessions = sessions if sessions is not None else SessionTable()
+        if context_packer is None and config.context_window is not None:
+            context_packer = ContextPacker()
+        self.context_packer = context_packer
         self.tools: Dict[str, Callable] = {}  # Will be populated by tool registry
         self.current_task: Optional[str] = None
         self._last_response: Optional[str] = None
@@ -61,8 +118,18 @@ class Agent:
         logger.info(f"Agent {self.name} ({self.id}) initialized")
         self.status = AgentStatus.IDLE
         
-    def reset(self) -> None:
-        """Reset the agent's state"""
+    def reset(self, session_id: Optional[str] = None) -> None:
+        """
+        Reset the agent's state
+        
+        Args:
+            session_id: Only drop this session's state, leaving the agent
+                and its memory untouched
+        """
+        if session_id is not None:
+            self.sessions.close(session_id)
+            logger.info(f"Session {session_id} of agent {self.id} has been reset")
+            return
         self._history = []
         self._last_response = None
         self.current_task = None
@@ -97,21 +164,25 @@ class Agent:
             return True
         return False
     
-    async def run(self, user_input: str) -> str:
+    async def run(self, user_input: str, session_id: Optional[str] = None) -> str:
         """
         Run the agent on a given user input
         
         Args:
             user_input: The user's input to process
+            session_id: Run in this session, with its own history and
+                error state, instead of the agent's single conversation.
+                Turns of one session run in order; different sessions run
+                concurrently.
             
         Returns:
             response: The agent's response
         """
-        if self.status == AgentStatus.ERROR:
-            raise AgentError(f"Agent {self.id} is in an error state and cannot process requests")
+        if session_id is not None:
+            async with self.sessions.turn(session_id) as session:
+                return await self._run_turn(user_input, session)
         
-        if self.status == AgentStatus.TERMINATED:
-            raise AgentError(f"Agent {self.id} has been terminated")
+        self._check_runnable()
         
         try:
             self.status = AgentStatus.ACTIVE
@@ -126,17 +197,8 @@ class Agent:
             # Process input and generate response
             response = await self._generate_response(user_input, context)
             
-            # Store the interaction in memory
-            await self.memory.store({
-                "input": user_input,
-                "response": response,
-                "timestamp": self._get_current_timestamp()
-            })
-            
-            # Update status and return response
-            self._last_response = response
-            self._history.append({"role": "assistant", "content": response})
-            self.status = AgentStatus.IDLE
+            # Store the interaction and return the response
+            await self._record_response(user_input, response)
             return response
             
         except Exception as e:
@@ -144,47 +206,479 @@ class Agent:
             logger.error(f"Error in agent {self.id}: {str(e)}")
             raise AgentError(f"Agent execution error: {str(e)}") from e
     
-    async def _generate_response(self, user_input: str, context: List[Dict[str, Any]]) -> str:
+    async def run_stream(self, user_input: str, session_id: Optional[str] = None) -> AsyncIterator[str]:
+        """
+        Run the agent on a given user input, yielding the response as it is generated
+        
+        The interaction is recorded in history and memory once, when the
+        stream ends. If the caller stops early, close the generator with
+        aclose() and the part already delivered is recorded instead.
+        
+        Args:
+            user_input: The user's input to process
+            session_id: Run in this session instead of the agent's single
+                conversation (see run())
+            
+        Returns:
+            chunks: Async iterator of response chunks
+        """
+        if session_id is not None:
+            async with self.sessions.turn(session_id) as session:
+                stream = self._stream_turn(user_input, session)
+                try:
+                    async for chunk in stream:
+                        yield chunk
+                finally:
+                    await stream.aclose()
+            return
+        
+        self._check_runnable()
+        
+        chunks: List[str] = []
+        stream: Optional[AsyncGenerator[str, None]] = None
+        try:
+            self.status = AgentStatus.ACTIVE
+            self.current_task = user_input
+            self._history.append({"role": "user", "content": user_input})
+            context = await self.memory.retrieve_relevant(user_input)
+            
+            stream = self._stream_response(user_input, context)
+            async for chunk in stream:
+                chunks.append(chunk)
+                yield chunk
+        except GeneratorExit:
+            # The caller stopped reading; keep what it received
+            logger.debug(f"Agent {self.id} stream closed after {len(chunks)} chunks")
+        except Exception as e:
+            self.status = AgentStatus.ERROR
+            logger.error(f"Error in agent {self.id}: {str(e)}")
+            raise AgentError(f"Agent execution error: {str(e)}") from e
+        finally:
+            if stream is not None:
+                await stream.aclose()
+        
+        try:
+            await self._record_response(user_input, "".join(chunks))
+        except Exception as e:
+            self.status = AgentStatus.ERROR
+            logger.error(f"Error in agent {self.id}: {str(e)}")
+            raise AgentError(f"Agent execution error: {str(e)}") from e
+    
+    async def run_batch(
+        self,
+        inputs: Iterable[str],
+        concurrency: int = 8,
+        store_batch_size: int = 64,
+    ) -> List[BatchResult]:
+        """
+        Run the agent on many independent inputs
+        
+        Args:
+            inputs: The inputs to process
+            concurrency: Maximum inputs in progress at once
+            store_batch_size: Interactions written to memory per store_batch call
+            
+        Returns:
+            results: One BatchResult per input, in input order
+        """
+        results = [result async for result in self.iter_batch(inputs, concurrency, store_batch_size)]
+        results.sort(key=lambda result: result.index)
+        return results
+    
+    async def iter_batch(
+        self,
+        inputs: Iterable[str],
+        concurrency: int = 8,
+        store_batch_size: int = 64,
+    ) -> AsyncIterator[BatchResult]:
+        """
+        Run the agent on many independent inputs, yielding results as they complete
+        
+        Workers pull inputs lazily, so inputs may be a generator over a
+        large dataset. Each input goes through memory retrieval and
+        generation on its own, without the conversation history, and
+        neither history nor the last response are updated. Finished
+        interactions are written to memory in groups of store_batch_size
+        and their results are yielded once stored. An error in one input
+        is captured in its result instead of stopping the batch.
+        
+        Args:
+            inputs: The inputs to process
+            concurrency: Maximum inputs in progress at once
+            store_batch_size: Interactions written to memory per store_batch call
+            
+        Returns:
+            results: Async iterator of BatchResult, in completion order
+        """
+        self._check_runnable()
+        
+        pending_inputs = enumerate(inputs)
+        # Bounded, so a slow consumer holds the workers back
+        finished: "asyncio.Queue[Optional[List[BatchResult]]]" = asyncio.Queue(max(1, concurrency))
+        unstored: List[Tuple[BatchResult, Dict[str, Any]]] = []
+        
+        async def store(group: List[Tuple[BatchResult, Dict[str, Any]]]) -> None:
+            if group:
+                try:
+                    await self.memory.store_batch([record for _, record in group])
+                except Exception as e:
+                    logger.error(f"Agent {self.id} failed to store {len(group)} batch results: {str(e)}")
+                    for result, _ in group:
+                        result.error = e
+            await finished.put([result for result, _ in group])
+        
+        async def worker() -> None:
+            nonlocal unstored
+            for index, user_input in pending_inputs:
+                started = time.perf_counter()
+                result = BatchResult(index=index, input=user_input)
+                try:
+                    context = await self.memory.retrieve_relevant(user_input)
+                    result.response = await self._generate_response(
+                        user_input, context, history=[{"role": "user", "content": user_input}]
+                    )
+                except Exception as e:
+                    logger.warning(f"Agent {self.id} failed on batch input {index}: {str(e)}")
+                    result.error = e
+                result.latency = time.perf_counter() - started
+                if result.error is not None:
+                    await finished.put([result])
+                    continue
+                unstored.append((result, {
+                    "input": user_input,
+                    "response": result.response,
+                    "timestamp": self._get_current_timestamp()
+                }))
+                if len(unstored) >= store_batch_size:
+                    group, unstored = unstored, []
+                    await store(group)
+        
+        async def run_workers() -> None:
+            nonlocal unstored
+            try:
+                await asyncio.gather(*(worker() for _ in range(max(1, concurrency))))
+                group, unstored = unstored, []
+                await store(group)
+            finally:
+                await finished.put(None)
+        
+        self.status = AgentStatus.ACTIVE
+        runner = asyncio.ensure_future(run_workers())
+        try:
+            while True:
+                group = await finished.get()
+                if group is None:
+                    break
+                for result in group:
+                    yield result
+            # Surface unexpected failures of the workers themselves
+            await runner
+        finally:
+            if not runner.done():
+                runner.cancel()
+                await asyncio.gather(runner, return_exceptions=True)
+            self.status = AgentStatus.IDLE
+    
+    async def _run_turn(self, user_input: str, session: Session) -> str:
+        """
+        Run one turn of a session
+        
+        Args:
+            user_input: The user's input to process
+            session: The session, held by the caller
+            
+        Returns:
+            response: The agent's response
+        """
+        self._check_session(session)
+        session.current_task = user_input
+        session.history.append({"role": "user", "content": user_input})
+        try:
+            context = await self._retrieve_context(user_input, session.session_id)
+            response = await self._generate_response(user_input, context, history=list(session.history))
+            await self._record_turn(session, user_input, response)
+            return response
+        except Exception as e:
+            session.failed = True
+            logger.error(f"Error in agent {self.id} session {session.session_id}: {str(e)}")
+            raise AgentError(f"Agent execution error: {str(e)}") from e
+    
+    async def _stream_turn(self, user_input: str, session: Session) -> AsyncGenerator[str, None]:
+        """
+        Run one turn of a session, yielding the response as it is generated
+        
+        Args:
+            user_input: The user's input to process
+            session: The session, held by the caller
+            
+        Returns:
+            chunks: Async iterator of response chunks
+        """
+        self._check_session(session)
+        chunks: List[str] = []
+        stream: Optional[AsyncGenerator[str, None]] = None
+        try:
+            session.current_task = user_input
+            session.history.append({"role": "user", "content": user_input})
+            context = await self._retrieve_context(user_input, session.session_id)
+            
+            stream = self._stream_response(user_input, context, history=list(session.history))
+            async for chunk in stream:
+                chunks.append(chunk)
+                yield chunk
+        except GeneratorExit:
+            logger.debug(f"Session {session.session_id} stream closed after {len(chunks)} chunks")
+        except Exception as e:
+            session.failed = True
+            logger.error(f"Error in agent {self.id} session {session.session_id}: {str(e)}")
+            raise AgentError(f"Agent execution error: {str(e)}") from e
+        finally:
+            if stream is not None:
+                await stream.aclose()
+        
+        try:
+            await self._record_turn(session, user_input, "".join(chunks))
+        except Exception as e:
+            session.failed = True
+            logger.error(f"Error in agent {self.id} session {session.session_id}: {str(e)}")
+            raise AgentError(f"Agent execution error: {str(e)}") from e
+    
+    def _check_session(self, session: Session) -> None:
+        """Raise AgentError if the agent or the session cannot accept requests"""
+        self._check_runnable()
+        if session.failed:
+            raise AgentError(
+                f"Session {session.session_id} of agent {self.id} is in an error state; reset it first"
+            )
+    
+    async def _retrieve_context(self, user_input: str, session_id: str) -> List[Dict[str, Any]]:
+        """
+        Retrieve memory context for a session turn
+        
+        Only items stored by the session itself are returned. When the
+        memory indexes "session_id" in its MetadataIndex, only those items
+        are searched; otherwise more results are fetched and the other
+        sessions' items are filtered out, which may return fewer items.
+        
+        Args:
+            user_input: The user's input
+            session_id: Id of the session
+            
+        Returns:
+            context: Relevant memory items
+        """
+        metadata_index = getattr(self.memory, "metadata_index", None)
+        if metadata_index is not None and "session_id" in metadata_index.fields:
+            return await self.memory.retrieve_relevant(user_input, where={"session_id": session_id})
+        k = self.memory.top_k
+        # Memory is shared by every session; never pass one user's turns to another
+        items = await self.memory.retrieve_relevant(user_input, k=k * 4)
+        return [item for item in items if isinstance(item, dict) and item.get("session_id") == session_id][:k]
+    
+    async def _record_turn(self, session: Session, user_input: str, response: str) -> None:
+        """Store a finished session turn in memory and the session's history"""
+        await self.memory.store({
+            "input": user_input,
+            "response": response,
+            "timestamp": self._get_current_timestamp(),
+            "session_id": session.session_id,
+        })
+        session.history.append({"role": "assistant", "content": response})
+        session.last_response = response
+        session.current_task = None
+        session.turns += 1
+    
+    def _check_runnable(self) -> None:
+        """Raise AgentError if the agent cannot accept requests"""
+        if self.status == AgentStatus.ERROR:
+            raise AgentError(f"Agent {self.id} is in an error state and cannot process requests")
+        
+        if self.status == AgentStatus.TERMINATED:
+            raise AgentError(f"Agent {self.id} has been terminated")
+    
+    async def _record_response(self, user_input: str, response: str) -> None:
+        """
+        Store a finished interaction in memory and history
+        
+        Args:
+            user_input: The user's input
+            response: The agent's response
+        """
+        await self.memory.store({
+            "input": user_input,
+            "response": response,
+            "timestamp": self._get_current_timestamp()
+        })
+        
+        self._last_response = response
+        self._history.append({"role": "assistant", "content": response})
+        self.status = AgentStatus.IDLE
+    
+    def _build_request(
+        self,
+        context: List[Dict[str, Any]],
+        history: Optional[List[Dict[str, str]]] = None,
+    ) -> LLMRequest:
+        """
+        Build the backend request for the current conversation
+        
+        Args:
+            context: Context information from memory
+            history: Conversation candidates, oldest first (defaults to the
+                agent's history: all of it when packing into a context
+                window, otherwise the last 6 messages)
+            
+        Returns:
+            request: Chat request with the system prompt, context and recent history
+        """
+        if self.context_packer is not None and self.config.context_window is not None:
+            # Fit everything into the window, keeping room for the completion
+            packed = self.context_packer.pack(
+                self.config.system_prompt,
+                [item_text(item) for item in context if isinstance(item, dict)],
+                self._history if history is None else history,
+                self.config.context_window - self.config.max_tokens,
+            )
+            logger.debug(
+                f"Agent {self.id} packed {packed.prompt_tokens} prompt tokens, dropping "
+                f"{packed.dropped_history} history messages and {packed.dropped_context} context items"
+            )
+            messages = packed.messages
+        else:
+            messages = [
+                {"role": "system", "content": self.config.system_prompt}
+            ]
+            
+            # Add context if available
+            if (context):
+                context_str = "\n\n".join([item_text(item) for item in context if isinstance(item, dict)])
+                messages.append({"role": "system", "content": f"Relevant context: {context_str}"})
+            
+            # Add conversation history (limited to last few exchanges)
+            if history is None:
+                history = self._history[-6:]  # Last 3 exchanges (6 messages)
+            messages.extend(history)
+        
+        return LLMRequest(
+            model=self.config.model_name,
+            messages=messages,
+            temperature=self.config.temperature,
+            max_tokens=self.config.max_tokens,
+            metadata={"agent_id": self.id},
+        )
+    
+    async def _generate_response(
+        self,
+        user_input: str,
+        context: List[Dict[str, Any]],
+        history: Optional[List[Dict[str, str]]] = None,
+    ) -> str:
         """
         Generate a response based on user input and context
         
         Args:
             user_input: The user's input
             context: Context information from memory
+            history: Conversation messages to send (defaults to the
+                agent's recent history)
             
         Returns:
             response: The generated response
         """
-        # This is a placeholder - in a real implementation, this would call the LLM
-        # with proper prompt construction including system prompt, context, and history
+        if self.backend is not None:
+            request = self._build_request(context, history)
+            cache_key = self._cache_key(request)
+            if cache_key is not None:
+                cached = self.response_cache.get(cache_key)
+                if cached is not None:
+                    logger.debug(f"Agent {self.id} answered from the response cache")
+                    return cached
+            if self.coalescer is not None:
+                # Identical requests in flight share one backend call
+                response = await self.coalescer.do(
+                    request.fingerprint(), lambda: self._call_backend(request, cache_key)
+                )
+            else:
+                response = await self._call_backend(request, cache_key)
+            return response.content
         
-        # Example implementation:
-        messages = [
-            {"role": "system", "content": self.config.system_prompt}
-        ]
+        # Without a backend, return a placeholder response
+        return self._placeholder_response(user_input)
+    
+    async def _call_backend(self, request: LLMRequest, cache_key: Optional[str]) -> LLMResponse:
+        """
+        Generate a completion with the backend and cache it
         
-        # Add context if available
-        if (context):
-            context_str = "\n\n".join([item.get("content", "") for item in context if isinstance(item, dict)])
-            messages.append({"role": "system", "content": f"Relevant context: {context_str}"})
+        Args:
+            request: The chat request
+            cache_key: Response cache key, or None if not cacheable
+            
+        Returns:
+            response: The completion
+        """
+        response = await self.backend.generate(request)
+        logger.debug(
+            f"Agent {self.id} got {response.completion_tokens} tokens in {response.latency:.3f}s"
+        )
+        if cache_key is not None:
+            self.response_cache.put(cache_key, response.content)
+        return response
+    
+    async def _stream_response(
+        self,
+        user_input: str,
+        context: List[Dict[str, Any]],
+        history: Optional[List[Dict[str, str]]] = None,
+    ) -> AsyncGenerator[str, None]:
+        """
+        Generate a response chunk by chunk based on user input and context
         
-        # Add conversation history (limited to last few exchanges)
-        messages.extend(self._history[-6:])  # Add last 3 exchanges (6 messages)
+        Args:
+            user_input: The user's input
+            context: Context information from memory
+            history: Conversation messages to send (defaults to the
+                agent's recent history)
+            
+        Returns:
+            chunks: Async iterator of response chunks
+        """
+        if self.backend is None:
+            yield self._placeholder_response(user_input)
+            return
         
-        # In a real implementation, this would call the LLM API
-        # response = await call_llm_api(
-        #     model=self.config.model_name, 
-        #     messages=messages,
-        #     temperature=self.config.temperature,
-        #     max_tokens=self.config.max_tokens
-        # )
+        request = self._build_request(context, history)
+        cache_key = self._cache_key(request)
+        if cache_key is not None:
+            cached = self.response_cache.get(cache_key)
+            if cached is not None:
+                logger.debug(f"Agent {self.id} answered from the response cache")
+                yield cached
+                return
         
-        # For now, just return a placeholder response
+        chunks: List[str] = []
+        stream = self.backend.stream(request)
+        try:
+            async for chunk in stream:
+                chunks.append(chunk)
+                yield chunk
+        finally:
+            await stream.aclose()
+        # Only reached when the stream ran to completion
+        if cache_key is not None:
+            self.response_cache.put(cache_key, "".join(chunks))
+    
+    def _cache_key(self, request: LLMRequest) -> Optional[str]:
+        """Response cache key of a request, or None if it must not be cached"""
+        if self.response_cache is None or not self.response_cache.cacheable(request):
+            return None
+        return request.fingerprint()
+    
+    def _placeholder_response(self, user_input: str) -> str:
+        """Response used when the agent has no backend"""
         return f"Agent {self.name} processed: {user_input[:30]}...\nThis is a simulated response for demonstration purposes."
     
     def _get_current_timestamp(self: "Agent") -> int:
         """Get the current timestamp in seconds"""
-        import time
         return int(time.time())
     
     async def execute_tool(self, tool_name: str, **kwargs) -> Any:
@@ -215,6 +709,79 @@ class Agent:
             logger.error(f"Error executing tool '{tool_name}': {str(e)}")
             raise AgentError(f"Tool execution error: {str(e)}") from e
     
+    def snapshot(self, path: str) -> None:
+        """
+        Write the agent's memory, conversation history and sessions to a
+        snapshot file
+        
+        Args:
+            path: Destination file
+        """
+        if not isinstance(self.memory, MemoryManager):
+            raise AgentError(f"Memory of agent {self.id} does not support snapshots")
+        self.memory.snapshot(path, metadata={
+            "agent": {
+                "id": self.id,
+                "history": self._history,
+                "last_response": self._last_response,
+                "session_table": {
+                    "history_limit": self.sessions.history_limit,
+                    "max_sessions": self.sessions.max_sessions,
+                    "idle_ttl": self.sessions.idle_ttl,
+                },
+                "sessions": self.sessions.export_state(),
+            }
+        })
+        logger.info(f"Agent {self.name} ({self.id}) snapshot written to {path}")
+    
+    @classmethod
+    def restore(
+        cls,
+        config: AgentConfig,
+        path: str,
+        backend: Optional[LLMBackend] = None,
+        response_cache: Optional[ResponseCache] = None,
+        coalescer: Optional[SingleFlight] = None,
+        sessions: Optional[SessionTable] = None,
+        context_packer: Optional[ContextPacker] = None,
+        **memory_options: Any,
+    ) -> "Agent":
+        """
+        Create an agent from a snapshot file
+        
+        Args:
+            config: Agent configuration parameters
+            path: Snapshot file written by snapshot()
+            backend: Optional LLM backend for the restored agent
+            response_cache: Optional response cache for the restored agent
+            coalescer: Optional request coalescer for the restored agent
+            sessions: Table receiving the snapshot's sessions (defaults to
+                a SessionTable configured like the snapshotted one)
+            context_packer: Optional context packer for the restored agent
+            **memory_options: MemoryManager arguments (index, capacity, ...)
+            
+        Returns:
+            agent: The restored agent with its memory, history and sessions
+        """
+        state = read_snapshot_meta(path).get("metadata", {}).get("agent", {})
+        if sessions is None:
+            sessions = SessionTable(**state.get("session_table", {}))
+        sessions.load_state(state.get("sessions", []))
+        agent = cls(
+            config,
+            memory_manager=MemoryManager.restore(path, **memory_options),
+            backend=backend,
+            response_cache=response_cache,
+            coalescer=coalescer,
+            sessions=sessions,
+            context_packer=context_packer,
+        )
+        agent.id = state.get("id", agent.id)
+        agent._history = state.get("history", [])
+        agent._last_response = state.get("last_response")
+        logger.info(f"Agent {agent.name} ({agent.id}) restored from {path}")
+        return agent
+    
     def get_status(self) -> Dict[str, Any]:
         """
         Get the current status of the agent
@@ -227,5 +794,40 @@ class Agent:
             "name": self.name,
             "status": self.status.value,
             "tools_count": len(self.tools),
-            "history_length": len(self._history)
+            "history_length": len(self._history),
+            "response_cache": (
+                self.response_cache.get_stats() if self.response_cache is not None else None
+            ),
+            "coalescing": self.coalescer.get_stats() if self.coalescer is not None else None,
+            "sessions": self.sessions.get_stats(),
+            "context_packer": (
+                self.context_packer.get_stats() if self.context_packer is not None else None
+            ),
+        }
+    
+    def get_session_status(self, session_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Get the status of one session
+        
+        Args:
+            session_id: Id of the session
+            
+        Returns:
+            status: Dictionary with session status information, or None
+                if the session is unknown
+        """
+        session = self.sessions.get(session_id)
+        if session is None:
+            return None
+        if session.busy:
+            status = AgentStatus.ACTIVE
+        elif session.failed:
+            status = AgentStatus.ERROR
+        else:
+            status = AgentStatus.IDLE
+        return {
+            "session_id": session_id,
+            "status": status.value,
+            "turns": session.turns,
+            "history_length": len(session.history),
         }
\ No newline at end of file
@@ -0,0 +1,78 @@
+"""
+Single-flight coalescing of identical concurrent calls
+"""
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict, Hashable, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    """
+    Runs at most one call per key at a time, sharing its result
+
+    The first caller for a key starts the call as a task; callers arriving
+    while it is in flight await the same task instead of starting their
+    own. Every waiter gets the result or the exception of the shared call.
+    Waiters are shielded from each other: cancelling one stops its wait
+    but not the call, which keeps running for the others. Once the call
+    finishes the key is free again, so results are never reused later;
+    pair with ResponseCache for that.
+    """
+
+    def __init__(self) -> None:
+        self._calls: Dict[Hashable, "asyncio.Future[Any]"] = {}
+        self.calls = 0
+        self.executions = 0
+        self.coalesced = 0
+
+    def __len__(self) -> int:
+        return len(self._calls)
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[T]]) -> T:
+        """
+        Run fn() unless a call for the same key is already in flight
+
+        Args:
+            key: Identity of the call, such as a request fingerprint
+            fn: Coroutine function making the call
+
+        Returns:
+            result: The result of the shared call
+        """
+        self.calls += 1
+        task = self._calls.get(key)
+        if task is None:
+            self.executions += 1
+            task = asyncio.ensure_future(fn())
+            self._calls[key] = task
+            task.add_done_callback(lambda done: self._finish(key, done))
+        else:
+            self.coalesced += 1
+            logger.debug(f"Coalesced call {key!r:.40} with one in flight")
+        return await asyncio.shield(task)
+
+    def _finish(self, key: Hashable, task: "asyncio.Future[Any]") -> None:
+        if self._calls.get(key) is task:
+            del self._calls[key]
+        if not task.cancelled():
+            # Mark the exception retrieved even if every waiter was cancelled
+            task.exception()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get coalescing statistics
+
+        Returns:
+            stats: Dictionary with calls, executions, coalesced calls and
+                calls in flight
+        """
+        return {
+            "calls": self.calls,
+            "executions": self.executions,
+            "coalesced": self.coalesced,
+            "in_flight": len(self._calls),
+        }
@@ -0,0 +1,240 @@
+"""
+Token-budget-aware assembly of the messages sent to the model
+
+ContextPacker fits the system prompt, retrieved context and conversation
+history into the model's context window, leaving room for the completion.
+Token counts come from a pluggable Tokenizer and are cached per text, so
+on each turn only the new message and newly retrieved items are
+tokenized; history messages keep their counts from earlier turns.
+"""
+import logging
+import math
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence
+
+from .errors import AgentError
+
+logger = logging.getLogger(__name__)
+
+_CONTEXT_PREFIX = "Relevant context: "
+
+
+class Tokenizer(ABC):
+    """
+    Base class for counting the tokens of a text
+    """
+
+    @abstractmethod
+    def count(self, text: str) -> int:
+        """
+        Count the tokens of a text
+
+        Args:
+            text: The text
+
+        Returns:
+            tokens: Number of tokens
+        """
+
+
+class ApproximateTokenizer(Tokenizer):
+    """
+    Estimates tokens from the text length, needing no model vocabulary
+
+    Four characters per token is close for English text with common
+    model vocabularies; wrap a real tokenizer in a Tokenizer subclass
+    when exact counts matter.
+    """
+
+    def __init__(self, chars_per_token: float = 4.0) -> None:
+        """
+        Initialize the tokenizer
+
+        Args:
+            chars_per_token: Average characters per token
+        """
+        self.chars_per_token = chars_per_token
+
+    def count(self, text: str) -> int:
+        return math.ceil(len(text) / self.chars_per_token)
+
+
+@dataclass
+class PackedContext:
+    """Messages chosen by a ContextPacker"""
+    messages: List[Dict[str, str]]
+    prompt_tokens: int
+    context_items: int = 0
+    history_messages: int = 0
+    dropped_context: int = 0
+    dropped_history: int = 0
+
+
+class ContextPacker:
+    """
+    Fits system prompt, context and history into a token budget
+
+    The system prompt and the newest message are always kept, the newest
+    message being cut short if it alone would overflow. Retrieved context
+    items follow in relevance order, up to context_share of what is left;
+    earlier history messages then fill the remaining budget from newest
+    to oldest, so the kept history is always the most recent stretch of
+    the conversation.
+    """
+
+    def __init__(
+        self,
+        tokenizer: Optional[Tokenizer] = None,
+        message_overhead: int = 4,
+        context_share: float = 0.5,
+        max_history_messages: Optional[int] = None,
+        cache_size: int = 4096,
+    ) -> None:
+        """
+        Initialize the packer
+
+        Args:
+            tokenizer: Token counter (defaults to ApproximateTokenizer())
+            message_overhead: Tokens each message costs beyond its content
+                (role and delimiters)
+            context_share: Largest fraction of the budget left after the
+                system prompt and newest message given to retrieved context
+            max_history_messages: Optional cap on history messages, on
+                top of the token budget
+            cache_size: Number of texts whose token counts are cached
+        """
+        self.tokenizer = tokenizer or ApproximateTokenizer()
+        self.message_overhead = message_overhead
+        self.context_share = min(max(context_share, 0.0), 1.0)
+        self.max_history_messages = max_history_messages
+        self.cache_size = cache_size
+        self._counts: "OrderedDict[str, int]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def count(self, text: str) -> int:
+        """
+        Count the tokens of a text, using the cache
+
+        Args:
+            text: The text
+
+        Returns:
+            tokens: Number of tokens
+        """
+        tokens = self._counts.get(text)
+        if tokens is not None:
+            self._counts.move_to_end(text)
+            self.hits += 1
+            return tokens
+        self.misses += 1
+        tokens = self.tokenizer.count(text)
+        if self.cache_size > 0:
+            self._counts[text] = tokens
+            if len(self._counts) > self.cache_size:
+                self._counts.popitem(last=False)
+        return tokens
+
+    def pack(
+        self,
+        system_prompt: str,
+        context: Sequence[str],
+        history: Sequence[Dict[str, str]],
+        budget: int,
+    ) -> PackedContext:
+        """
+        Choose the messages of a request within a token budget
+
+        Args:
+            system_prompt: The agent's system prompt
+            context: Texts of retrieved memory items, most relevant first
+            history: Conversation messages, oldest first; the last one is
+                the new user message
+            budget: Prompt tokens available (context window minus the
+                tokens reserved for the completion)
+
+        Returns:
+            packed: The messages, in order, and what was kept or dropped
+        """
+        system = {"role": "system", "content": system_prompt}
+        used = self.count(system_prompt) + self.message_overhead
+        if used > budget:
+            raise AgentError(f"System prompt needs {used} tokens, over the budget of {budget}")
+
+        newest: Optional[Dict[str, str]] = None
+        if history:
+            newest = history[-1]
+            cost = self.count(newest["content"]) + self.message_overhead
+            if used + cost > budget:
+                newest = self._truncate(newest, budget - used - self.message_overhead)
+                cost = self.count(newest["content"]) + self.message_overhead
+                logger.warning(f"Newest message cut to {cost} tokens to fit the prompt budget")
+            used += cost
+
+        # Retrieved context shares one system message
+        kept_context: List[str] = []
+        context_budget = int((budget - used) * self.context_share)
+        context_used = self.count(_CONTEXT_PREFIX) + self.message_overhead
+        for text in context:
+            if not text:
+                continue
+            # One more token for the separator between items
+            cost = self.count(text) + 1
+            if context_used + cost > context_budget:
+                break
+            kept_context.append(text)
+            context_used += cost
+        if kept_context:
+            used += context_used
+
+        # Earlier history, newest first, while it fits
+        earlier = len(history) - 1 if history else 0
+        allowed = earlier
+        if self.max_history_messages is not None:
+            allowed = min(allowed, max(self.max_history_messages - 1, 0))
+        kept_history = 0
+        while kept_history < allowed:
+            message = history[earlier - 1 - kept_history]
+            cost = self.count(message["content"]) + self.message_overhead
+            if used + cost > budget:
+                break
+            used += cost
+            kept_history += 1
+
+        messages = [system]
+        if kept_context:
+            messages.append({"role": "system", "content": _CONTEXT_PREFIX + "\n\n".join(kept_context)})
+        messages.extend(history[i] for i in range(earlier - kept_history, earlier))
+        if newest is not None:
+            messages.append(newest)
+        return PackedContext(
+            messages=messages,
+            prompt_tokens=used,
+            context_items=len(kept_context),
+            history_messages=kept_history + (newest is not None),
+            dropped_context=sum(1 for text in context if text) - len(kept_context),
+            dropped_history=earlier - kept_history,
+        )
+
+    def _truncate(self, message: Dict[str, str], tokens: int) -> Dict[str, str]:
+        """Keep the longest prefix of a message within a token count"""
+        content = message["content"]
+        low, high = 0, len(content)
+        while low < high:
+            middle = (low + high + 1) // 2
+            if self.tokenizer.count(content[:middle]) <= tokens:
+                low = middle
+            else:
+                high = middle - 1
+        return {**message, "content": content[:low]}
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get token count cache statistics
+
+        Returns:
+            stats: Dictionary with cached texts, hits and misses
+        """
+        return {"cached": len(self._counts), "hits": self.hits, "misses": self.misses}
@@ -36,4 +36,8 @@ class PlanningError(MindChainError):
 
 class OrchestrationError(MindChainError):
     """Errors related to agent orchestration"""
-    pass
\ No newline at end of file
+    pass
+
+class BackendError(MindChainError):
+    """Errors related to LLM backends"""
+    pass
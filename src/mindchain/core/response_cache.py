@@ -0,0 +1,131 @@
+"""
+Exact-match cache of agent responses
+"""
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from ..llm.base import LLMRequest
+
+logger = logging.getLogger(__name__)
+
+
+class ResponseCache:
+    """
+    LRU cache of request fingerprint -> response with a time-to-live
+
+    Keys are LLMRequest.fingerprint(), which covers the model, temperature,
+    token limit and every message sent: system prompt, retrieved context
+    and history window. Only an identical request hits, so one cache can
+    be shared by several agents. Size is bounded in bytes of cached text
+    rather than entries, since responses vary widely in length.
+    """
+
+    def __init__(
+        self,
+        max_bytes: int = 16 * 1024 * 1024,
+        ttl: Optional[float] = 3600.0,
+        max_temperature: float = 0.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        """
+        Initialize the cache
+
+        Args:
+            max_bytes: Maximum UTF-8 bytes of cached keys and responses;
+                least recently used entries are evicted beyond it
+            ttl: Seconds an entry stays valid (None for no expiry)
+            max_temperature: Requests sampled above this temperature
+                bypass the cache; the default only caches deterministic
+                temperature-0 requests
+            clock: Time source, in seconds
+        """
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.max_temperature = max_temperature
+        self._clock = clock
+        self._entries: "OrderedDict[str, Tuple[float, str, int]]" = OrderedDict()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def cacheable(self, request: LLMRequest) -> bool:
+        """Whether responses to a request may be served from the cache"""
+        return request.temperature <= self.max_temperature
+
+    def get(self, key: str) -> Optional[str]:
+        """
+        Look up a cached response
+
+        Args:
+            key: Fingerprint of the request
+
+        Returns:
+            response: The cached response, or None on a miss
+        """
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        expires, response, _ = entry
+        if expires < self._clock():
+            self._discard(key)
+            self.expirations += 1
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return response
+
+    def put(self, key: str, response: str) -> None:
+        """
+        Cache a response
+
+        Args:
+            key: Fingerprint of the request
+            response: The response text
+        """
+        size = len(key) + len(response.encode("utf-8"))
+        if key in self._entries:
+            self._discard(key)
+        if size > self.max_bytes:
+            logger.debug(f"Response of {size} bytes exceeds the cache size, not cached")
+            return
+        expires = self._clock() + self.ttl if self.ttl is not None else float("inf")
+        self._entries[key] = (expires, response, size)
+        self.bytes += size
+        while self.bytes > self.max_bytes:
+            self._discard(next(iter(self._entries)))
+            self.evictions += 1
+
+    def _discard(self, key: str) -> None:
+        _, _, size = self._entries.pop(key)
+        self.bytes -= size
+
+    def clear(self) -> None:
+        """Drop all entries"""
+        self._entries.clear()
+        self.bytes = 0
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get cache statistics
+
+        Returns:
+            stats: Dictionary with size, bytes, hits, misses, evictions and
+                expirations
+        """
+        return {
+            "size": len(self._entries),
+            "bytes": self.bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
@@ -0,0 +1,253 @@
+"""
+Per-session conversation state for agents serving many users
+
+One Agent (config, tools, backend, memory) can serve thousands of
+concurrent sessions. Each session only keeps what differs between users:
+the recent history window sent to the model and a little bookkeeping,
+in a __slots__ object. Turns within a session run one at a time, while
+different sessions proceed concurrently on the same event loop.
+"""
+import asyncio
+import logging
+import time
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Callable, Deque, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class Session:
+    """Conversation state of one session"""
+
+    __slots__ = (
+        "session_id", "history", "current_task", "last_response",
+        "failed", "turns", "pending", "last_active", "_lock",
+    )
+
+    def __init__(self, session_id: str, history_limit: int, now: float) -> None:
+        self.session_id = session_id
+        self.history: Deque[Dict[str, str]] = deque(maxlen=history_limit)
+        self.current_task: Optional[str] = None
+        self.last_response: Optional[str] = None
+        self.failed = False
+        self.turns = 0
+        # Turns running or waiting for the lock; busy sessions are never evicted
+        self.pending = 0
+        self.last_active = now
+        self._lock: Optional[asyncio.Lock] = None
+
+    @property
+    def busy(self) -> bool:
+        """Whether a turn is running or waiting"""
+        return self.pending > 0
+
+
+class SessionTable:
+    """
+    Sessions by id, most recently used last
+
+    Idle sessions are dropped after idle_ttl seconds, and the least
+    recently used idle sessions are evicted beyond max_sessions.
+    """
+
+    def __init__(
+        self,
+        history_limit: int = 6,
+        max_sessions: int = 10000,
+        idle_ttl: Optional[float] = 3600.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        """
+        Initialize the table
+
+        Args:
+            history_limit: Messages of history kept per session; the
+                agent sends this window with every request
+            max_sessions: Maximum sessions kept; the least recently used
+                idle sessions are evicted beyond it
+            idle_ttl: Seconds an idle session is kept (None to keep
+                sessions until evicted)
+            clock: Time source, in seconds
+        """
+        self.history_limit = max(1, history_limit)
+        self.max_sessions = max(1, max_sessions)
+        self.idle_ttl = idle_ttl
+        self._clock = clock
+        self._sessions: "OrderedDict[str, Session]" = OrderedDict()
+        self.active = 0
+        self.created = 0
+        self.evicted = 0
+        self.expired = 0
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def __contains__(self, session_id: object) -> bool:
+        return session_id in self._sessions
+
+    def get(self, session_id: str) -> Optional[Session]:
+        """
+        Look up a session without touching it
+
+        Args:
+            session_id: Id of the session
+
+        Returns:
+            session: The session, or None if unknown
+        """
+        return self._sessions.get(session_id)
+
+    def open(self, session_id: str) -> Session:
+        """
+        Get a session, creating it if needed, and mark it recently used
+
+        Args:
+            session_id: Id of the session
+
+        Returns:
+            session: The session
+        """
+        now = self._clock()
+        self._expire(now)
+        session = self._sessions.get(session_id)
+        if session is not None:
+            self._sessions.move_to_end(session_id)
+            return session
+        session = self._sessions[session_id] = Session(session_id, self.history_limit, now)
+        self.created += 1
+        if len(self._sessions) > self.max_sessions:
+            self._evict()
+        return session
+
+    @asynccontextmanager
+    async def turn(self, session_id: str) -> AsyncIterator[Session]:
+        """
+        Run one turn of a session, waiting for earlier turns to finish
+
+        Args:
+            session_id: Id of the session
+
+        Returns:
+            session: The session, held until the block exits
+        """
+        session = self.open(session_id)
+        if session._lock is None:
+            session._lock = asyncio.Lock()
+        lock = session._lock
+        session.pending += 1
+        self.active += 1
+        try:
+            async with lock:
+                yield session
+        finally:
+            session.pending -= 1
+            self.active -= 1
+            session.last_active = self._clock()
+            if not session.pending:
+                # Nobody holds the lock any more; idle sessions stay small
+                session._lock = None
+
+    def close(self, session_id: str) -> bool:
+        """
+        Drop a session
+
+        Args:
+            session_id: Id of the session
+
+        Returns:
+            closed: Whether the session existed
+        """
+        return self._sessions.pop(session_id, None) is not None
+
+    def export_state(self) -> List[Dict[str, Any]]:
+        """
+        Export every session, least recently used first
+
+        Locks and in-flight turns are not part of the state; a session
+        exported mid-turn keeps the history written so far.
+
+        Returns:
+            state: One dictionary per session, safe to serialize
+        """
+        return [
+            {
+                "session_id": session.session_id,
+                "history": list(session.history),
+                "current_task": session.current_task,
+                "last_response": session.last_response,
+                "failed": session.failed,
+                "turns": session.turns,
+            }
+            for session in self._sessions.values()
+        ]
+
+    def load_state(self, state: List[Dict[str, Any]]) -> int:
+        """
+        Load sessions exported by export_state()
+
+        Loaded sessions count as used now, in their exported order, and
+        replace open sessions with the same id. Histories are cut to this
+        table's history_limit.
+
+        Args:
+            state: Sessions as returned by export_state()
+
+        Returns:
+            loaded: Number of sessions loaded
+        """
+        now = self._clock()
+        for entry in state:
+            session_id = entry["session_id"]
+            session = Session(session_id, self.history_limit, now)
+            session.history.extend(entry.get("history", []))
+            session.current_task = entry.get("current_task")
+            session.last_response = entry.get("last_response")
+            session.failed = entry.get("failed", False)
+            session.turns = entry.get("turns", 0)
+            self._sessions.pop(session_id, None)
+            self._sessions[session_id] = session
+        if len(self._sessions) > self.max_sessions:
+            self._evict()
+        return len(state)
+
+    def _expire(self, now: float) -> None:
+        """Drop idle sessions past their TTL, oldest first"""
+        if self.idle_ttl is None:
+            return
+        while self._sessions:
+            session = next(iter(self._sessions.values()))
+            if session.busy or now - session.last_active <= self.idle_ttl:
+                break
+            del self._sessions[session.session_id]
+            self.expired += 1
+
+    def _evict(self) -> None:
+        """Evict least recently used idle sessions down to max_sessions"""
+        excess = len(self._sessions) - self.max_sessions
+        victims = []
+        for session_id, session in self._sessions.items():
+            if len(victims) >= excess:
+                break
+            if not session.busy:
+                victims.append(session_id)
+        for session_id in victims:
+            del self._sessions[session_id]
+            logger.debug(f"Evicted idle session {session_id}")
+        self.evicted += len(victims)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get session statistics
+
+        Returns:
+            stats: Dictionary with session count, active turns and
+                created, evicted and expired sessions
+        """
+        return {
+            "sessions": len(self._sessions),
+            "active": self.active,
+            "created": self.created,
+            "evicted": self.evicted,
+            "expired": self.expired,
+        }
@@ -0,0 +1,21 @@
+"""
+LLM backend module for MindChain
+
+This module provides the backends agents call to generate responses.
+"""
+
+from .base import LLMBackend, LLMRequest, LLMResponse
+from .http import ConnectionPool, HTTPBackend
+from .simulation import LatencyModel, SimulatedBackend
+from .stub_server import StubLLMServer
+
+__all__ = [
+    'LLMBackend',
+    'LLMRequest',
+    'LLMResponse',
+    'ConnectionPool',
+    'HTTPBackend',
+    'LatencyModel',
+    'SimulatedBackend',
+    'StubLLMServer',
+]
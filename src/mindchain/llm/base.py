@@ -0,0 +1,109 @@
+"""
+Base interface for LLM backends
+"""
+import hashlib
+import json
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Dict, List
+
+
+@dataclass
+class LLMRequest:
+    """A chat completion request"""
+    model: str
+    messages: List[Dict[str, str]]
+    temperature: float = 0.7
+    max_tokens: int = 1000
+    metadata: Dict[str, Any] = field(default_factory=dict)
+
+    def to_payload(self) -> Dict[str, Any]:
+        """
+        Build the OpenAI-compatible JSON body of the request
+
+        Returns:
+            payload: The request body
+        """
+        return {
+            "model": self.model,
+            "messages": self.messages,
+            "temperature": self.temperature,
+            "max_tokens": self.max_tokens,
+        }
+
+    def fingerprint(self) -> str:
+        """
+        Hash everything that determines the completion
+
+        Metadata is left out, so requests differing only in bookkeeping
+        share a fingerprint.
+
+        Returns:
+            fingerprint: Hex SHA-256 of the canonical payload
+        """
+        canonical = json.dumps(self.to_payload(), sort_keys=True, separators=(",", ":"))
+        return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+@dataclass
+class LLMResponse:
+    """A chat completion returned by a backend"""
+    content: str
+    model: str = ""
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    finish_reason: str = "stop"
+    latency: float = 0.0
+
+
+class LLMBackend(ABC):
+    """
+    Base class for backends that turn chat requests into completions
+    """
+
+    @abstractmethod
+    async def generate(self, request: LLMRequest) -> LLMResponse:
+        """
+        Generate a completion
+
+        Args:
+            request: The chat request
+
+        Returns:
+            response: The completion
+
+        Raises:
+            BackendError: If the backend fails or times out
+        """
+
+    async def stream(self, request: LLMRequest) -> AsyncIterator[str]:
+        """
+        Generate a completion incrementally
+
+        Backends that can decode incrementally override this; the default
+        yields the whole completion as a single chunk.
+
+        Args:
+            request: The chat request
+
+        Returns:
+            chunks: Async iterator of content chunks in order
+
+        Raises:
+            BackendError: If the backend fails or times out
+        """
+        response = await self.generate(request)
+        if response.content:
+            yield response.content
+
+    async def aclose(self) -> None:
+        """Release connections and other resources held by the backend"""
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get request statistics of the backend
+
+        Returns:
+            stats: Dictionary of counters
+        """
+        return {}
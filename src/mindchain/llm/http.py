@@ -0,0 +1,516 @@
+"""
+HTTP backend for OpenAI-compatible chat completion endpoints
+
+Requests go over HTTP/1.1 keep-alive connections from a per-host pool
+built on asyncio streams, so a steady stream of requests reuses a few warm
+connections instead of paying a TCP (and TLS) handshake each time. The
+pool bounds open connections per host, a semaphore bounds requests in
+flight, and every attempt runs under a timeout. stream() asks for
+server-sent events and yields content deltas as they arrive.
+"""
+import asyncio
+import json
+import logging
+import ssl
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Awaitable, Callable, Deque, Dict, List, Optional, Tuple, TypeVar
+from urllib.parse import urlsplit
+
+from ..core.errors import BackendError
+from .base import LLMBackend, LLMRequest, LLMResponse
+
+logger = logging.getLogger(__name__)
+
+_RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+_CONNECTION_ERRORS = (ConnectionError, asyncio.IncompleteReadError, OSError)
+
+T = TypeVar("T")
+
+
+class PooledConnection:
+    """A keep-alive connection owned by a ConnectionPool"""
+
+    def __init__(
+        self,
+        key: Tuple[str, str, int],
+        reader: asyncio.StreamReader,
+        writer: asyncio.StreamWriter,
+    ) -> None:
+        self.key = key
+        self.reader = reader
+        self.writer = writer
+        self.requests = 0
+        self.idle_since = time.monotonic()
+
+    @property
+    def closed(self) -> bool:
+        return self.writer.is_closing() or self.reader.at_eof()
+
+    def close(self) -> None:
+        if not self.writer.is_closing():
+            self.writer.close()
+
+
+class ConnectionPool:
+    """
+    Keep-alive connections grouped by (scheme, host, port)
+    """
+
+    def __init__(
+        self,
+        max_connections_per_host: int = 8,
+        connect_timeout: float = 10.0,
+        idle_timeout: float = 60.0,
+        ssl_context: Optional[ssl.SSLContext] = None,
+    ) -> None:
+        """
+        Initialize the pool
+
+        Args:
+            max_connections_per_host: Maximum open connections to one host;
+                further requests wait for a connection to be released
+            connect_timeout: Seconds allowed to open a connection
+            idle_timeout: Idle connections older than this are closed
+                instead of reused
+            ssl_context: TLS settings for https hosts (defaults to the
+                system trust store)
+        """
+        self.max_connections_per_host = max(1, max_connections_per_host)
+        self.connect_timeout = connect_timeout
+        self.idle_timeout = idle_timeout
+        self.ssl_context = ssl_context
+        self._idle: Dict[Tuple[str, str, int], Deque[PooledConnection]] = {}
+        self._slots: Dict[Tuple[str, str, int], asyncio.Semaphore] = {}
+        self.opened = 0
+        self.reused = 0
+
+    async def acquire(self, scheme: str, host: str, port: int, fresh: bool = False) -> PooledConnection:
+        """
+        Get a connection to a host, waiting while the host is at its limit
+
+        Args:
+            scheme: "http" or "https"
+            host: Host name
+            port: Port number
+            fresh: Open a new connection instead of reusing an idle one
+
+        Returns:
+            connection: The connection; hand it back with release()
+        """
+        key = (scheme, host, port)
+        slots = self._slots.get(key)
+        if slots is None:
+            # Created on first use so it binds to the running loop
+            slots = self._slots[key] = asyncio.Semaphore(self.max_connections_per_host)
+        await slots.acquire()
+        try:
+            idle = self._idle.setdefault(key, deque())
+            now = time.monotonic()
+            while idle:
+                # Most recently used first: the likeliest to still be open
+                connection = idle.pop()
+                if fresh or connection.closed or now - connection.idle_since > self.idle_timeout:
+                    connection.close()
+                    continue
+                self.reused += 1
+                return connection
+            context = None
+            if scheme == "https":
+                context = self.ssl_context or ssl.create_default_context()
+            try:
+                reader, writer = await asyncio.wait_for(
+                    asyncio.open_connection(host, port, ssl=context), self.connect_timeout
+                )
+            except asyncio.TimeoutError as e:
+                raise ConnectionError(f"Timed out connecting to {host}:{port}") from e
+            self.opened += 1
+            return PooledConnection(key, reader, writer)
+        except BaseException:
+            slots.release()
+            raise
+
+    def release(self, connection: PooledConnection, reusable: bool) -> None:
+        """
+        Return a connection to the pool
+
+        Args:
+            connection: A connection from acquire()
+            reusable: Whether the last response was fully read and the
+                server allows keep-alive; otherwise the connection is closed
+        """
+        if reusable and not connection.closed:
+            connection.idle_since = time.monotonic()
+            self._idle.setdefault(connection.key, deque()).append(connection)
+        else:
+            connection.close()
+        self._slots[connection.key].release()
+
+    async def close(self) -> None:
+        """Close every idle connection"""
+        for idle in self._idle.values():
+            while idle:
+                connection = idle.pop()
+                connection.close()
+                try:
+                    await connection.writer.wait_closed()
+                except _CONNECTION_ERRORS:
+                    pass
+        self._idle.clear()
+
+
+async def write_request(
+    connection: PooledConnection,
+    method: str,
+    target: str,
+    host: str,
+    headers: Dict[str, str],
+    body: bytes,
+) -> None:
+    """Send an HTTP/1.1 request on a connection"""
+    lines = [
+        f"{method} {target} HTTP/1.1",
+        f"Host: {host}",
+        f"Content-Length: {len(body)}",
+        "Connection: keep-alive",
+    ]
+    lines.extend(f"{name}: {value}" for name, value in headers.items())
+    connection.writer.write(("\r\n".join(lines) + "\r\n\r\n").encode("latin-1") + body)
+    await connection.writer.drain()
+
+
+async def read_headers(reader: asyncio.StreamReader) -> Dict[str, str]:
+    """
+    Read a header block up to its blank line
+
+    Returns:
+        headers: Header values by lower-cased name
+    """
+    headers: Dict[str, str] = {}
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            return headers
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+
+
+async def read_head(reader: asyncio.StreamReader) -> Tuple[int, Dict[str, str], bool]:
+    """
+    Read the status line and headers of a response
+
+    Returns:
+        head: (status, lower-cased headers, whether keep-alive is allowed)
+    """
+    status_line = await reader.readline()
+    if not status_line:
+        raise ConnectionResetError("Connection closed before the response")
+    version, status, _ = (status_line.decode("latin-1").rstrip("\r\n") + "  ").split(" ", 2)
+    headers = await read_headers(reader)
+    keep_alive = version == "HTTP/1.1" and headers.get("connection", "").lower() != "close"
+    return int(status), headers, keep_alive
+
+
+async def iter_body(reader: asyncio.StreamReader, headers: Dict[str, str]) -> AsyncIterator[bytes]:
+    """
+    Read a response body piece by piece as it arrives
+
+    Bodies are delimited by chunked encoding, Content-Length or, failing
+    both, the server closing the connection.
+
+    Returns:
+        pieces: Async iterator of body bytes
+    """
+    if headers.get("transfer-encoding", "").lower() == "chunked":
+        while True:
+            size = int((await reader.readline()).split(b";")[0].strip() or b"0", 16)
+            if size == 0:
+                # Skip trailers up to the final blank line
+                while (await reader.readline()) not in (b"\r\n", b"\n", b""):
+                    pass
+                return
+            yield await reader.readexactly(size)
+            await reader.readexactly(2)
+    elif "content-length" in headers:
+        yield await reader.readexactly(int(headers["content-length"]))
+    else:
+        while True:
+            data = await reader.read(65536)
+            if not data:
+                return
+            yield data
+
+
+def body_is_delimited(headers: Dict[str, str]) -> bool:
+    """Whether the body ends before the connection does, so it can be reused"""
+    return headers.get("transfer-encoding", "").lower() == "chunked" or "content-length" in headers
+
+
+async def read_body(reader: asyncio.StreamReader, headers: Dict[str, str]) -> Tuple[bytes, bool]:
+    """
+    Read a whole response body
+
+    Returns:
+        body: (the body, whether the connection can carry another request)
+    """
+    pieces = [piece async for piece in iter_body(reader, headers)]
+    return b"".join(pieces), body_is_delimited(headers)
+
+
+async def iter_sse_data(pieces: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    """
+    Split a text/event-stream body into the data of its events
+
+    Args:
+        pieces: Body bytes as they arrive
+
+    Returns:
+        data: Async iterator of the data field of each event
+    """
+    buffer = b""
+    lines: List[str] = []
+    async for piece in pieces:
+        buffer += piece
+        *complete, buffer = buffer.split(b"\n")
+        for raw in complete:
+            line = raw.rstrip(b"\r").decode("utf-8")
+            if line.startswith("data:"):
+                value = line[5:]
+                lines.append(value[1:] if value.startswith(" ") else value)
+            elif not line and lines:
+                # A blank line ends the event
+                yield "\n".join(lines)
+                lines = []
+    if lines:
+        yield "\n".join(lines)
+
+
+class _StatusError(Exception):
+    """An HTTP error status, retried if transient"""
+
+    def __init__(self, status: int, message: str) -> None:
+        super().__init__(message)
+        self.status = status
+
+
+class HTTPBackend(LLMBackend):
+    """
+    Backend calling an OpenAI-compatible /v1/chat/completions endpoint
+    """
+
+    def __init__(
+        self,
+        base_url: str,
+        api_key: Optional[str] = None,
+        path: str = "/v1/chat/completions",
+        max_connections: int = 8,
+        max_concurrency: int = 64,
+        timeout: float = 60.0,
+        connect_timeout: float = 10.0,
+        max_retries: int = 2,
+        retry_backoff: float = 0.5,
+        headers: Optional[Dict[str, str]] = None,
+        pool: Optional[ConnectionPool] = None,
+    ) -> None:
+        """
+        Initialize the backend
+
+        Args:
+            base_url: Server URL, e.g. "http://127.0.0.1:8000"
+            api_key: Optional bearer token
+            path: Path of the chat completions endpoint
+            max_connections: Maximum keep-alive connections to the host
+            max_concurrency: Maximum requests in flight; the rest queue
+            timeout: Seconds allowed for one attempt, connecting included
+            connect_timeout: Seconds allowed to open a connection
+            max_retries: Retries after connection errors, timeouts and
+                429/5xx responses
+            retry_backoff: Delay before the first retry, doubled each time
+            headers: Extra headers sent with every request
+            pool: Connection pool to share with other backends
+        """
+        url = urlsplit(base_url)
+        if url.scheme not in ("http", "https") or not url.hostname:
+            raise ValueError(f"Expected an http(s) URL, got {base_url!r}")
+        self.scheme = url.scheme
+        self.host = url.hostname
+        self.port = url.port or (443 if url.scheme == "https" else 80)
+        self.target = url.path.rstrip("/") + path
+        default_port = self.port == (443 if self.scheme == "https" else 80)
+        self.host_header = self.host if default_port else f"{self.host}:{self.port}"
+        self.headers = {"Content-Type": "application/json", "Accept": "application/json"}
+        if api_key:
+            self.headers["Authorization"] = f"Bearer {api_key}"
+        self.headers.update(headers or {})
+        self.max_concurrency = max(1, max_concurrency)
+        self.timeout = timeout
+        self.max_retries = max(0, max_retries)
+        self.retry_backoff = retry_backoff
+        self.pool = pool or ConnectionPool(max_connections, connect_timeout)
+        self._limit: Optional[asyncio.Semaphore] = None
+        self._stats = {"requests": 0, "retries": 0, "errors": 0, "in_flight": 0}
+
+    async def generate(self, request: LLMRequest) -> LLMResponse:
+        started = time.perf_counter()
+        payload = await self.post_json(request.to_payload())
+        try:
+            choice = payload["choices"][0]
+            content = choice["message"]["content"]
+        except (KeyError, IndexError, TypeError) as e:
+            raise BackendError(f"Malformed completion from {self.host}: {payload!r:.200}") from e
+        usage = payload.get("usage") or {}
+        return LLMResponse(
+            content=content or "",
+            model=payload.get("model", request.model),
+            prompt_tokens=int(usage.get("prompt_tokens", 0)),
+            completion_tokens=int(usage.get("completion_tokens", 0)),
+            finish_reason=choice.get("finish_reason") or "stop",
+            latency=time.perf_counter() - started,
+        )
+
+    async def stream(self, request: LLMRequest) -> AsyncIterator[str]:
+        payload = request.to_payload()
+        payload["stream"] = True
+        body = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+        async with self._slot():
+            # Retries are only safe before the first chunk is delivered
+            connection, headers, keep_alive = await self._with_retries(
+                lambda fresh: self._open_stream(body, fresh)
+            )
+            reusable = False
+            events = iter_sse_data(iter_body(connection.reader, headers))
+            try:
+                while True:
+                    try:
+                        data = await asyncio.wait_for(events.__anext__(), self.timeout)
+                    except StopAsyncIteration:
+                        break
+                    except asyncio.TimeoutError as e:
+                        raise BackendError(f"Stream from {self.host} stalled for {self.timeout}s") from e
+                    except _CONNECTION_ERRORS as e:
+                        raise BackendError(f"Stream from {self.host} broke: {e}") from e
+                    if data == "[DONE]":
+                        continue
+                    try:
+                        delta = json.loads(data)["choices"][0].get("delta") or {}
+                    except (ValueError, KeyError, IndexError, TypeError, AttributeError) as e:
+                        raise BackendError(f"Malformed stream event from {self.host}: {data!r:.200}") from e
+                    if delta.get("content"):
+                        yield delta["content"]
+                connection.requests += 1
+                reusable = keep_alive and body_is_delimited(headers)
+            finally:
+                # A stream abandoned midway leaves unread bytes; drop the connection
+                await events.aclose()
+                self.pool.release(connection, reusable)
+
+    async def post_json(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        POST a JSON body to the endpoint, retrying transient failures
+
+        Args:
+            payload: The request body
+
+        Returns:
+            response: The decoded JSON response
+        """
+        body = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+        async with self._slot():
+            data = await self._with_retries(lambda fresh: self._post_once(body, fresh))
+        try:
+            return json.loads(data)
+        except ValueError as e:
+            raise BackendError(f"Invalid JSON from {self.host}") from e
+
+    @asynccontextmanager
+    async def _slot(self) -> AsyncIterator[None]:
+        """Hold one of the max_concurrency request slots, counting errors"""
+        if self._limit is None:
+            # Created on first use so it binds to the running loop
+            self._limit = asyncio.Semaphore(self.max_concurrency)
+        async with self._limit:
+            self._stats["requests"] += 1
+            self._stats["in_flight"] += 1
+            try:
+                yield
+            except BackendError:
+                self._stats["errors"] += 1
+                raise
+            finally:
+                self._stats["in_flight"] -= 1
+
+    async def _with_retries(self, attempt: Callable[[bool], Awaitable[T]]) -> T:
+        """
+        Run attempt(fresh) under the timeout, retrying transient failures
+
+        Args:
+            attempt: Coroutine function making one attempt; fresh asks
+                it to open a new connection instead of reusing one
+
+        Returns:
+            result: The result of the first successful attempt
+        """
+        retries = 0
+        fresh = False
+        while True:
+            try:
+                return await asyncio.wait_for(attempt(fresh), self.timeout)
+            except asyncio.TimeoutError:
+                error = BackendError(f"Request to {self.host} timed out after {self.timeout}s")
+            except _CONNECTION_ERRORS as e:
+                error = BackendError(f"Connection to {self.host} failed: {e}")
+                # The server may have dropped idle connections; skip them
+                fresh = True
+            except _StatusError as e:
+                error = BackendError(str(e))
+                if e.status not in _RETRY_STATUSES:
+                    raise error from None
+            if retries >= self.max_retries:
+                raise error
+            self._stats["retries"] += 1
+            await asyncio.sleep(self.retry_backoff * 2 ** retries)
+            retries += 1
+
+    async def _post_once(self, body: bytes, fresh: bool) -> bytes:
+        connection = await self.pool.acquire(self.scheme, self.host, self.port, fresh)
+        reusable = False
+        try:
+            await write_request(connection, "POST", self.target, self.host_header, self.headers, body)
+            status, headers, keep_alive = await read_head(connection.reader)
+            data, complete = await read_body(connection.reader, headers)
+            connection.requests += 1
+            reusable = keep_alive and complete
+        finally:
+            self.pool.release(connection, reusable)
+        if status >= 400:
+            raise _StatusError(status, f"{self.host} returned HTTP {status}: {data[:200]!r}")
+        return data
+
+    async def _open_stream(
+        self, body: bytes, fresh: bool
+    ) -> Tuple[PooledConnection, Dict[str, str], bool]:
+        """Send a streaming request and read the response head"""
+        connection = await self.pool.acquire(self.scheme, self.host, self.port, fresh)
+        try:
+            headers = dict(self.headers, Accept="text/event-stream")
+            await write_request(connection, "POST", self.target, self.host_header, headers, body)
+            status, headers, keep_alive = await read_head(connection.reader)
+            if status < 400:
+                return connection, headers, keep_alive
+            data, complete = await read_body(connection.reader, headers)
+        except BaseException:
+            self.pool.release(connection, False)
+            raise
+        self.pool.release(connection, keep_alive and complete)
+        raise _StatusError(status, f"{self.host} returned HTTP {status}: {data[:200]!r}")
+
+    async def aclose(self) -> None:
+        await self.pool.close()
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            **self._stats,
+            "connections_opened": self.pool.opened,
+            "connections_reused": self.pool.reused,
+        }
@@ -0,0 +1,160 @@
+"""
+Simulated LLM latency for offline load tests
+
+A LatencyModel draws the time to first token, the decoding rate and the
+completion length of each request from log-normal distributions, which
+match the long right tail of hosted model latencies. SimulatedBackend
+applies it in-process; StubLLMServer applies it behind a real HTTP
+endpoint.
+"""
+import asyncio
+import math
+import random
+import time
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+from .base import LLMBackend, LLMRequest, LLMResponse
+
+_WORDS = (
+    "the", "agent", "memory", "task", "result", "plan", "context", "step",
+    "value", "answer", "data", "model", "request", "response", "system", "tool",
+)
+
+
+@dataclass
+class LatencyModel:
+    """
+    Distributions of simulated request latency
+
+    Each *_sigma is the standard deviation of the underlying normal, so
+    0 makes the value constant and 0.5 gives a p99 about three times the
+    median.
+    """
+    first_token_median: float = 0.3
+    first_token_sigma: float = 0.4
+    tokens_per_second: float = 50.0
+    tokens_per_second_sigma: float = 0.2
+    completion_tokens_median: int = 64
+    completion_tokens_sigma: float = 0.5
+
+    def sample(self, rng: random.Random, max_tokens: int) -> Dict[str, float]:
+        """
+        Draw the latency of one request
+
+        Args:
+            rng: Random source
+            max_tokens: Upper bound on the completion length
+
+        Returns:
+            sample: first_token (seconds), token_interval (seconds per
+                token after the first) and completion_tokens
+        """
+        def lognormal(median: float, sigma: float) -> float:
+            return median * math.exp(rng.gauss(0.0, sigma)) if sigma > 0 else median
+
+        tokens = int(round(lognormal(self.completion_tokens_median, self.completion_tokens_sigma)))
+        rate = lognormal(self.tokens_per_second, self.tokens_per_second_sigma)
+        return {
+            "first_token": lognormal(self.first_token_median, self.first_token_sigma),
+            "token_interval": 1.0 / rate if rate > 0 else 0.0,
+            "completion_tokens": max(1, min(max_tokens, tokens)),
+        }
+
+
+def simulated_tokens(request: LLMRequest, count: int) -> List[str]:
+    """
+    Produce deterministic completion tokens for a request
+
+    Args:
+        request: The chat request
+        count: Number of tokens
+
+    Returns:
+        tokens: Words, each with its leading space
+    """
+    rng = random.Random(request.fingerprint())
+    return [(" " if i else "") + rng.choice(_WORDS) for i in range(count)]
+
+
+async def paced_tokens(tokens: List[str], sample: Dict[str, float]) -> AsyncIterator[str]:
+    """
+    Release tokens at the pace of a latency sample
+
+    Args:
+        tokens: Completion tokens
+        sample: Draw from LatencyModel.sample()
+
+    Returns:
+        tokens: The first token after sample["first_token"] seconds, each
+            later one sample["token_interval"] seconds after the previous
+    """
+    for i, token in enumerate(tokens):
+        await asyncio.sleep(sample["token_interval"] if i else sample["first_token"])
+        yield token
+
+
+def count_prompt_tokens(request: LLMRequest) -> int:
+    """Rough prompt length in whitespace-separated words"""
+    return sum(len(str(message.get("content", "")).split()) for message in request.messages)
+
+
+class SimulatedBackend(LLMBackend):
+    """
+    In-process backend that sleeps for a simulated latency
+
+    Useful for load-testing agents without sockets; StubLLMServer with an
+    HTTPBackend also exercises the network path.
+    """
+
+    def __init__(
+        self,
+        latency: Optional[LatencyModel] = None,
+        seed: Optional[int] = None,
+        model: str = "simulated",
+    ) -> None:
+        """
+        Initialize the backend
+
+        Args:
+            latency: Latency distributions (defaults to LatencyModel())
+            seed: Seed of the latency draws, for repeatable runs
+            model: Model name reported in responses
+        """
+        self.latency = latency or LatencyModel()
+        self.model = model
+        self._rng = random.Random(seed)
+        self._stats = {"requests": 0, "completion_tokens": 0, "busy_seconds": 0.0}
+
+    async def generate(self, request: LLMRequest) -> LLMResponse:
+        started = time.perf_counter()
+        sample = self.latency.sample(self._rng, request.max_tokens)
+        tokens = simulated_tokens(request, int(sample["completion_tokens"]))
+        await asyncio.sleep(sample["first_token"] + sample["token_interval"] * (len(tokens) - 1))
+        elapsed = time.perf_counter() - started
+        self._stats["requests"] += 1
+        self._stats["completion_tokens"] += len(tokens)
+        self._stats["busy_seconds"] += elapsed
+        return LLMResponse(
+            content="".join(tokens),
+            model=self.model,
+            prompt_tokens=count_prompt_tokens(request),
+            completion_tokens=len(tokens),
+            finish_reason="length" if len(tokens) >= request.max_tokens else "stop",
+            latency=elapsed,
+        )
+
+    async def stream(self, request: LLMRequest) -> AsyncIterator[str]:
+        started = time.perf_counter()
+        sample = self.latency.sample(self._rng, request.max_tokens)
+        tokens = simulated_tokens(request, int(sample["completion_tokens"]))
+        self._stats["requests"] += 1
+        try:
+            async for token in paced_tokens(tokens, sample):
+                self._stats["completion_tokens"] += 1
+                yield token
+        finally:
+            self._stats["busy_seconds"] += time.perf_counter() - started
+
+    def get_stats(self) -> Dict[str, Any]:
+        return dict(self._stats)
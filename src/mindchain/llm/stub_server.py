@@ -0,0 +1,248 @@
+"""
+Local stub of an OpenAI-compatible chat completion server
+
+StubLLMServer answers POST /v1/chat/completions over HTTP/1.1 keep-alive
+after a delay drawn from a LatencyModel, or token by token as server-sent
+events when the request sets "stream", so the whole agent stack,
+HTTPBackend and connection pool included, can be load-tested offline.
+
+Run it standalone with:
+
+    python -m mindchain.llm.stub_server --port 8000 --first-token 0.3 --tokens-per-second 50
+"""
+import argparse
+import asyncio
+import json
+import logging
+import random
+import time
+from typing import Any, Dict, List, Optional
+
+from .base import LLMRequest
+from .http import read_body, read_headers
+from .simulation import LatencyModel, count_prompt_tokens, paced_tokens, simulated_tokens
+
+logger = logging.getLogger(__name__)
+
+_REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed"}
+
+
+class StubLLMServer:
+    """
+    asyncio HTTP server simulating chat completion latency
+    """
+
+    def __init__(
+        self,
+        latency: Optional[LatencyModel] = None,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        seed: Optional[int] = None,
+        path: str = "/v1/chat/completions",
+    ) -> None:
+        """
+        Initialize the server
+
+        Args:
+            latency: Latency distributions (defaults to LatencyModel())
+            host: Interface to listen on
+            port: Port to listen on (0 picks a free port)
+            seed: Seed of the latency draws, for repeatable runs
+            path: Path of the chat completions endpoint
+        """
+        self.latency = latency or LatencyModel()
+        self.host = host
+        self.port = port
+        self.path = path
+        self._rng = random.Random(seed)
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._connections: Dict[asyncio.StreamWriter, "asyncio.Task[None]"] = {}
+        self.stats = {"connections": 0, "requests": 0, "completion_tokens": 0}
+
+    @property
+    def url(self) -> str:
+        """Base URL of the running server"""
+        return f"http://{self.host}:{self.port}"
+
+    async def start(self) -> "StubLLMServer":
+        """Start listening; the chosen port is available as self.port"""
+        self._server = await asyncio.start_server(self._serve, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        logger.info(f"Stub LLM server listening on {self.url}")
+        return self
+
+    async def stop(self) -> None:
+        """Stop listening and close open connections"""
+        if self._server is not None:
+            self._server.close()
+            for writer in list(self._connections):
+                writer.close()
+            if self._connections:
+                await asyncio.wait(list(self._connections.values()))
+            await self._server.wait_closed()
+            self._server = None
+
+    async def __aenter__(self) -> "StubLLMServer":
+        return await self.start()
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        await self.stop()
+
+    async def _serve(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """Answer requests on one connection until the client closes it"""
+        self.stats["connections"] += 1
+        self._connections[writer] = asyncio.current_task()
+        try:
+            while True:
+                try:
+                    request_line = await reader.readline()
+                except ConnectionError:
+                    break
+                if not request_line:
+                    break
+                method, target, *_ = request_line.decode("latin-1").split()
+                headers = await read_headers(reader)
+                body = b""
+                if "content-length" in headers or "transfer-encoding" in headers:
+                    body, _ = await read_body(reader, headers)
+                await self._respond(writer, method, target, body)
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        finally:
+            self._connections.pop(writer, None)
+            writer.close()
+
+    async def _respond(self, writer: asyncio.StreamWriter, method: str, target: str, body: bytes) -> None:
+        """Answer one request, as JSON or as an event stream if asked to"""
+        if target != self.path:
+            return await _write_json(writer, 404, {"error": {"message": f"Unknown path {target}"}})
+        if method != "POST":
+            return await _write_json(writer, 405, {"error": {"message": "Use POST"}})
+        try:
+            payload = json.loads(body)
+            request = LLMRequest(
+                model=payload.get("model", "stub"),
+                messages=payload["messages"],
+                temperature=payload.get("temperature", 0.7),
+                max_tokens=int(payload.get("max_tokens", 1000)),
+            )
+        except (ValueError, KeyError, TypeError):
+            return await _write_json(writer, 400, {"error": {"message": "Invalid chat completion request"}})
+
+        self.stats["requests"] += 1
+        sample = self.latency.sample(self._rng, request.max_tokens)
+        tokens = simulated_tokens(request, int(sample["completion_tokens"]))
+        if payload.get("stream"):
+            await self._stream(writer, request, tokens, sample)
+            return
+        await asyncio.sleep(sample["first_token"] + sample["token_interval"] * (len(tokens) - 1))
+        self.stats["completion_tokens"] += len(tokens)
+        await _write_json(writer, 200, _completion(request, "".join(tokens), len(tokens)))
+
+    async def _stream(
+        self,
+        writer: asyncio.StreamWriter,
+        request: LLMRequest,
+        tokens: List[str],
+        sample: Dict[str, float],
+    ) -> None:
+        """Send tokens as server-sent events in a chunked response"""
+        writer.write(
+            "HTTP/1.1 200 OK\r\nContent-Type: text/event-stream\r\n"
+            "Transfer-Encoding: chunked\r\nConnection: keep-alive\r\n\r\n".encode("latin-1")
+        )
+        stream_id = f"stub-{request.fingerprint()[:12]}"
+        async for token in paced_tokens(tokens, sample):
+            self.stats["completion_tokens"] += 1
+            await _write_event(writer, _chunk(stream_id, request, {"content": token}, None))
+        finish_reason = "length" if len(tokens) >= request.max_tokens else "stop"
+        await _write_event(writer, _chunk(stream_id, request, {}, finish_reason))
+        await _write_event(writer, "[DONE]")
+        writer.write(b"0\r\n\r\n")
+        await writer.drain()
+
+
+async def _write_json(writer: asyncio.StreamWriter, status: int, payload: Dict[str, Any]) -> None:
+    data = json.dumps(payload).encode("utf-8")
+    writer.write(
+        f"HTTP/1.1 {status} {_REASONS.get(status, 'Error')}\r\n"
+        f"Content-Type: application/json\r\nContent-Length: {len(data)}\r\n"
+        "Connection: keep-alive\r\n\r\n".encode("latin-1") + data
+    )
+    await writer.drain()
+
+
+async def _write_event(writer: asyncio.StreamWriter, data: Any) -> None:
+    """Send one server-sent event as one HTTP chunk"""
+    text = data if isinstance(data, str) else json.dumps(data)
+    event = f"data: {text}\n\n".encode("utf-8")
+    writer.write(f"{len(event):x}\r\n".encode("latin-1") + event + b"\r\n")
+    await writer.drain()
+
+
+def _chunk(
+    stream_id: str, request: LLMRequest, delta: Dict[str, str], finish_reason: Optional[str]
+) -> Dict[str, Any]:
+    return {
+        "id": stream_id,
+        "object": "chat.completion.chunk",
+        "created": int(time.time()),
+        "model": request.model,
+        "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}],
+    }
+
+
+def _completion(request: LLMRequest, content: str, completion_tokens: int) -> Dict[str, Any]:
+    prompt_tokens = count_prompt_tokens(request)
+    return {
+        "id": f"stub-{request.fingerprint()[:12]}",
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": request.model,
+        "choices": [{
+            "index": 0,
+            "message": {"role": "assistant", "content": content},
+            "finish_reason": "length" if completion_tokens >= request.max_tokens else "stop",
+        }],
+        "usage": {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens,
+        },
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Run a stub OpenAI-compatible LLM server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--first-token", type=float, default=0.3, help="Median seconds to first token")
+    parser.add_argument("--first-token-sigma", type=float, default=0.4)
+    parser.add_argument("--tokens-per-second", type=float, default=50.0)
+    parser.add_argument("--tokens-per-second-sigma", type=float, default=0.2)
+    parser.add_argument("--completion-tokens", type=int, default=64, help="Median completion length")
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    latency = LatencyModel(
+        first_token_median=args.first_token,
+        first_token_sigma=args.first_token_sigma,
+        tokens_per_second=args.tokens_per_second,
+        tokens_per_second_sigma=args.tokens_per_second_sigma,
+        completion_tokens_median=args.completion_tokens,
+    )
+
+    async def serve() -> None:
+        server = await StubLLMServer(latency, args.host, args.port, args.seed).start()
+        print(f"Serving chat completions on {server.url}{server.path}")
+        await asyncio.Event().wait()
+
+    logging.basicConfig(level=logging.INFO)
+    try:
+        asyncio.run(serve())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
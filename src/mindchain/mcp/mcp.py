@@ -6,7 +6,7 @@ The supervisory layer responsible for managing and monitoring all agents in the
 import logging
 import uuid
 import time
-from typing import Dict, List, Optional, Any, Callable, Coroutine, TypeVar, cast
+from typing import AsyncGenerator, AsyncIterator, Dict, List, Optional, Any, Callable, Coroutine, TypeVar, cast
 import asyncio
 
 from ..core.agent import Agent
@@ -259,6 +259,71 @@ class MCP:
             )
             raise
     
+    async def supervise_stream(
+        self,
+        agent_id: str,
+        task: Callable[[], AsyncGenerator[str, None]]
+    ) -> AsyncIterator[str]:
+        """
+        Supervise a streaming task, such as agent.run_stream, chunk by chunk.
+        
+        Token limits are enforced as chunks arrive: once the limit is hit
+        the truncated chunk is yielded and the task's stream is closed, so
+        the agent stops generating instead of running to completion.
+        
+        Args:
+            agent_id: The ID of the agent executing the task
+            task: A callable returning an async generator of text chunks
+        
+        Returns:
+            Async iterator of the (possibly truncated) chunks
+        
+        Raises:
+            ValueError: If the agent ID is invalid
+        """
+        agent = self.get_agent(agent_id)
+        if not agent:
+            raise ValueError(f"Invalid agent ID: {agent_id}")
+        
+        self.logger.debug(f"Supervising stream for agent '{agent.name}' ({agent_id})")
+        
+        start_time = time.time()
+        self.resource_manager.start_task()
+        stream = task()
+        delivered = 0
+        failed = False
+        try:
+            async for chunk in stream:
+                limited = self.policy_manager.enforce_token_limits(chunk, consumed=delivered)
+                delivered += len(chunk)
+                yield limited
+                if limited != chunk:
+                    self.logger.info(f"Stream of agent '{agent.name}' stopped at the token limit")
+                    break
+        
+        except Exception as e:
+            failed = True
+            self.update_metrics(
+                agent_id=agent_id,
+                error_occurred=True
+            )
+            self.logger.error(
+                f"Error during streaming task for agent '{agent.name}': {str(e)}",
+                exc_info=True
+            )
+            raise
+        
+        finally:
+            # Stops generation upstream when the limit was hit or the caller left
+            await stream.aclose()
+            self.resource_manager.complete_task()
+            if not failed:
+                self.update_metrics(
+                    agent_id=agent_id,
+                    task_completed=True,
+                    response_time=time.time() - start_time
+                )
+    
     def recover_agent(self, agent_id: str) -> bool:
         """
         Attempt to recover an agent that's in an error state
@@ -71,12 +71,14 @@ class PolicyManager:
         
         return True
     
-    def enforce_token_limits(self, content: str) -> str:
+    def enforce_token_limits(self, content: str, consumed: int = 0) -> str:
         """
         Enforce token limits on content
         
         Args:
             content: The content to check
+            consumed: Characters of the same response already delivered,
+                when content is the next chunk of a stream
             
         Returns:
             content: The possibly truncated content
@@ -85,7 +87,7 @@ class PolicyManager:
         
         # Simple approximation: 1 token ≈ 4 characters
         # In a real implementation, use a proper tokenizer
-        max_chars = max_tokens * 4
+        max_chars = max(max_tokens * 4 - consumed, 0)
         
         if len(content) > max_chars:
             truncated = content[:max_chars]
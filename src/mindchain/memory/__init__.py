@@ -5,5 +5,62 @@ This module provides memory management capabilities for agents.
 """
 
 from .memory_manager import MemoryManager
+from .base import MemoryIndex
+from .embeddings import EmbeddingProvider, HashEmbeddingProvider
+from .vector_index import VectorIndex
+from .weighted_index import WeightedVectorIndex
+from .lexical_index import BM25Index
+from .quantization import EmbeddingStorage, QuantizedVectorIndex
+from .ivf_index import IVFIndex
+from .hybrid_index import HybridIndex, reciprocal_rank_fusion
+from .retrieval_cache import RetrievalCache
+from .metadata_index import MetadataIndex
+from .dedup import MinHashDeduplicator
+from .consolidation import ExtractiveSummarizer, Summarizer
+from .short_term import EvictionPolicy, ShortTermBuffer
+from .long_term import LongTermStore, InMemoryLongTermStore
+from .persistent_store import PersistentLongTermStore
+from .compression import CompressedLongTermStore, train_dictionary
+from .sqlite_store import SQLiteFTSIndex, SQLiteMemoryStore
+from .shared_pool import MemoryView, SharedMemoryPool
+from .snapshot import SnapshotLongTermStore, SnapshotReader
+from .shared_index import MemoryPublisher, SharedMemoryReader
+from .ingestion import IngestionReport, ingest, iter_chunks
 
-__all__ = ['MemoryManager']
\ No newline at end of file
+__all__ = [
+    'MemoryManager',
+    'MemoryIndex',
+    'EmbeddingProvider',
+    'HashEmbeddingProvider',
+    'VectorIndex',
+    'WeightedVectorIndex',
+    'BM25Index',
+    'EmbeddingStorage',
+    'QuantizedVectorIndex',
+    'IVFIndex',
+    'HybridIndex',
+    'reciprocal_rank_fusion',
+    'RetrievalCache',
+    'MetadataIndex',
+    'MinHashDeduplicator',
+    'Summarizer',
+    'ExtractiveSummarizer',
+    'EvictionPolicy',
+    'ShortTermBuffer',
+    'LongTermStore',
+    'InMemoryLongTermStore',
+    'PersistentLongTermStore',
+    'CompressedLongTermStore',
+    'train_dictionary',
+    'SQLiteMemoryStore',
+    'SQLiteFTSIndex',
+    'SharedMemoryPool',
+    'MemoryView',
+    'SnapshotReader',
+    'SnapshotLongTermStore',
+    'MemoryPublisher',
+    'SharedMemoryReader',
+    'IngestionReport',
+    'ingest',
+    'iter_chunks',
+]
@@ -0,0 +1,99 @@
+"""
+Base interface for memory indexes
+"""
+from abc import ABC, abstractmethod
+from typing import AbstractSet, Any, Dict, List, Optional, Sequence, Tuple
+
+
+class MemoryIndex(ABC):
+    """
+    Base class for indexes that rank stored memory items against a query
+
+    Items are identified by the integer ids assigned by the MemoryManager;
+    the index only keeps what it needs for ranking, never the items.
+    """
+
+    #: Whether a query can only match items sharing one of its tokens
+    term_scoped: bool = False
+
+    #: Whether the index keeps its contents across restarts, so the
+    #: MemoryManager does not re-add long-term items to it on startup
+    persistent: bool = False
+
+    @abstractmethod
+    def add_batch(self, item_ids: Sequence[int], items: Sequence[Dict[str, Any]]) -> None:
+        """
+        Add a batch of items to the index
+
+        Args:
+            item_ids: Ids of the items, aligned with items
+            items: The memory items to index
+        """
+
+    def add(self, item_id: int, item: Dict[str, Any]) -> None:
+        """
+        Add a single item to the index
+
+        Args:
+            item_id: Id of the item
+            item: The memory item to index
+        """
+        self.add_batch([item_id], [item])
+
+    @abstractmethod
+    def remove(self, item_id: int) -> bool:
+        """
+        Remove an item from the index
+
+        Args:
+            item_id: Id of the item to remove
+
+        Returns:
+            removed: Whether the item was present
+        """
+
+    @abstractmethod
+    def search(
+        self, query: str, k: int, candidates: Optional[AbstractSet[int]] = None
+    ) -> List[Tuple[int, float]]:
+        """
+        Find the items that best match a query
+
+        Args:
+            query: The query text
+            k: Maximum number of results
+            candidates: Optional ids to restrict the search to; only these
+                items are scored
+
+        Returns:
+            results: (item_id, score) pairs, best first
+        """
+
+    def needs_maintenance(self) -> bool:
+        """
+        Check whether the index wants background maintenance
+
+        Returns:
+            needed: Whether maintain() should be scheduled
+        """
+        return False
+
+    async def maintain(self) -> None:
+        """Run background maintenance such as re-clustering"""
+
+    def components(self) -> List["MemoryIndex"]:
+        """
+        Get the leaf indexes making up this index
+
+        Returns:
+            indexes: This index, or the indexes a composite index wraps
+        """
+        return [self]
+
+    @abstractmethod
+    def clear(self) -> None:
+        """Remove all items from the index"""
+
+    @abstractmethod
+    def __len__(self) -> int:
+        """Number of indexed items"""
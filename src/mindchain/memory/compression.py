@@ -0,0 +1,220 @@
+"""
+Compressed long-term storage for memory payloads
+
+Items are encoded as compact JSON and packed into fixed-size blocks that
+are zlib-compressed with a dictionary trained on the first block, so the
+field names and phrasing shared by interaction records cost almost nothing
+after the first occurrence. Blocks are decompressed on demand and a few hot
+blocks are kept decoded in an LRU.
+"""
+import json
+import logging
+import re
+import struct
+import zlib
+from array import array
+from collections import Counter, OrderedDict
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .long_term import LongTermStore
+
+logger = logging.getLogger(__name__)
+
+# JSON keys and string values, and the words inside longer strings
+_SEGMENT = re.compile(rb'"(?:[^"\\]|\\.){0,64}"[:,]?|[A-Za-z]{3,}[ .,]?')
+_COUNT = struct.Struct("<I")
+_WBITS = -15
+
+
+def encode_record(item: Dict[str, Any]) -> bytes:
+    """Encode an item as compact UTF-8 JSON"""
+    return json.dumps(item, separators=(",", ":"), ensure_ascii=False, default=str).encode("utf-8")
+
+
+def train_dictionary(samples: Iterable[bytes], size: int = 32768) -> bytes:
+    """
+    Build a zlib preset dictionary from sample records
+
+    Segments that recur across records (keys, repeated values, common
+    words) are kept, most valuable last since zlib reaches the end of the
+    dictionary with the shortest distances.
+
+    Args:
+        samples: Encoded sample records
+        size: Maximum dictionary size in bytes
+
+    Returns:
+        dictionary: The preset dictionary (empty if nothing recurs)
+    """
+    frequency: Counter = Counter()
+    for record in samples:
+        frequency.update(set(_SEGMENT.findall(record)))
+    recurring = [(count * len(segment), segment) for segment, count in frequency.items() if count > 1]
+    recurring.sort(reverse=True)
+    kept: List[bytes] = []
+    total = 0
+    for _, segment in recurring:
+        if total + len(segment) > size:
+            continue
+        kept.append(segment)
+        total += len(segment)
+    return b"".join(reversed(kept))
+
+
+class CompressedLongTermStore(LongTermStore):
+    """
+    Long-term store keeping items in dictionary-compressed blocks
+
+    Removed or replaced items are dropped from the id map; their bytes stay
+    in the sealed block until the store is cleared. Embeddings passed to
+    append_batch are not kept: the vector index already holds them, and a
+    MemoryManager opened over the store re-embeds its items when warming
+    its index.
+    """
+
+    def __init__(
+        self,
+        block_size: int = 64,
+        cache_blocks: int = 8,
+        level: int = 6,
+        dictionary: Optional[bytes] = None,
+        dictionary_size: int = 32768,
+    ) -> None:
+        """
+        Initialize the store
+
+        Args:
+            block_size: Records compressed together in one block
+            cache_blocks: Decompressed blocks kept in the LRU
+            level: zlib compression level
+            dictionary: Optional preset dictionary; by default one is
+                trained on the first block
+            dictionary_size: Maximum size of the trained dictionary
+        """
+        if block_size <= 0:
+            raise ValueError("block_size must be positive")
+        self.block_size = block_size
+        self.cache_blocks = max(1, cache_blocks)
+        self.level = level
+        self.dictionary_size = dictionary_size
+        self._dictionary = dictionary
+        self._blocks: List[bytes] = []
+        self._open: List[bytes] = []
+        self._position_ids = array("q")
+        self._positions: Dict[int, int] = {}
+        self._cache: "OrderedDict[int, List[bytes]]" = OrderedDict()
+        self.raw_bytes = 0
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+    @property
+    def dictionary(self) -> Optional[bytes]:
+        """The preset dictionary, once trained or given"""
+        return self._dictionary
+
+    @property
+    def stored_bytes(self) -> int:
+        """Bytes held by sealed blocks, the open block and the dictionary"""
+        sealed = sum(len(block) for block in self._blocks)
+        return sealed + sum(len(record) for record in self._open) + len(self._dictionary or b"")
+
+    @property
+    def compression_ratio(self) -> float:
+        """Encoded record bytes per stored byte"""
+        return self.raw_bytes / self.stored_bytes if self.stored_bytes else 1.0
+
+    def _compress(self, records: Sequence[bytes]) -> bytes:
+        lengths = np.fromiter((len(record) for record in records), dtype="<u4", count=len(records))
+        compressor = zlib.compressobj(self.level, zlib.DEFLATED, _WBITS, zdict=self._dictionary or b"")
+        data = _COUNT.pack(len(records)) + lengths.tobytes() + b"".join(records)
+        return compressor.compress(data) + compressor.flush()
+
+    def _decompress(self, block: bytes) -> List[bytes]:
+        decompressor = zlib.decompressobj(_WBITS, zdict=self._dictionary or b"")
+        data = decompressor.decompress(block) + decompressor.flush()
+        (count,) = _COUNT.unpack_from(data)
+        lengths = np.frombuffer(data, dtype="<u4", count=count, offset=_COUNT.size)
+        records = []
+        position = _COUNT.size + 4 * count
+        for length in lengths.tolist():
+            records.append(data[position:position + length])
+            position += length
+        return records
+
+    def _seal(self) -> None:
+        if self._dictionary is None:
+            self._dictionary = train_dictionary(self._open, self.dictionary_size)
+            logger.debug(f"Trained a {len(self._dictionary)} byte compression dictionary")
+        self._blocks.append(self._compress(self._open))
+        self._open = []
+
+    def _block(self, number: int) -> List[bytes]:
+        """Decoded records of a block, through the LRU"""
+        if number == len(self._blocks):
+            return self._open
+        records = self._cache.get(number)
+        if records is not None:
+            self.cache_hits += 1
+            self._cache.move_to_end(number)
+            return records
+        self.cache_misses += 1
+        records = self._decompress(self._blocks[number])
+        self._cache[number] = records
+        if len(self._cache) > self.cache_blocks:
+            self._cache.popitem(last=False)
+        return records
+
+    def append_batch(
+        self,
+        item_ids: Sequence[int],
+        items: Sequence[Dict[str, Any]],
+        embeddings: Optional[np.ndarray] = None,
+    ) -> None:
+        if not len(item_ids):
+            return
+        for item_id, item in zip(item_ids, items):
+            record = encode_record(item)
+            self.raw_bytes += len(record)
+            self._positions[int(item_id)] = len(self._position_ids)
+            self._position_ids.append(int(item_id))
+            self._open.append(record)
+            if len(self._open) >= self.block_size:
+                self._seal()
+
+    def get(self, item_id: int) -> Optional[Dict[str, Any]]:
+        position = self._positions.get(item_id)
+        if position is None:
+            return None
+        block, slot = divmod(position, self.block_size)
+        return json.loads(self._block(block)[slot])
+
+    def entries(self) -> Iterator[Tuple[int, Dict[str, Any]]]:
+        # Walk blocks directly so a full scan does not flush the hot LRU
+        sealed = len(self._blocks)
+        for number in range(sealed + 1):
+            records = self._open if number == sealed else self._decompress(self._blocks[number])
+            for slot, record in enumerate(records):
+                position = number * self.block_size + slot
+                item_id = self._position_ids[position]
+                if self._positions.get(item_id) == position:
+                    yield item_id, json.loads(record)
+
+    def remove(self, item_id: int) -> bool:
+        return self._positions.pop(item_id, None) is not None
+
+    def max_id(self) -> int:
+        return max(self._positions, default=-1)
+
+    def clear(self) -> None:
+        # The trained dictionary is kept; new items share its vocabulary
+        self._blocks.clear()
+        self._open = []
+        self._position_ids = array("q")
+        self._positions.clear()
+        self._cache.clear()
+        self.raw_bytes = 0
+
+    def __len__(self) -> int:
+        return len(self._positions)
@@ -0,0 +1,76 @@
+"""
+Summarizers that fold groups of memory items into compact records
+"""
+import logging
+import re
+from abc import ABC, abstractmethod
+from collections import Counter
+from typing import Any, Dict, List, Sequence
+
+from .text import item_text, tokenize
+
+logger = logging.getLogger(__name__)
+
+_SENTENCE_BOUNDARY = re.compile(r"(?<=[.!?])\s+|\n+")
+
+
+class Summarizer(ABC):
+    """
+    Base class for summarizers used by memory consolidation
+    """
+
+    @abstractmethod
+    async def summarize(self, items: Sequence[Dict[str, Any]]) -> str:
+        """
+        Summarize a group of memory items
+
+        Args:
+            items: The items to fold together, oldest first
+
+        Returns:
+            summary: Text of the summary record
+        """
+
+
+class ExtractiveSummarizer(Summarizer):
+    """
+    Deterministic summarizer that keeps the most representative sentences
+
+    Sentences are scored by how many of their terms recur across the
+    group, normalized by sentence length, and the best ones are kept in
+    their original order. It needs no model and always produces the same
+    summary for the same items.
+    """
+
+    def __init__(self, max_sentences: int = 5, max_chars: int = 1000) -> None:
+        """
+        Initialize the summarizer
+
+        Args:
+            max_sentences: Maximum number of sentences kept
+            max_chars: Maximum length of the summary
+        """
+        self.max_sentences = max(1, max_sentences)
+        self.max_chars = max_chars
+
+    async def summarize(self, items: Sequence[Dict[str, Any]]) -> str:
+        sentences: List[str] = []
+        seen = set()
+        for item in items:
+            for sentence in _SENTENCE_BOUNDARY.split(item_text(item)):
+                sentence = sentence.strip()
+                if sentence and sentence.lower() not in seen:
+                    seen.add(sentence.lower())
+                    sentences.append(sentence)
+        if not sentences:
+            return ""
+
+        terms = [set(tokenize(sentence)) for sentence in sentences]
+        frequency = Counter(term for sentence_terms in terms for term in sentence_terms)
+        scores = [
+            sum(frequency[term] for term in sentence_terms) / (1.0 + len(sentence_terms)) ** 0.5
+            for sentence_terms in terms
+        ]
+        ranked = sorted(range(len(sentences)), key=lambda i: (-scores[i], i))
+        kept = sorted(ranked[:self.max_sentences])
+        return " ".join(sentences[i] for i in kept)[:self.max_chars]
@@ -0,0 +1,246 @@
+"""
+Near-duplicate detection for memory items with MinHash and LSH
+
+Each item's text is reduced to a set of word shingles and summarized by a
+MinHash signature, computed once when the item is stored. Signatures are
+split into bands and hashed into LSH buckets, so finding near-duplicate
+candidates touches a few buckets instead of every stored item. Candidates
+are confirmed by their estimated Jaccard similarity.
+
+Only items with equal non-text fields (other than ignore_fields, e.g. the
+timestamp) can match: signatures are XOR-salted with a hash of those
+fields, so the same text stored by two sessions is kept twice.
+"""
+import hashlib
+import json
+import logging
+from typing import Any, Dict, List, Optional, Sequence, Set, Tuple
+
+import numpy as np
+
+from .text import TEXT_FIELDS, item_text, tokenize
+
+logger = logging.getLogger(__name__)
+
+_MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+_MAX_HASH = np.uint64(0xFFFFFFFF)
+
+#: Item field recording how many times a deduplicated item was stored
+OCCURRENCES_FIELD = "occurrences"
+
+
+def lsh_bands(threshold: float, num_perm: int) -> Tuple[int, int]:
+    """
+    Choose an LSH banding for a similarity threshold
+
+    Picks the (bands, rows) split of the signature whose S-curve midpoint
+    (1 / bands) ** (1 / rows) is closest to the threshold.
+
+    Args:
+        threshold: Jaccard similarity at which items count as duplicates
+        num_perm: Signature length
+
+    Returns:
+        bands: Number of bands
+        rows: Signature values per band
+    """
+    best = (num_perm, 1)
+    best_error = float("inf")
+    for rows in range(1, num_perm + 1):
+        if num_perm % rows:
+            continue
+        bands = num_perm // rows
+        error = abs((1.0 / bands) ** (1.0 / rows) - threshold)
+        if error < best_error:
+            best, best_error = (bands, rows), error
+    return best
+
+
+class MinHashDeduplicator:
+    """
+    Incremental near-duplicate index over memory items
+    """
+
+    def __init__(
+        self,
+        threshold: float = 0.8,
+        num_perm: int = 64,
+        shingle_size: int = 2,
+        seed: int = 1,
+        ignore_fields: Sequence[str] = ("timestamp", OCCURRENCES_FIELD),
+    ) -> None:
+        """
+        Initialize the deduplicator
+
+        Args:
+            threshold: Estimated Jaccard similarity of the items' shingle
+                sets at or above which an item is a near-duplicate
+            num_perm: Number of MinHash permutations (signature length)
+            shingle_size: Words per shingle
+            seed: Random seed for the permutations
+            ignore_fields: Non-text fields that may differ between
+                near-duplicates; every other non-text field (e.g.
+                session_id) must be equal
+        """
+        if not 0.0 < threshold <= 1.0:
+            raise ValueError("threshold must be in (0, 1]")
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.shingle_size = max(1, shingle_size)
+        self.ignore_fields = frozenset(ignore_fields)
+        self.bands, self.rows = lsh_bands(threshold, num_perm)
+        rng = np.random.default_rng(seed)
+        self._a = rng.integers(1, 1 << 32, size=num_perm, dtype=np.uint64)
+        self._b = rng.integers(0, 1 << 32, size=num_perm, dtype=np.uint64)
+        self._signatures: Dict[int, np.ndarray] = {}
+        self._buckets: List[Dict[bytes, Set[int]]] = [{} for _ in range(self.bands)]
+        self._counts: Dict[int, int] = {}
+
+    def __len__(self) -> int:
+        return len(self._signatures)
+
+    def __contains__(self, item_id: int) -> bool:
+        return item_id in self._signatures
+
+    def _shingles(self, text: str) -> Set[str]:
+        tokens = tokenize(text)
+        size = min(self.shingle_size, len(tokens))
+        return {" ".join(tokens[i:i + size]) for i in range(len(tokens) - size + 1)} if size else set()
+
+    def signature(self, item: Dict[str, Any]) -> Optional[np.ndarray]:
+        """
+        Compute the MinHash signature of an item
+
+        Args:
+            item: The memory item
+
+        Returns:
+            signature: uint32 array of shape (num_perm,), or None if the
+                item has no text
+        """
+        shingles = self._shingles(item_text(item))
+        if not shingles:
+            return None
+        hashes = np.fromiter(
+            (
+                int.from_bytes(hashlib.blake2b(s.encode("utf-8"), digest_size=4).digest(), "little")
+                for s in shingles
+            ),
+            dtype=np.uint64,
+            count=len(shingles),
+        )
+        # (a * x + b) fits in 64 bits because a, b and x are below 2**32
+        permuted = (self._a[:, None] * hashes[None, :] + self._b[:, None]) % _MERSENNE_PRIME
+        return (permuted & _MAX_HASH).min(axis=1).astype(np.uint32) ^ self._scope_salt(item)
+
+    def _scope_salt(self, item: Dict[str, Any]) -> np.uint32:
+        """Hash of the fields that must be equal for two items to match"""
+        scope = {
+            name: value for name, value in item.items()
+            if name not in TEXT_FIELDS and name not in self.ignore_fields
+        }
+        if not scope:
+            return np.uint32(0)
+        encoded = json.dumps(scope, sort_keys=True, default=str).encode("utf-8")
+        return np.uint32(int.from_bytes(hashlib.blake2b(encoded, digest_size=4).digest(), "little"))
+
+    def _band_keys(self, signature: np.ndarray) -> List[bytes]:
+        return [
+            signature[band * self.rows:(band + 1) * self.rows].tobytes()
+            for band in range(self.bands)
+        ]
+
+    def find(self, signature: Optional[np.ndarray]) -> Optional[int]:
+        """
+        Find the stored item most similar to a signature
+
+        Args:
+            signature: Signature from signature()
+
+        Returns:
+            item_id: Id of the best near-duplicate at or above the
+                threshold, or None
+        """
+        if signature is None:
+            return None
+        candidates: Set[int] = set()
+        for buckets, key in zip(self._buckets, self._band_keys(signature)):
+            candidates.update(buckets.get(key, ()))
+        best_id, best_similarity = None, self.threshold
+        for item_id in candidates:
+            similarity = float(np.mean(self._signatures[item_id] == signature))
+            if similarity >= best_similarity:
+                best_id, best_similarity = item_id, similarity
+        return best_id
+
+    def add(self, item_id: int, signature: Optional[np.ndarray], count: int = 1) -> None:
+        """
+        Register the signature of a stored item
+
+        Args:
+            item_id: Id of the item
+            signature: Signature from signature(); None is ignored
+            count: Times the item has been stored (e.g. its
+                OCCURRENCES_FIELD when reloaded)
+        """
+        if signature is None:
+            return
+        self.remove(item_id)
+        self._signatures[item_id] = signature
+        self._counts[item_id] = count
+        for buckets, key in zip(self._buckets, self._band_keys(signature)):
+            buckets.setdefault(key, set()).add(item_id)
+
+    def merge(self, item_id: int) -> int:
+        """
+        Record another occurrence of a stored item
+
+        Args:
+            item_id: Id of the item that was stored again
+
+        Returns:
+            count: Number of times the item has been stored
+        """
+        self._counts[item_id] = self._counts.get(item_id, 1) + 1
+        return self._counts[item_id]
+
+    def count(self, item_id: int) -> int:
+        """
+        Get how many times an item has been stored
+
+        Args:
+            item_id: Id of the item
+
+        Returns:
+            count: Occurrences merged into the item (0 if unknown)
+        """
+        return self._counts.get(item_id, 0)
+
+    def remove(self, item_id: int) -> bool:
+        """
+        Forget an item
+
+        Args:
+            item_id: Id of the item
+
+        Returns:
+            removed: Whether the item was present
+        """
+        signature = self._signatures.pop(item_id, None)
+        if signature is None:
+            return False
+        self._counts.pop(item_id, None)
+        for buckets, key in zip(self._buckets, self._band_keys(signature)):
+            ids = buckets.get(key)
+            if ids is not None:
+                ids.discard(item_id)
+                if not ids:
+                    del buckets[key]
+        return True
+
+    def clear(self) -> None:
+        """Forget all items"""
+        self._signatures.clear()
+        self._counts.clear()
+        for buckets in self._buckets:
+            buckets.clear()
@@ -0,0 +1,119 @@
+"""
+Embedding providers used by the vector memory indexes
+"""
+import hashlib
+import logging
+from abc import ABC, abstractmethod
+from typing import Dict, List, Sequence, Tuple
+
+import numpy as np
+
+from .text import tokenize
+
+logger = logging.getLogger(__name__)
+
+
+class EmbeddingProvider(ABC):
+    """
+    Base class for embedding providers
+
+    Providers turn a batch of texts into a float32 matrix with one
+    L2-normalized row per text, so a dot product is a cosine similarity.
+    """
+
+    #: Whether two texts can only be similar if they share a token. Retrieval
+    #: caches use this to invalidate entries per term instead of wholesale.
+    term_scoped: bool = False
+
+    @property
+    @abstractmethod
+    def dimension(self) -> int:
+        """Number of components in each embedding"""
+
+    @abstractmethod
+    def embed(self, texts: Sequence[str]) -> np.ndarray:
+        """
+        Embed a batch of texts
+
+        Args:
+            texts: The texts to embed
+
+        Returns:
+            embeddings: Array of shape (len(texts), dimension), dtype float32
+        """
+
+    def embed_one(self, text: str) -> np.ndarray:
+        """
+        Embed a single text
+
+        Args:
+            text: The text to embed
+
+        Returns:
+            embedding: Array of shape (dimension,), dtype float32
+        """
+        return self.embed([text])[0]
+
+
+class HashEmbeddingProvider(EmbeddingProvider):
+    """
+    Deterministic local embeddings based on signed feature hashing
+
+    Each token is hashed with BLAKE2b into a bucket and a sign, so the same
+    text always maps to the same vector in every process and no model or
+    network access is needed.
+    """
+
+    # Different tokens can share a bucket, so texts without a common token
+    # can still be similar
+    term_scoped = False
+
+    def __init__(self, dimension: int = 128, max_cache_size: int = 100_000) -> None:
+        """
+        Initialize the provider
+
+        Args:
+            dimension: Number of hash buckets (embedding size)
+            max_cache_size: Number of token hashes kept in the lookup cache
+        """
+        if dimension <= 0:
+            raise ValueError("dimension must be positive")
+        self._dimension = dimension
+        self._max_cache_size = max_cache_size
+        self._token_cache: Dict[str, Tuple[int, float]] = {}
+
+    @property
+    def dimension(self) -> int:
+        return self._dimension
+
+    def _hash_token(self, token: str) -> Tuple[int, float]:
+        cached = self._token_cache.get(token)
+        if cached is not None:
+            return cached
+        digest = hashlib.blake2b(token.encode("utf-8"), digest_size=8).digest()
+        value = int.from_bytes(digest, "little")
+        entry = (value % self._dimension, 1.0 if value >> 63 else -1.0)
+        if len(self._token_cache) >= self._max_cache_size:
+            self._token_cache.clear()
+        self._token_cache[token] = entry
+        return entry
+
+    def embed(self, texts: Sequence[str]) -> np.ndarray:
+        rows: List[int] = []
+        cols: List[int] = []
+        signs: List[float] = []
+        for row, text in enumerate(texts):
+            for token in tokenize(text):
+                col, sign = self._hash_token(token)
+                rows.append(row)
+                cols.append(col)
+                signs.append(sign)
+
+        matrix = np.zeros((len(texts), self._dimension), dtype=np.float32)
+        if rows:
+            np.add.at(matrix, (np.asarray(rows), np.asarray(cols)), np.asarray(signs, dtype=np.float32))
+            # Dampen repeated tokens so long texts are not dominated by filler
+            np.copyto(matrix, np.sign(matrix) * np.log1p(np.abs(matrix)))
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        np.divide(matrix, norms, out=matrix, where=norms > 0)
+        return matrix
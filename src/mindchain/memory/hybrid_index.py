@@ -0,0 +1,104 @@
+"""
+Hybrid retrieval fusing the rankings of several memory indexes
+"""
+import logging
+from typing import AbstractSet, Any, Dict, List, Optional, Sequence, Tuple
+
+from .base import MemoryIndex
+from .lexical_index import BM25Index
+from .vector_index import VectorIndex
+
+logger = logging.getLogger(__name__)
+
+
+def reciprocal_rank_fusion(
+    rankings: Sequence[Sequence[Tuple[int, float]]],
+    k: int,
+    rrf_k: int = 60,
+    weights: Optional[Sequence[float]] = None,
+) -> List[Tuple[int, float]]:
+    """
+    Merge rankings with reciprocal-rank fusion
+
+    Each item scores sum(weight / (rrf_k + rank)) over the rankings it
+    appears in, so only ranks matter and raw scores need no calibration.
+
+    Args:
+        rankings: Ranked (item_id, score) lists, best first
+        k: Maximum number of fused results
+        rrf_k: Rank offset damping the influence of top positions
+        weights: Optional weight per ranking
+
+    Returns:
+        results: Fused (item_id, score) pairs, best first
+    """
+    fused: Dict[int, float] = {}
+    for position, ranking in enumerate(rankings):
+        weight = weights[position] if weights is not None else 1.0
+        for rank, (item_id, _) in enumerate(ranking, start=1):
+            fused[item_id] = fused.get(item_id, 0.0) + weight / (rrf_k + rank)
+    return sorted(fused.items(), key=lambda pair: pair[1], reverse=True)[:k]
+
+
+class HybridIndex(MemoryIndex):
+    """
+    Index combining lexical and vector candidates with reciprocal-rank fusion
+    """
+
+    def __init__(
+        self,
+        indexes: Optional[Sequence[MemoryIndex]] = None,
+        weights: Optional[Sequence[float]] = None,
+        candidate_multiplier: int = 4,
+        rrf_k: int = 60,
+    ) -> None:
+        """
+        Initialize the index
+
+        Args:
+            indexes: Indexes whose rankings are fused (defaults to a
+                BM25Index and a VectorIndex)
+            weights: Optional weight per index
+            candidate_multiplier: Each index contributes k * multiplier
+                candidates to the fusion
+            rrf_k: Rank offset used by reciprocal-rank fusion
+        """
+        self.indexes: List[MemoryIndex] = (
+            list(indexes) if indexes is not None else [BM25Index(), VectorIndex()]
+        )
+        if not self.indexes:
+            raise ValueError("HybridIndex needs at least one index")
+        if weights is not None and len(weights) != len(self.indexes):
+            raise ValueError("weights must have one entry per index")
+        self.weights = list(weights) if weights is not None else None
+        self.candidate_multiplier = max(1, candidate_multiplier)
+        self.rrf_k = rrf_k
+
+    @property
+    def term_scoped(self) -> bool:  # type: ignore[override]
+        return all(index.term_scoped for index in self.indexes)
+
+    def components(self) -> List[MemoryIndex]:
+        return [leaf for index in self.indexes for leaf in index.components()]
+
+    def __len__(self) -> int:
+        return max(len(index) for index in self.indexes)
+
+    def add_batch(self, item_ids: Sequence[int], items: Sequence[Dict[str, Any]]) -> None:
+        for index in self.indexes:
+            index.add_batch(item_ids, items)
+
+    def remove(self, item_id: int) -> bool:
+        removed = [index.remove(item_id) for index in self.indexes]
+        return any(removed)
+
+    def search(
+        self, query: str, k: int, candidates: Optional[AbstractSet[int]] = None
+    ) -> List[Tuple[int, float]]:
+        depth = k * self.candidate_multiplier
+        rankings = [index.search(query, depth, candidates) for index in self.indexes]
+        return reciprocal_rank_fusion(rankings, k, self.rrf_k, self.weights)
+
+    def clear(self) -> None:
+        for index in self.indexes:
+            index.clear()
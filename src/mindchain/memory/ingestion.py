@@ -0,0 +1,185 @@
+"""
+Streaming bulk ingestion of documents into memory
+
+Files are memory-mapped and cut into overlapping chunks by generators, so
+only the current batch of chunks is ever held in memory. Batches are
+stored with MemoryManager.store_batch (one embedding call and one index
+update per batch) and consolidated before the next batch is read.
+"""
+import asyncio
+import logging
+import mmap
+import os
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+
+from .memory_manager import MemoryManager
+
+logger = logging.getLogger(__name__)
+
+_WHITESPACE = (b" ", b"\n", b"\t", b"\r")
+
+
+@dataclass
+class IngestionReport:
+    """Throughput report of an ingestion run"""
+    files: int = 0
+    chunks: int = 0
+    bytes: int = 0
+    batches: int = 0
+    seconds: float = 0.0
+
+    @property
+    def chunks_per_second(self) -> float:
+        return self.chunks / self.seconds if self.seconds > 0 else 0.0
+
+    @property
+    def mb_per_second(self) -> float:
+        return self.bytes / 2**20 / self.seconds if self.seconds > 0 else 0.0
+
+
+def iter_files(
+    paths: Union[str, Sequence[str]],
+    extensions: Optional[Iterable[str]] = None,
+) -> Iterator[str]:
+    """
+    Walk files and directories in a stable order
+
+    Args:
+        paths: File or directory paths
+        extensions: Optional file extensions to keep (e.g. [".md", ".txt"])
+
+    Returns:
+        files: Generator of file paths
+    """
+    if isinstance(paths, str):
+        paths = [paths]
+    wanted = {extension.lower() for extension in extensions} if extensions is not None else None
+    for path in paths:
+        if os.path.isdir(path):
+            for root, dirs, files in os.walk(path):
+                dirs.sort()
+                for name in sorted(files):
+                    if wanted is None or os.path.splitext(name)[1].lower() in wanted:
+                        yield os.path.join(root, name)
+        elif wanted is None or os.path.splitext(path)[1].lower() in wanted:
+            yield path
+
+
+def _char_boundary(data: Any, position: int) -> int:
+    """Move a byte position back onto the start of a UTF-8 character"""
+    while 0 < position < len(data) and data[position] & 0xC0 == 0x80:
+        position -= 1
+    return position
+
+
+def _next_char_boundary(data: Any, position: int) -> int:
+    """Move a byte position forward onto the start of a UTF-8 character"""
+    while 0 < position < len(data) and data[position] & 0xC0 == 0x80:
+        position += 1
+    return position
+
+
+def iter_chunks(path: str, chunk_size: int = 2000, overlap: int = 200) -> Iterator[Tuple[int, str]]:
+    """
+    Cut a memory-mapped file into overlapping text chunks
+
+    Chunks end at the last whitespace in their final stretch (the second
+    half or the last overlap bytes, whichever is shorter) when there is
+    one, so words are rarely split, and never split a UTF-8 character.
+    Consecutive chunks start at least chunk_size - overlap bytes apart.
+
+    Args:
+        path: File to read
+        chunk_size: Maximum chunk size in bytes
+        overlap: Bytes shared by consecutive chunks
+
+    Returns:
+        chunks: Generator of (byte_offset, text) pairs
+    """
+    if chunk_size <= 0 or not 0 <= overlap < chunk_size:
+        raise ValueError("Expected chunk_size > overlap >= 0")
+    if os.path.getsize(path) == 0:
+        return
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+        size = len(data)
+        step = chunk_size - overlap
+        # Snapping to whitespace after start + step leaves no gap between chunks
+        search_from = max(chunk_size // 2, step)
+        start = 0
+        while start < size:
+            end = min(size, start + chunk_size)
+            if end < size:
+                split = max(data.rfind(sep, start + search_from, end) for sep in _WHITESPACE)
+                end = split + 1 if split >= 0 else _char_boundary(data, end)
+                if end <= start:
+                    # A window shorter than one character
+                    end = _next_char_boundary(data, start + chunk_size)
+            text = data[start:end].decode("utf-8", errors="replace").strip()
+            if text:
+                yield start, text
+            if end >= size:
+                break
+            next_start = _char_boundary(data, end - overlap)
+            if next_start < start + step:
+                next_start = min(end, _next_char_boundary(data, start + step))
+            start = next_start
+
+
+async def ingest(
+    memory: MemoryManager,
+    paths: Union[str, Sequence[str]],
+    chunk_size: int = 2000,
+    overlap: int = 200,
+    batch_size: int = 256,
+    extensions: Optional[Iterable[str]] = None,
+    metadata: Optional[Dict[str, Any]] = None,
+) -> IngestionReport:
+    """
+    Stream files into memory in fixed-size batches
+
+    Each chunk is stored as {"content", "source", "offset"} plus any extra
+    metadata fields. Memory use is bounded by one batch of chunks.
+
+    Args:
+        memory: The memory manager to fill
+        paths: Files or directories to ingest
+        chunk_size: Maximum chunk size in bytes
+        overlap: Bytes shared by consecutive chunks
+        batch_size: Chunks embedded and indexed per batch
+        extensions: Optional file extensions to keep
+        metadata: Optional fields added to every chunk
+
+    Returns:
+        report: Counts and throughput of the run
+    """
+    report = IngestionReport()
+    started = time.perf_counter()
+    batch: List[Dict[str, Any]] = []
+
+    async def write() -> None:
+        await memory.store_batch(batch)
+        # Drain evicted chunks too, so pending consolidation stays bounded
+        await memory.consolidate()
+        report.batches += 1
+        batch.clear()
+        await asyncio.sleep(0)
+
+    for path in iter_files(paths, extensions):
+        report.files += 1
+        report.bytes += os.path.getsize(path)
+        for offset, text in iter_chunks(path, chunk_size, overlap):
+            batch.append({"content": text, "source": path, "offset": offset, **(metadata or {})})
+            report.chunks += 1
+            if len(batch) >= batch_size:
+                await write()
+    if batch:
+        await write()
+
+    report.seconds = time.perf_counter() - started
+    logger.info(
+        f"Ingested {report.chunks} chunks from {report.files} files "
+        f"({report.chunks_per_second:.0f} chunks/s, {report.mb_per_second:.1f} MB/s)"
+    )
+    return report
@@ -0,0 +1,358 @@
+"""
+Approximate nearest-neighbour index using an inverted file (IVF)
+
+Vectors are partitioned by a coarse spherical k-means quantizer. A query
+scores the centroids, then only the vectors of the nprobe closest lists,
+so it touches roughly nprobe / n_lists of memory. Raising nprobe trades
+latency for recall and can be tuned per index.
+"""
+import asyncio
+import logging
+from typing import AbstractSet, Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .base import MemoryIndex
+from .embeddings import EmbeddingProvider, HashEmbeddingProvider
+from .text import item_text
+from .vector_index import top_k_indices
+
+logger = logging.getLogger(__name__)
+
+
+def spherical_kmeans(
+    vectors: np.ndarray,
+    n_clusters: int,
+    iterations: int = 10,
+    seed: int = 0,
+) -> np.ndarray:
+    """
+    Cluster unit vectors by cosine similarity
+
+    Args:
+        vectors: Array of shape (n, dimension)
+        n_clusters: Number of centroids
+        iterations: Number of Lloyd iterations
+        seed: Random seed for initialization
+
+    Returns:
+        centroids: L2-normalized array of shape (n_clusters, dimension)
+    """
+    rng = np.random.default_rng(seed)
+    n = vectors.shape[0]
+    n_clusters = max(1, min(n_clusters, n))
+    centroids = vectors[rng.choice(n, size=n_clusters, replace=False)].astype(np.float32)
+    for _ in range(iterations):
+        assignments = np.argmax(vectors @ centroids.T, axis=1)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, assignments, vectors)
+        counts = np.bincount(assignments, minlength=n_clusters)
+        empty = counts == 0
+        if empty.any():
+            # Restart empty clusters from random points
+            sums[empty] = vectors[rng.choice(n, size=int(empty.sum()), replace=True)]
+        norms = np.linalg.norm(sums, axis=1, keepdims=True)
+        np.divide(sums, norms, out=sums, where=norms > 0)
+        centroids = sums
+    return centroids
+
+
+class _InvertedList:
+    """Growable contiguous block of the vectors assigned to one centroid"""
+
+    __slots__ = ("vectors", "ids", "size")
+
+    def __init__(self, dimension: int, capacity: int = 16) -> None:
+        self.vectors = np.zeros((capacity, dimension), dtype=np.float32)
+        self.ids = np.zeros(capacity, dtype=np.int64)
+        self.size = 0
+
+    def append(self, item_id: int, vector: np.ndarray) -> int:
+        if self.size == self.vectors.shape[0]:
+            capacity = self.size * 2
+            vectors = np.zeros((capacity, self.vectors.shape[1]), dtype=np.float32)
+            vectors[:self.size] = self.vectors[:self.size]
+            ids = np.zeros(capacity, dtype=np.int64)
+            ids[:self.size] = self.ids[:self.size]
+            self.vectors, self.ids = vectors, ids
+        position = self.size
+        self.vectors[position] = vector
+        self.ids[position] = item_id
+        self.size += 1
+        return position
+
+    def remove_at(self, position: int) -> Optional[int]:
+        """Swap-remove a row, returning the id moved into its place"""
+        last = self.size - 1
+        moved = None
+        if position != last:
+            self.vectors[position] = self.vectors[last]
+            self.ids[position] = self.ids[last]
+            moved = int(self.ids[position])
+        self.size = last
+        return moved
+
+
+class IVFIndex(MemoryIndex):
+    """
+    Inverted-file ANN index with incremental insertion and re-clustering
+
+    Until enough items are stored to train the coarse quantizer, the index
+    keeps a single list and searches exhaustively. Once the item count has
+    grown by recluster_growth since the last training, needs_maintenance()
+    reports True and maintain() re-clusters in a worker thread while
+    inserts and queries continue against the current lists.
+    """
+
+    def __init__(
+        self,
+        embedder: Optional[EmbeddingProvider] = None,
+        n_lists: int = 256,
+        nprobe: int = 8,
+        train_threshold: Optional[int] = None,
+        recluster_growth: float = 2.0,
+        max_train_samples: int = 50_000,
+        kmeans_iterations: int = 10,
+        min_score: float = 0.0,
+        seed: int = 0,
+    ) -> None:
+        """
+        Initialize the index
+
+        Args:
+            embedder: Embedding provider (defaults to HashEmbeddingProvider)
+            n_lists: Number of coarse centroids (inverted lists)
+            nprobe: Number of lists scanned per query
+            train_threshold: Items needed before the first training
+                (defaults to 16 * n_lists)
+            recluster_growth: Re-cluster once the item count has grown by
+                this factor since the last training
+            max_train_samples: Maximum vectors sampled for k-means
+            kmeans_iterations: Lloyd iterations per training
+            min_score: Results scoring at or below this value are dropped
+            seed: Random seed for sampling and initialization
+        """
+        self.embedder = embedder or HashEmbeddingProvider()
+        self.dimension = self.embedder.dimension
+        self.n_lists = n_lists
+        self.nprobe = nprobe
+        self.train_threshold = train_threshold if train_threshold is not None else 16 * n_lists
+        self.recluster_growth = recluster_growth
+        self.max_train_samples = max_train_samples
+        self.kmeans_iterations = kmeans_iterations
+        self.min_score = min_score
+        self.seed = seed
+        self._centroids: Optional[np.ndarray] = None
+        self._lists: List[_InvertedList] = [_InvertedList(self.dimension)]
+        self._where: Dict[int, Tuple[int, int]] = {}
+        self._trained_size = 0
+        self._rebuilding = False
+        self._journal: List[Tuple[bool, int]] = []
+        self._generation = 0
+
+    @property
+    def term_scoped(self) -> bool:  # type: ignore[override]
+        return self.embedder.term_scoped
+
+    @property
+    def is_trained(self) -> bool:
+        """Whether the coarse quantizer has been trained"""
+        return self._centroids is not None
+
+    def __len__(self) -> int:
+        return len(self._where)
+
+    def __contains__(self, item_id: int) -> bool:
+        return item_id in self._where
+
+    def add_batch(self, item_ids: Sequence[int], items: Sequence[Dict[str, Any]]) -> None:
+        if not item_ids:
+            return
+        self.add_vectors(item_ids, self.embedder.embed([item_text(item) for item in items]))
+
+    def add_vectors(self, item_ids: Sequence[int], vectors: np.ndarray) -> None:
+        """
+        Add precomputed embeddings to the index
+
+        Args:
+            item_ids: Ids of the items, aligned with vectors
+            vectors: Array of shape (len(item_ids), dimension)
+        """
+        vectors = np.asarray(vectors, dtype=np.float32)
+        if self._centroids is not None:
+            assignments = np.argmax(vectors @ self._centroids.T, axis=1)
+        else:
+            assignments = np.zeros(len(item_ids), dtype=np.int64)
+        for item_id, vector, list_no in zip(item_ids, vectors, assignments):
+            self.remove(item_id)
+            position = self._lists[list_no].append(item_id, vector)
+            self._where[item_id] = (int(list_no), position)
+            if self._rebuilding:
+                self._journal.append((True, item_id))
+
+    def remove(self, item_id: int) -> bool:
+        location = self._where.pop(item_id, None)
+        if location is None:
+            return False
+        list_no, position = location
+        moved = self._lists[list_no].remove_at(position)
+        if moved is not None:
+            self._where[moved] = (list_no, position)
+        if self._rebuilding:
+            self._journal.append((False, item_id))
+        return True
+
+    def _vector_of(self, item_id: int) -> Optional[np.ndarray]:
+        location = self._where.get(item_id)
+        if location is None:
+            return None
+        list_no, position = location
+        return self._lists[list_no].vectors[position].copy()
+
+    def search(
+        self, query: str, k: int, candidates: Optional[AbstractSet[int]] = None
+    ) -> List[Tuple[int, float]]:
+        return self.search_vector(self.embedder.embed_one(query), k, candidates=candidates)
+
+    def search_vector(
+        self,
+        query_vector: np.ndarray,
+        k: int,
+        nprobe: Optional[int] = None,
+        candidates: Optional[AbstractSet[int]] = None,
+    ) -> List[Tuple[int, float]]:
+        """
+        Top-k search for a query embedding
+
+        Args:
+            query_vector: Array of shape (dimension,)
+            k: Maximum number of results
+            nprobe: Lists to scan (defaults to the index setting)
+            candidates: Optional ids to restrict the search to; these are
+                scored exactly instead of probing lists
+
+        Returns:
+            results: (item_id, score) pairs, best first
+        """
+        if not self._where or k <= 0:
+            return []
+        if candidates is not None:
+            locations = [self._where[item_id] for item_id in candidates if item_id in self._where]
+            if not locations:
+                return []
+            ids = np.array(
+                [self._lists[list_no].ids[position] for list_no, position in locations],
+                dtype=np.int64,
+            )
+            vectors = np.stack(
+                [self._lists[list_no].vectors[position] for list_no, position in locations]
+            )
+            scores = vectors @ query_vector
+            return [
+                (int(ids[p]), float(scores[p]))
+                for p in top_k_indices(scores, k)
+                if scores[p] > self.min_score
+            ]
+        if self._centroids is None:
+            probed = [self._lists[0]]
+        else:
+            centroid_scores = self._centroids @ query_vector
+            probed = [self._lists[i] for i in top_k_indices(centroid_scores, nprobe or self.nprobe)]
+
+        scores = [lst.vectors[:lst.size] @ query_vector for lst in probed if lst.size]
+        if not scores:
+            return []
+        ids = np.concatenate([lst.ids[:lst.size] for lst in probed if lst.size])
+        scores = np.concatenate(scores)
+        return [
+            (int(ids[p]), float(scores[p]))
+            for p in top_k_indices(scores, k)
+            if scores[p] > self.min_score
+        ]
+
+    def needs_maintenance(self) -> bool:
+        if self._rebuilding or len(self._where) < self.train_threshold:
+            return False
+        return (
+            self._centroids is None
+            or len(self._where) >= self._trained_size * self.recluster_growth
+        )
+
+    def _snapshot(self) -> Tuple[np.ndarray, np.ndarray]:
+        ids = np.concatenate([lst.ids[:lst.size] for lst in self._lists])
+        vectors = np.concatenate([lst.vectors[:lst.size] for lst in self._lists])
+        return ids, vectors
+
+    def _train(self, ids: np.ndarray, vectors: np.ndarray) -> Tuple[np.ndarray, List[_InvertedList], Dict[int, Tuple[int, int]]]:
+        """Cluster a snapshot and build the inverted lists for it"""
+        rng = np.random.default_rng(self.seed)
+        sample = vectors
+        if len(vectors) > self.max_train_samples:
+            sample = vectors[rng.choice(len(vectors), self.max_train_samples, replace=False)]
+        centroids = spherical_kmeans(sample, self.n_lists, self.kmeans_iterations, self.seed)
+        assignments = np.argmax(vectors @ centroids.T, axis=1)
+
+        lists: List[_InvertedList] = []
+        where: Dict[int, Tuple[int, int]] = {}
+        order = np.argsort(assignments, kind="stable")
+        bounds = np.searchsorted(assignments[order], np.arange(len(centroids) + 1))
+        for list_no in range(len(centroids)):
+            rows = order[bounds[list_no]:bounds[list_no + 1]]
+            lst = _InvertedList(self.dimension, capacity=max(16, 2 * len(rows)))
+            lst.vectors[:len(rows)] = vectors[rows]
+            lst.ids[:len(rows)] = ids[rows]
+            lst.size = len(rows)
+            for position, item_id in enumerate(ids[rows].tolist()):
+                where[item_id] = (list_no, position)
+            lists.append(lst)
+        return centroids, lists, where
+
+    def _install(self, centroids: np.ndarray, lists: List[_InvertedList], where: Dict[int, Tuple[int, int]]) -> None:
+        """Swap in rebuilt lists and replay changes made while training"""
+        journal, self._journal = self._journal, []
+        self._rebuilding = False
+        pending: Dict[int, Optional[np.ndarray]] = {}
+        for added, item_id in journal:
+            pending[item_id] = self._vector_of(item_id) if added else None
+
+        self._centroids, self._lists, self._where = centroids, lists, where
+        self._trained_size = len(where)
+        for item_id, vector in pending.items():
+            self.remove(item_id)
+            if vector is not None:
+                self.add_vectors([item_id], vector[None, :])
+        logger.debug(f"IVF index re-clustered into {len(centroids)} lists over {len(self._where)} items")
+
+    def recluster(self) -> None:
+        """Re-cluster the index synchronously"""
+        if not self._where:
+            return
+        self._install(*self._train(*self._snapshot()))
+
+    async def maintain(self) -> None:
+        """Re-cluster in a worker thread, then swap in the new lists"""
+        if self._rebuilding or not self._where:
+            return
+        self._rebuilding = True
+        self._journal = []
+        generation = self._generation
+        try:
+            trained = await asyncio.get_running_loop().run_in_executor(
+                None, self._train, *self._snapshot()
+            )
+        except BaseException:
+            self._rebuilding = False
+            self._journal = []
+            raise
+        if generation == self._generation:
+            self._install(*trained)
+
+    def clear(self) -> None:
+        self._centroids = None
+        self._lists = [_InvertedList(self.dimension)]
+        self._where.clear()
+        self._trained_size = 0
+        self._rebuilding = False
+        self._journal = []
+        # Discard any re-clustering still running against the old contents
+        self._generation += 1
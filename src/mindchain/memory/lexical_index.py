@@ -0,0 +1,131 @@
+"""
+BM25 lexical index for memory retrieval without embeddings
+"""
+import heapq
+import logging
+import math
+from collections import Counter
+from typing import AbstractSet, Any, Dict, List, Optional, Sequence, Tuple
+
+from .base import MemoryIndex
+from .text import item_text, tokenize
+
+logger = logging.getLogger(__name__)
+
+
+class BM25Index(MemoryIndex):
+    """
+    Incremental inverted index ranked with Okapi BM25
+
+    Each insert touches only the postings of the item's own terms, and a
+    query only visits the postings of its terms, so cost grows with the
+    number of matching items rather than the size of memory.
+    """
+
+    term_scoped = True
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75, common_term_ratio: float = 0.5) -> None:
+        """
+        Initialize the index
+
+        Args:
+            k1: Term frequency saturation parameter
+            b: Document length normalization parameter
+            common_term_ratio: Once rarer query terms have matched at least
+                k items, terms found in more than this fraction of items
+                only rescore those matches instead of walking their (long)
+                posting lists
+        """
+        self.k1 = k1
+        self.b = b
+        self.common_term_ratio = common_term_ratio
+        self._postings: Dict[str, Dict[int, int]] = {}
+        self._doc_terms: Dict[int, Dict[str, int]] = {}
+        self._doc_lengths: Dict[int, int] = {}
+        self._total_length = 0
+
+    def __len__(self) -> int:
+        return len(self._doc_lengths)
+
+    def __contains__(self, item_id: int) -> bool:
+        return item_id in self._doc_lengths
+
+    def add_batch(self, item_ids: Sequence[int], items: Sequence[Dict[str, Any]]) -> None:
+        for item_id, item in zip(item_ids, items):
+            self.add_text(item_id, item_text(item))
+
+    def add_text(self, item_id: int, text: str) -> None:
+        """
+        Index raw text under an item id
+
+        Args:
+            item_id: Id of the item
+            text: The text to index
+        """
+        if item_id in self._doc_lengths:
+            self.remove(item_id)
+        tokens = tokenize(text)
+        counts = dict(Counter(tokens))
+        for term, tf in counts.items():
+            self._postings.setdefault(term, {})[item_id] = tf
+        self._doc_terms[item_id] = counts
+        self._doc_lengths[item_id] = len(tokens)
+        self._total_length += len(tokens)
+
+    def remove(self, item_id: int) -> bool:
+        counts = self._doc_terms.pop(item_id, None)
+        if counts is None:
+            return False
+        for term in counts:
+            postings = self._postings[term]
+            del postings[item_id]
+            if not postings:
+                del self._postings[term]
+        self._total_length -= self._doc_lengths.pop(item_id)
+        return True
+
+    def _idf(self, df: int) -> float:
+        n = len(self._doc_lengths)
+        return math.log(1.0 + (n - df + 0.5) / (df + 0.5))
+
+    def search(
+        self, query: str, k: int, candidates: Optional[AbstractSet[int]] = None
+    ) -> List[Tuple[int, float]]:
+        n = len(self._doc_lengths)
+        if n == 0 or k <= 0:
+            return []
+        terms = [term for term in set(tokenize(query)) if term in self._postings]
+        if not terms:
+            return []
+
+        avg_length = self._total_length / n
+        k1, b = self.k1, self.b
+        lengths = self._doc_lengths
+        scores: Dict[int, float] = {}
+        common_df = self.common_term_ratio * n
+
+        # Rare terms first: their postings seed the candidate set
+        for term in sorted(terms, key=lambda t: len(self._postings[t])):
+            postings = self._postings[term]
+            idf = self._idf(len(postings))
+            if candidates is not None:
+                # Walk whichever side is smaller: the postings or the filter
+                if len(candidates) < len(postings):
+                    pairs = [(doc, postings[doc]) for doc in candidates if doc in postings]
+                else:
+                    pairs = [(doc, tf) for doc, tf in postings.items() if doc in candidates]
+            elif len(scores) >= k and len(postings) > common_df:
+                pairs = [(doc, postings[doc]) for doc in scores if doc in postings]
+            else:
+                pairs = postings.items()
+            for doc, tf in pairs:
+                norm = k1 * (1.0 - b + b * lengths[doc] / avg_length)
+                scores[doc] = scores.get(doc, 0.0) + idf * tf * (k1 + 1.0) / (tf + norm)
+
+        return heapq.nlargest(k, scores.items(), key=lambda pair: pair[1])
+
+    def clear(self) -> None:
+        self._postings.clear()
+        self._doc_terms.clear()
+        self._doc_lengths.clear()
+        self._total_length = 0
@@ -0,0 +1,125 @@
+"""
+Long-term memory stores
+"""
+import logging
+from abc import ABC, abstractmethod
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class LongTermStore(ABC):
+    """
+    Base class for long-term memory stores
+
+    Stores hold items consolidated out of short-term memory, addressed by
+    the integer ids assigned by the MemoryManager.
+    """
+
+    @abstractmethod
+    def append_batch(
+        self,
+        item_ids: Sequence[int],
+        items: Sequence[Dict[str, Any]],
+        embeddings: Optional[np.ndarray] = None,
+    ) -> None:
+        """
+        Append a batch of items
+
+        Args:
+            item_ids: Ids of the items, aligned with items
+            items: The memory items
+            embeddings: Optional embeddings aligned with items
+        """
+
+    @abstractmethod
+    def get(self, item_id: int) -> Optional[Dict[str, Any]]:
+        """
+        Get an item by id
+
+        Args:
+            item_id: Id of the item
+
+        Returns:
+            item: The item, or None if it is not stored
+        """
+
+    @abstractmethod
+    def entries(self) -> Iterator[Tuple[int, Dict[str, Any]]]:
+        """Iterate over (item_id, item) pairs in insertion order"""
+
+    @abstractmethod
+    def clear(self) -> None:
+        """Remove all items"""
+
+    @abstractmethod
+    def __len__(self) -> int:
+        """Number of stored items"""
+
+    def remove(self, item_id: int) -> bool:
+        """
+        Remove an item by id
+
+        Args:
+            item_id: Id of the item
+
+        Returns:
+            removed: Whether the item was present (stores that cannot delete
+                return False)
+        """
+        return False
+
+    def embedding_matrix(self) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+        """
+        Get the stored embeddings, if the store keeps them
+
+        Returns:
+            matrix: (ids, embeddings) arrays aligned by row, or None
+        """
+        return None
+
+    def max_id(self) -> int:
+        """Largest stored item id, or -1 when empty"""
+        return max((item_id for item_id, _ in self.entries()), default=-1)
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        for _, item in self.entries():
+            yield item
+
+    def close(self) -> None:
+        """Release any resources held by the store"""
+
+
+class InMemoryLongTermStore(LongTermStore):
+    """Long-term store keeping items in an insertion-ordered dict"""
+
+    def __init__(self) -> None:
+        self._items: Dict[int, Dict[str, Any]] = {}
+
+    def append_batch(
+        self,
+        item_ids: Sequence[int],
+        items: Sequence[Dict[str, Any]],
+        embeddings: Optional[np.ndarray] = None,
+    ) -> None:
+        self._items.update(zip(item_ids, items))
+
+    def get(self, item_id: int) -> Optional[Dict[str, Any]]:
+        return self._items.get(item_id)
+
+    def entries(self) -> Iterator[Tuple[int, Dict[str, Any]]]:
+        return iter(list(self._items.items()))
+
+    def remove(self, item_id: int) -> bool:
+        return self._items.pop(item_id, None) is not None
+
+    def max_id(self) -> int:
+        return max(self._items, default=-1)
+
+    def clear(self) -> None:
+        self._items.clear()
+
+    def __len__(self) -> int:
+        return len(self._items)
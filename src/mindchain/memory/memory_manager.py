@@ -1,68 +1,823 @@
 """
 Memory Manager for storing and retrieving information for agents
 """
+import asyncio
 import logging
-from typing import Dict, List, Any, Optional
+from collections import OrderedDict
+from typing import Callable, Dict, List, Any, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from ..core.errors import MemoryError
+from .base import MemoryIndex
+from .consolidation import Summarizer
+from .dedup import OCCURRENCES_FIELD, MinHashDeduplicator
+from .long_term import InMemoryLongTermStore, LongTermStore
+from .metadata_index import MetadataIndex
+from .quantization import QuantizedVectorIndex
+from .retrieval_cache import RetrievalCache, normalize_query
+from .short_term import EvictionPolicy, ShortTermBuffer
+from .snapshot import SnapshotLongTermStore, SnapshotReader, write_snapshot
+from .text import item_text, tokenize
+from .vector_index import VectorIndex
+from .weighted_index import WeightedVectorIndex
 
 logger = logging.getLogger(__name__)
 
+
+def _running_loop() -> Optional[asyncio.AbstractEventLoop]:
+    """
+    Get the running event loop
+
+    Background work scheduled from a sync call outside any loop (e.g.
+    snapshot() after asyncio.run()) is deferred: the next store() or
+    consolidate() call schedules or runs it.
+
+    Returns:
+        loop: The running loop, or None outside one
+    """
+    try:
+        return asyncio.get_running_loop()
+    except RuntimeError:
+        return None
+
+
 class MemoryManager:
     """
     Memory Manager handles storage and retrieval of information for agents
+
+    New items enter a fixed-capacity short-term buffer. Items evicted from
+    it are consolidated into long-term memory in batches by a background
+    task, and stay reachable through the index. With a summarizer, old
+    short-term items are instead folded into summary records.
     """
-    
-    def __init__(self) -> None:
-        """Initialize the memory manager with empty storage"""
-        self.short_term_memory: List[Dict[str, Any]] = []
-        self.long_term_memory: List[Dict[str, Any]] = []
+
+    def __init__(
+        self,
+        index: Optional[MemoryIndex] = None,
+        top_k: int = 5,
+        short_term_capacity: int = 1000,
+        eviction_policy: Union[EvictionPolicy, str] = EvictionPolicy.FIFO,
+        importance_fn: Optional[Callable[[Dict[str, Any]], float]] = None,
+        long_term_store: Optional[LongTermStore] = None,
+        consolidation_batch_size: int = 32,
+        retrieval_cache: Optional[RetrievalCache] = None,
+        write_behind: bool = False,
+        write_buffer_size: int = 1024,
+        write_batch_size: int = 128,
+        metadata_index: Optional[MetadataIndex] = None,
+        deduplicator: Optional[MinHashDeduplicator] = None,
+        summarizer: Optional[Summarizer] = None,
+        summary_batch_size: int = 16,
+        summary_threshold: Optional[int] = None,
+        summary_interval: float = 1.0,
+    ) -> None:
+        """
+        Initialize the memory manager with empty storage
+
+        Args:
+            index: Optional index used to rank items against a query
+                (VectorIndex for embeddings, BM25Index for lexical
+                retrieval, HybridIndex for both). Without one, the most
+                recent items are returned.
+            top_k: Default number of items returned by retrieve_relevant
+            short_term_capacity: Maximum number of items in short-term memory
+            eviction_policy: Which item is evicted when short-term memory is
+                full ("fifo", "lru" or "importance")
+            importance_fn: Scores items for the importance policy (defaults
+                to the item's "importance" field)
+            long_term_store: Store for consolidated items (defaults to an
+                in-memory store). Items already in the store are added to
+                the index on startup.
+            consolidation_batch_size: Number of evicted items written to
+                long-term memory per consolidation batch
+            retrieval_cache: Optional cache of query results, invalidated
+                as new items are stored
+            write_behind: Buffer stored items and index them in batches from
+                a background task instead of inside store(). Reads through
+                this manager flush the buffer first, so they always see
+                earlier writes.
+            write_buffer_size: Maximum number of buffered items before
+                store() writes the buffer itself
+            write_batch_size: Number of buffered items indexed per batch
+            metadata_index: Optional timestamp and field index enabling the
+                since/until/where filters of retrieve_relevant
+            deduplicator: Optional near-duplicate detector; items it matches
+                are counted against the stored item (in its "occurrences"
+                field, with the newer timestamp) instead of stored again
+            summarizer: Optional summarizer. Once short-term memory holds
+                summary_threshold items, a background task folds the oldest
+                summary_batch_size of them into one summary record in
+                long-term memory, replacing the originals.
+            summary_batch_size: Number of items folded into each summary
+            summary_threshold: Short-term item count that triggers folding
+                (defaults to three quarters of the short-term capacity)
+            summary_interval: Minimum seconds between two summaries
+        """
+        self.short_term_memory = ShortTermBuffer(
+            capacity=short_term_capacity,
+            policy=eviction_policy,
+            importance_fn=importance_fn,
+        )
+        self.long_term_memory: LongTermStore = (
+            long_term_store if long_term_store is not None else InMemoryLongTermStore()
+        )
+        self.index = index
+        self.top_k = top_k
+        self.consolidation_batch_size = max(1, consolidation_batch_size)
+        self.retrieval_cache = retrieval_cache
+        self.metadata_index = metadata_index
+        self.deduplicator = deduplicator
+        self.summarizer = summarizer
+        self.summary_batch_size = max(1, summary_batch_size)
+        self.summary_threshold = (
+            summary_threshold if summary_threshold is not None
+            else max(self.summary_batch_size, 3 * short_term_capacity // 4)
+        )
+        self.summary_interval = summary_interval
+        self._summary_task: Optional[asyncio.Task] = None
+        self._last_summary = float("-inf")
+        self.write_behind = write_behind
+        self.write_buffer_size = max(1, write_buffer_size)
+        self.write_batch_size = max(1, write_batch_size)
+        self._write_buffer: List[Dict[str, Any]] = []
+        self._write_task: Optional[asyncio.Task] = None
+        self._pending: "OrderedDict[int, Dict[str, Any]]" = OrderedDict()
+        self._consolidation_task: Optional[asyncio.Task] = None
+        self._maintenance_task: Optional[asyncio.Task] = None
+        self._next_id = self.long_term_memory.max_id() + 1
+        self._stats = {
+            "evicted_count": 0,
+            "consolidated_count": 0,
+            "consolidation_batches": 0,
+            "write_batches": 0,
+            "duplicates_merged": 0,
+            "summaries_created": 0,
+            "summarized_count": 0,
+        }
+        if self.index is not None:
+            for component in self.index.components():
+                if isinstance(component, QuantizedVectorIndex) and component.text_lookup is None:
+                    component.text_lookup = self._get_item_text
+            if len(self.long_term_memory):
+                self._warm_index()
+        if self.metadata_index is not None or self.deduplicator is not None:
+            for item_id, item in self.long_term_memory.entries():
+                if self.metadata_index is not None:
+                    self.metadata_index.add(item_id, item)
+                if self.deduplicator is not None:
+                    self.deduplicator.add(
+                        item_id, self.deduplicator.signature(item), item.get(OCCURRENCES_FIELD, 1)
+                    )
         logger.info("Memory Manager initialized")
-    
+
+    def _vector_index(self) -> Optional[VectorIndex]:
+        """Get the VectorIndex among the index components, if any"""
+        if self.index is None:
+            return None
+        for component in self.index.components():
+            if isinstance(component, VectorIndex):
+                return component
+        return None
+
+    def _warm_index(self, batch_size: int = 1024) -> None:
+        """Index the items already held by the long-term store"""
+        components = [index for index in self.index.components() if not index.persistent]
+        vector_index = self._vector_index()
+        weighted: Optional[WeightedVectorIndex] = None
+        matrix = self.long_term_memory.embedding_matrix()
+        if (
+            vector_index is not None
+            and matrix is not None
+            and matrix[1].shape[1] == vector_index.dimension
+        ):
+            # Score the stored embeddings in place instead of re-embedding
+            vector_index.attach_base(*matrix)
+            components = [index for index in components if index is not vector_index]
+            if isinstance(vector_index, WeightedVectorIndex):
+                # The ranking weights still come from the items themselves
+                weighted = vector_index
+        if not components and weighted is None:
+            return
+
+        ids: List[int] = []
+        items: List[Dict[str, Any]] = []
+        for item_id, item in self.long_term_memory.entries():
+            ids.append(item_id)
+            items.append(item)
+            if len(ids) >= batch_size:
+                self._warm_batch(components, weighted, ids, items)
+                ids, items = [], []
+        self._warm_batch(components, weighted, ids, items)
+
+    @staticmethod
+    def _warm_batch(
+        components: List[MemoryIndex],
+        weighted: Optional[WeightedVectorIndex],
+        ids: List[int],
+        items: List[Dict[str, Any]],
+    ) -> None:
+        for index in components:
+            index.add_batch(ids, items)
+        if weighted is not None:
+            weighted.set_weights(ids, items)
+
     async def store(self, item: Dict[str, Any]) -> None:
         """
         Store an item in memory
-        
+
+        In write-behind mode the item is buffered and indexed later by a
+        background task; use flush() to index buffered items immediately.
+
         Args:
             item: The item to store
         """
-        # In a real implementation, this would use vector embeddings
-        # and proper storage mechanisms
-        self.short_term_memory.append(item)
-        logger.debug(f"Item stored in short-term memory: {item}")
-    
-    async def retrieve_relevant(self, query: str) -> List[Dict[str, Any]]:
+        if not self.write_behind:
+            self._write_batch([item])
+            return
+        self._write_buffer.append(item)
+        if len(self._write_buffer) >= self.write_buffer_size:
+            # Buffer full: apply backpressure by writing on the caller's path
+            self._apply_writes()
+        elif self._write_task is None or self._write_task.done():
+            self._write_task = asyncio.get_running_loop().create_task(self._drain_writes())
+
+    async def store_batch(self, items: Sequence[Dict[str, Any]]) -> None:
+        """
+        Store several items in memory with one index update
+
+        Args:
+            items: The items to store
+        """
+        if self.write_behind:
+            self._apply_writes()
+        for start in range(0, len(items), self.write_batch_size):
+            self._write_batch(items[start:start + self.write_batch_size])
+
+    def _write_batch(self, items: Sequence[Dict[str, Any]]) -> None:
+        """
+        Add a batch of items to short-term memory and the index
+
+        The index is updated first. If that fails (e.g. the embedder
+        raises), the batch is rolled back before anything else changes, so
+        writing it again cannot duplicate items.
+        """
+        duplicates: List[Tuple[int, Dict[str, Any]]] = []
+        if self.deduplicator is not None:
+            items, duplicates = self._split_duplicates(items)
+        item_ids = list(range(self._next_id, self._next_id + len(items)))
+        if self.index is not None and items:
+            try:
+                self.index.add_batch(item_ids, items)
+            except Exception:
+                for item_id in item_ids:
+                    self.index.remove(item_id)
+                    if self.deduplicator is not None:
+                        self.deduplicator.remove(item_id)
+                raise
+        self._next_id += len(items)
+        for item_id, item in zip(item_ids, items):
+            evicted = self.short_term_memory.put(item_id, item)
+            if self.metadata_index is not None:
+                self.metadata_index.add(item_id, item)
+            if evicted is not None:
+                self._pending[evicted[0]] = evicted[1]
+                self._stats["evicted_count"] += 1
+        for duplicate_of, repeat in duplicates:
+            self._merge_duplicate(duplicate_of, repeat)
+        if not items:
+            return
+        if self.index is not None:
+            for item in items:
+                self._invalidate_cache(item)
+            self._schedule_maintenance()
+        self._stats["write_batches"] += 1
+        logger.debug(f"Stored {len(items)} items in short-term memory")
+
+        if len(self._pending) >= self.consolidation_batch_size:
+            self._schedule_consolidation()
+        if self.summarizer is not None and len(self.short_term_memory) >= self.summary_threshold:
+            self._schedule_summaries()
+
+    def _split_duplicates(
+        self, items: Sequence[Dict[str, Any]]
+    ) -> Tuple[List[Dict[str, Any]], List[Tuple[int, Dict[str, Any]]]]:
+        """
+        Separate near-duplicates from the items to store
+
+        Args:
+            items: Items about to be stored
+
+        Returns:
+            unique: The items that are not near-duplicates, registered with
+                the deduplicator under the ids they will be stored with
+            duplicates: (id of the repeated item, near-duplicate) pairs
+        """
+        unique: List[Dict[str, Any]] = []
+        duplicates: List[Tuple[int, Dict[str, Any]]] = []
+        for item in items:
+            signature = self.deduplicator.signature(item)
+            duplicate_of = self.deduplicator.find(signature)
+            if duplicate_of is not None:
+                duplicates.append((duplicate_of, item))
+                continue
+            self.deduplicator.add(self._next_id + len(unique), signature)
+            unique.append(item)
+        return unique, duplicates
+
+    def _merge_duplicate(self, item_id: int, repeat: Dict[str, Any]) -> None:
+        """
+        Fold a near-duplicate into the item it repeats
+
+        The kept item records its occurrence count in OCCURRENCES_FIELD,
+        so the count survives consolidation and snapshots, and takes the
+        repeat's newer timestamp, so time filters and recency weighting
+        treat it as recent.
+
+        Args:
+            item_id: Id of the kept item
+            repeat: The near-duplicate that was not stored
+        """
+        count = self.deduplicator.merge(item_id)
+        self.short_term_memory.touch(item_id)
+        self._stats["duplicates_merged"] += 1
+        item = self._get_item(item_id)
+        if item is None:
+            return
+        item[OCCURRENCES_FIELD] = count
+        timestamp = repeat.get("timestamp")
+        previous = item.get("timestamp")
+        if not isinstance(timestamp, (int, float)) or (
+            isinstance(previous, (int, float)) and previous >= timestamp
+        ):
+            return
+        item["timestamp"] = timestamp
+        if self.metadata_index is not None:
+            self.metadata_index.remove(item_id)
+            self.metadata_index.add(item_id, item)
+        vector_index = self._vector_index()
+        if isinstance(vector_index, WeightedVectorIndex):
+            vector_index.set_weights([item_id], [item])
+
+    def _apply_writes(self) -> None:
+        """Write every buffered item now"""
+        while self._write_buffer:
+            batch = self._write_buffer[:self.write_batch_size]
+            self._write_batch(batch)
+            del self._write_buffer[:len(batch)]
+
+    async def _drain_writes(self) -> None:
+        """Write buffered items in batches from the background"""
+        # Yield first so items stored in the same turn share a batch
+        await asyncio.sleep(0)
+        while self._write_buffer:
+            batch = self._write_buffer[:self.write_batch_size]
+            try:
+                self._write_batch(batch)
+            except Exception:
+                # Leave the batch buffered; flush() surfaces the error
+                logger.exception("Write-behind batch failed")
+                return
+            del self._write_buffer[:len(batch)]
+            await asyncio.sleep(0)
+
+    async def flush(self) -> None:
+        """Write all buffered items to short-term memory and the index"""
+        self._apply_writes()
+
+    async def aclose(self) -> None:
+        """
+        Flush buffered writes, consolidate pending items and close the
+        long-term store
+        """
+        await self.flush()
+        if self._summary_task is not None:
+            self._summary_task.cancel()
+            self._summary_task = None
+        await self.consolidate()
+        task = self._maintenance_task
+        if task is not None and not task.done():
+            await task
+        self.long_term_memory.close()
+
+    async def retrieve_relevant(
+        self,
+        query: str,
+        k: Optional[int] = None,
+        since: Optional[float] = None,
+        until: Optional[float] = None,
+        where: Optional[Dict[str, Any]] = None,
+    ) -> List[Dict[str, Any]]:
         """
         Retrieve items relevant to a query
-        
+
+        Filters select candidate ids from the metadata index first; only
+        those candidates are then scored against the query.
+
         Args:
             query: The query to find relevant items for
-            
+            k: Maximum number of items to return (defaults to top_k)
+            since: Only items with a timestamp at or after this value
+            until: Only items with a timestamp at or before this value
+            where: Only items whose indexed fields equal these values
+
         Returns:
-            relevant_items: List of relevant items
+            relevant_items: List of relevant items, most relevant first
+        """
+        k = self.top_k if k is None else k
+        # Read-your-writes: buffered items become visible before searching
+        self._apply_writes()
+
+        candidates = None
+        if since is not None or until is not None or where:
+            if self.metadata_index is None:
+                raise MemoryError("Filtered retrieval requires a metadata index")
+            candidates = self.metadata_index.select(since, until, where)
+            if not candidates:
+                return []
+
+        unranked = self.index is None or len(self.index) == 0
+        if unranked or (candidates is not None and not query.strip()):
+            if candidates is None:
+                # Without an index, fall back to the most recent items
+                return self.short_term_memory.recent(k)
+            # Ids grow with insertion order, so the largest are the newest
+            newest = sorted(candidates)[-k:] if k > 0 else []
+            return [item for item in map(self._get_item, newest) if item is not None]
+
+        cache_key = None
+        item_ids = None
+        if self.retrieval_cache is not None and candidates is None:
+            cache_key = (normalize_query(query), k)
+            item_ids = self.retrieval_cache.get(cache_key)
+        if item_ids is None:
+            item_ids = [item_id for item_id, _ in self.index.search(query, k, candidates)]
+            if cache_key is not None:
+                self.retrieval_cache.put(cache_key, tokenize(query), item_ids)
+
+        relevant = []
+        for item_id in item_ids:
+            item = self._get_item(item_id)
+            if item is not None:
+                self.short_term_memory.touch(item_id)
+                relevant.append(item)
+        return relevant
+
+    def _invalidate_cache(self, item: Dict[str, Any]) -> None:
+        """Drop cached results a newly stored item could change"""
+        if self.retrieval_cache is None or not len(self.retrieval_cache):
+            return
+        if self.index.term_scoped:
+            self.retrieval_cache.invalidate_terms(tokenize(item_text(item)))
+        else:
+            self.retrieval_cache.clear()
+
+    def _get_item(self, item_id: int) -> Optional[Dict[str, Any]]:
+        """Look an item up across short-term, pending and long-term memory"""
+        item = self.short_term_memory.get(item_id)
+        if item is None:
+            item = self._pending.get(item_id)
+        if item is None:
+            item = self.long_term_memory.get(item_id)
+        return item
+
+    def _get_item_text(self, item_id: int) -> Optional[str]:
+        """Look up the searchable text of an item"""
+        item = self._get_item(item_id)
+        return item_text(item) if item is not None else None
+
+    def _schedule_maintenance(self) -> None:
+        """Run index maintenance (e.g. IVF re-clustering) in the background"""
+        if self._maintenance_task is not None and not self._maintenance_task.done():
+            return
+        due = [index for index in self.index.components() if index.needs_maintenance()]
+        loop = _running_loop()
+        if due and loop is not None:
+            self._maintenance_task = loop.create_task(self._maintain_indexes(due))
+
+    async def _maintain_indexes(self, indexes: List[MemoryIndex]) -> None:
+        for index in indexes:
+            try:
+                await index.maintain()
+            except Exception:
+                logger.exception(f"Maintenance of {type(index).__name__} failed")
+
+    def _schedule_consolidation(self) -> None:
+        """Start the background consolidation task unless one is running"""
+        loop = _running_loop()
+        if loop is not None and (self._consolidation_task is None or self._consolidation_task.done()):
+            self._consolidation_task = loop.create_task(self._consolidate_pending())
+
+    async def _consolidate_pending(self, drain: bool = False) -> None:
         """
-        # In a real implementation, this would use semantic search
-        # For now, just return recent items as a simple demonstration
-        # Limited to last 5 items to avoid context overflow
-        return self.short_term_memory[-5:] if self.short_term_memory else []
-    
+        Move pending evicted items into long-term memory in batches
+
+        Args:
+            drain: Also write a final partial batch instead of leaving it
+                for the next run
+        """
+        while len(self._pending) >= self.consolidation_batch_size or (drain and self._pending):
+            # Yield first so the batch write never runs inside store()
+            await asyncio.sleep(0)
+            batch = []
+            while self._pending and len(batch) < self.consolidation_batch_size:
+                batch.append(self._pending.popitem(last=False))
+            if not batch:
+                break
+            item_ids = [item_id for item_id, _ in batch]
+            vector_index = self._vector_index()
+            embeddings = vector_index.vectors_for(item_ids) if vector_index is not None else None
+            try:
+                self.long_term_memory.append_batch(
+                    item_ids, [item for _, item in batch], embeddings
+                )
+            except Exception:
+                # Put the batch back so no evicted item is lost
+                for item_id, item in reversed(batch):
+                    self._pending[item_id] = item
+                    self._pending.move_to_end(item_id, last=False)
+                logger.exception("Memory consolidation failed")
+                if drain:
+                    raise
+                return
+            self._stats["consolidated_count"] += len(batch)
+            self._stats["consolidation_batches"] += 1
+            logger.debug(f"Consolidated {len(batch)} items into long-term memory")
+
+    def _schedule_summaries(self) -> None:
+        """Start the background summarization task unless one is running"""
+        loop = _running_loop()
+        if loop is not None and (self._summary_task is None or self._summary_task.done()):
+            self._summary_task = loop.create_task(self._summarize_backlog())
+
+    async def _summarize_backlog(self) -> None:
+        """Fold old short-term items into summaries, at most one per interval"""
+        loop = asyncio.get_running_loop()
+        while self.summarizer is not None and len(self.short_term_memory) >= self.summary_threshold:
+            # Always yield, and wait out the rate limit, before summarizing
+            await asyncio.sleep(max(0.0, self._last_summary + self.summary_interval - loop.time()))
+            self._last_summary = loop.time()
+            try:
+                folded = await self.summarize()
+            except Exception:
+                logger.exception("Memory summarization failed")
+                return
+            if not folded:
+                return
+
+    async def summarize(self) -> int:
+        """
+        Fold the oldest short-term items into one summary record now
+
+        The summary is written to long-term memory and indexed; the folded
+        items are removed from short-term memory and the index.
+
+        Returns:
+            folded: Number of items folded into the summary
+        """
+        if self.summarizer is None:
+            return 0
+        self._apply_writes()
+        item_ids = self.short_term_memory.ids()[:self.summary_batch_size]
+        if not item_ids:
+            return 0
+        items = [self.short_term_memory.get(item_id) for item_id in item_ids]
+        text = await self.summarizer.summarize(items)
+
+        # Items may have been evicted or cleared while the summarizer ran
+        folded = [
+            (item_id, item) for item_id, item in zip(item_ids, items)
+            if item_id in self.short_term_memory
+        ]
+        if not folded or not text:
+            return 0
+        timestamps = [
+            item["timestamp"] for _, item in folded
+            if isinstance(item.get("timestamp"), (int, float))
+        ]
+        summary = {
+            "type": "summary",
+            "content": text,
+            "summary_of": [item_id for item_id, _ in folded],
+        }
+        if timestamps:
+            summary["timestamp"] = max(timestamps)
+
+        for item_id, _ in folded:
+            self.short_term_memory.remove(item_id)
+            if self.index is not None:
+                self.index.remove(item_id)
+            if self.metadata_index is not None:
+                self.metadata_index.remove(item_id)
+            if self.deduplicator is not None:
+                self.deduplicator.remove(item_id)
+
+        summary_id = self._next_id
+        self._next_id += 1
+        embeddings = None
+        if self.index is not None:
+            self.index.add(summary_id, summary)
+            vector_index = self._vector_index()
+            if vector_index is not None:
+                embeddings = vector_index.vectors_for([summary_id])
+        self.long_term_memory.append_batch([summary_id], [summary], embeddings)
+        if self.metadata_index is not None:
+            self.metadata_index.add(summary_id, summary)
+        if self.retrieval_cache is not None:
+            self.retrieval_cache.clear()
+        self._stats["summaries_created"] += 1
+        self._stats["summarized_count"] += len(folded)
+        logger.debug(f"Folded {len(folded)} short-term items into summary {summary_id}")
+        return len(folded)
+
+    async def consolidate(self) -> None:
+        """Consolidate all pending evicted items into long-term memory now"""
+        task = self._consolidation_task
+        if task is not None and not task.done():
+            await task
+        await self._consolidate_pending(drain=True)
+
+    def snapshot(
+        self,
+        path: str,
+        metadata: Optional[Dict[str, Any]] = None,
+        consolidated: bool = False,
+    ) -> None:
+        """
+        Write the contents of memory to a binary snapshot file
+
+        Buffered writes are applied first. Long-term, pending and short-term
+        items are written with their ids and embeddings, so a manager
+        created with restore() resumes where this one left off.
+
+        Args:
+            path: Destination file
+            metadata: Optional JSON-serializable data stored with the items
+            consolidated: Write every item as long-term, so a restore maps
+                all of their embeddings in place (used for read-only
+                replicas; the short-term buffer restores empty)
+        """
+        self._apply_writes()
+        short_term = self.short_term_memory.entries()
+        tiers = [list(self.long_term_memory.entries()), list(self._pending.items()), short_term]
+        if consolidated:
+            tiers = [[row for tier in tiers for row in tier], [], []]
+            short_term = []
+        count = sum(len(tier) for tier in tiers)
+        embeddings = None
+        vector_index = self._vector_index()
+        if vector_index is not None:
+            embeddings = vector_index.vectors_for([item_id for tier in tiers for item_id, _ in tier])
+        importance = np.zeros(count, dtype=np.float64)
+        if short_term:
+            importance[count - len(short_term):] = [
+                self.short_term_memory.importance_fn(item) for _, item in short_term
+            ]
+        write_snapshot(
+            path, tiers, embeddings, importance,
+            meta={"next_id": self._next_id, "stats": self._stats, "metadata": metadata or {}},
+        )
+        logger.info(f"Memory snapshot of {count} items written to {path}")
+
+    @classmethod
+    def restore(cls, path: str, **options: Any) -> "MemoryManager":
+        """
+        Create a memory manager from a snapshot file
+
+        The file is memory-mapped: long-term items are decoded on demand,
+        stored embeddings are attached to the vector index without
+        re-embedding, and short-term items are decoded the first time they
+        are read.
+
+        Args:
+            path: Snapshot file written by snapshot()
+            **options: MemoryManager constructor arguments. When
+                long_term_store is given it is used in place of the
+                snapshot's long-term items.
+
+        Returns:
+            manager: The restored memory manager
+        """
+        reader = SnapshotReader(path)
+        if options.get("long_term_store") is None:
+            options["long_term_store"] = SnapshotLongTermStore(reader)
+        manager = cls(**options)
+        manager._load_snapshot(reader)
+        return manager
+
+    def _load_snapshot(self, reader: SnapshotReader) -> None:
+        """Restore the pending and short-term tiers of a snapshot"""
+        pending, short_term = reader.tier(1), reader.tier(2)
+        # Short-term rows beyond this buffer's capacity are consolidated
+        overflow = max(0, (short_term.stop - short_term.start) - self.short_term_memory.capacity)
+        for row in range(pending.start, short_term.start + overflow):
+            self._pending[int(reader.ids[row])] = reader.decode(row)
+        loaded = slice(short_term.start + overflow, short_term.stop)
+        self.short_term_memory.load(
+            reader.ids[loaded].tolist(), reader.importance[loaded], reader.get
+        )
+        self._next_id = max(self._next_id, int(reader.meta.get("next_id", 0)))
+        for name, value in reader.meta.get("stats", {}).items():
+            if name in self._stats:
+                self._stats[name] = value
+
+        rows = slice(pending.start, short_term.stop)
+        item_ids = reader.ids[rows].tolist()
+        if not item_ids:
+            return
+        if self.index is not None:
+            components = self.index.components()
+            vector_index = self._vector_index()
+            if (
+                vector_index is not None
+                and reader.embeddings is not None
+                and reader.dimension == vector_index.dimension
+            ):
+                vector_index.add_vectors(item_ids, reader.embeddings[rows])
+                components = [index for index in components if index is not vector_index]
+                if isinstance(vector_index, WeightedVectorIndex):
+                    vector_index.set_weights(item_ids, [self._get_item(i) for i in item_ids])
+            if components:
+                items = [self._get_item(item_id) for item_id in item_ids]
+                for index in components:
+                    index.add_batch(item_ids, items)
+        if self.metadata_index is not None:
+            timestamps_only = (
+                not self.metadata_index.fields and self.metadata_index.timestamp_field == "timestamp"
+            )
+            for row, item_id in zip(range(rows.start, rows.stop), item_ids):
+                if timestamps_only:
+                    # The timestamp column is enough; skip decoding the item
+                    item = {"timestamp": reader.timestamp(row)}
+                else:
+                    item = self._get_item(item_id)
+                self.metadata_index.add(item_id, item)
+        if self.deduplicator is not None:
+            for item_id in item_ids:
+                item = self._get_item(item_id)
+                self.deduplicator.add(
+                    item_id, self.deduplicator.signature(item), item.get(OCCURRENCES_FIELD, 1)
+                )
+        if len(self._pending) >= self.consolidation_batch_size:
+            self._schedule_consolidation()
+
     def clear_short_term(self) -> None:
-        """Clear short-term memory"""
-        self.short_term_memory = []
+        """Clear short-term memory, discarding buffered writes"""
+        self._write_buffer.clear()
+        for item_id in self.short_term_memory.ids():
+            if self.index is not None:
+                self.index.remove(item_id)
+            if self.metadata_index is not None:
+                self.metadata_index.remove(item_id)
+            if self.deduplicator is not None:
+                self.deduplicator.remove(item_id)
+        self.short_term_memory.clear()
+        if self.retrieval_cache is not None:
+            self.retrieval_cache.clear()
         logger.debug("Short-term memory cleared")
-    
+
     def clear_all(self) -> None:
         """Clear all memory"""
-        self.short_term_memory = []
-        self.long_term_memory = []
+        for task in (
+            self._consolidation_task, self._maintenance_task, self._write_task, self._summary_task
+        ):
+            if task is not None:
+                task.cancel()
+        self._consolidation_task = None
+        self._maintenance_task = None
+        self._write_task = None
+        self._summary_task = None
+        self._write_buffer.clear()
+        if self.index is not None:
+            self.index.clear()
+        self.short_term_memory.clear()
+        self.long_term_memory.clear()
+        self._pending.clear()
+        if self.metadata_index is not None:
+            self.metadata_index.clear()
+        if self.deduplicator is not None:
+            self.deduplicator.clear()
+        if self.retrieval_cache is not None:
+            self.retrieval_cache.clear()
         logger.debug("All memory cleared")
-    
+
     def get_memory_status(self) -> Dict[str, Any]:
         """
         Get the status of the memory system
-        
+
         Returns:
             status: Dictionary with memory status information
         """
         return {
             "short_term_count": len(self.short_term_memory),
-            "long_term_count": len(self.long_term_memory)
-        }
\ No newline at end of file
+            "short_term_capacity": self.short_term_memory.capacity,
+            "eviction_policy": self.short_term_memory.policy.value,
+            "long_term_count": len(self.long_term_memory),
+            "pending_consolidation": len(self._pending),
+            "write_buffer_count": len(self._write_buffer),
+            "indexed_count": len(self.index) if self.index is not None else 0,
+            **self._stats,
+            "retrieval_cache": (
+                self.retrieval_cache.get_stats() if self.retrieval_cache is not None else None
+            ),
+        }
@@ -0,0 +1,159 @@
+"""
+Secondary indexes over memory item metadata
+
+Timestamps are kept in a sorted array searched with bisect, and chosen
+fields get hash indexes from value to item ids. Filtered retrieval uses
+them to select candidate ids without scanning every stored item.
+"""
+import logging
+from bisect import bisect_left, bisect_right
+from typing import Any, Dict, Hashable, List, Optional, Sequence, Set, Tuple
+
+from ..core.errors import MemoryError
+
+logger = logging.getLogger(__name__)
+
+
+class MetadataIndex:
+    """
+    Time-range and field-equality index over memory items
+    """
+
+    def __init__(self, fields: Sequence[str] = (), timestamp_field: str = "timestamp") -> None:
+        """
+        Initialize the index
+
+        Args:
+            fields: Item fields to build hash indexes for (e.g. "agent_id",
+                "step_id")
+            timestamp_field: Item field holding the numeric timestamp
+        """
+        self.timestamp_field = timestamp_field
+        self._fields: Dict[str, Dict[Hashable, Set[int]]] = {name: {} for name in fields}
+        self._times: List[float] = []
+        self._time_ids: List[int] = []
+        self._keys: Dict[int, Tuple[Optional[float], Dict[str, Hashable]]] = {}
+
+    @property
+    def fields(self) -> List[str]:
+        """Names of the indexed fields"""
+        return list(self._fields)
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def add(self, item_id: int, item: Dict[str, Any]) -> None:
+        """
+        Index the metadata of an item
+
+        Args:
+            item_id: Id of the item
+            item: The memory item
+        """
+        self.remove(item_id)
+        timestamp = item.get(self.timestamp_field)
+        if isinstance(timestamp, (int, float)):
+            timestamp = float(timestamp)
+            # Timestamps mostly arrive in order, so this is usually an append
+            position = bisect_right(self._times, timestamp)
+            self._times.insert(position, timestamp)
+            self._time_ids.insert(position, item_id)
+        else:
+            timestamp = None
+
+        values: Dict[str, Hashable] = {}
+        for name, postings in self._fields.items():
+            value = item.get(name)
+            if value is None:
+                continue
+            try:
+                postings.setdefault(value, set()).add(item_id)
+            except TypeError:
+                # Unhashable values cannot be looked up by equality
+                continue
+            values[name] = value
+        self._keys[item_id] = (timestamp, values)
+
+    def remove(self, item_id: int) -> bool:
+        """
+        Remove an item from the index
+
+        Args:
+            item_id: Id of the item
+
+        Returns:
+            removed: Whether the item was present
+        """
+        keys = self._keys.pop(item_id, None)
+        if keys is None:
+            return False
+        timestamp, values = keys
+        if timestamp is not None:
+            position = bisect_left(self._times, timestamp)
+            while self._time_ids[position] != item_id:
+                position += 1
+            del self._times[position]
+            del self._time_ids[position]
+        for name, value in values.items():
+            ids = self._fields[name][value]
+            ids.discard(item_id)
+            if not ids:
+                del self._fields[name][value]
+        return True
+
+    def select(
+        self,
+        since: Optional[float] = None,
+        until: Optional[float] = None,
+        where: Optional[Dict[str, Any]] = None,
+    ) -> Set[int]:
+        """
+        Select the ids of items matching every given condition
+
+        Args:
+            since: Earliest timestamp, inclusive
+            until: Latest timestamp, inclusive
+            where: Field -> value conditions on indexed fields; a list, tuple
+                or set value matches any of its elements
+
+        Returns:
+            item_ids: Ids of the matching items
+        """
+        matches: List[Set[int]] = []
+        for name, value in (where or {}).items():
+            postings = self._fields.get(name)
+            if postings is None:
+                raise MemoryError(f"Field '{name}' is not indexed")
+            if isinstance(value, (list, tuple, set, frozenset)):
+                matches.append(set().union(*(postings.get(v, ()) for v in value)))
+            else:
+                matches.append(postings.get(value, set()))
+
+        if since is None and until is None:
+            if not matches:
+                return set(self._keys)
+            matches.sort(key=len)
+            return set(matches[0]).intersection(*matches[1:])
+
+        lo = 0 if since is None else bisect_left(self._times, since)
+        hi = len(self._times) if until is None else bisect_right(self._times, until)
+        if matches:
+            matches.sort(key=len)
+            if len(matches[0]) < hi - lo:
+                # The field match is the narrower filter: check its timestamps
+                low = float("-inf") if since is None else since
+                high = float("inf") if until is None else until
+                selected = {
+                    item_id for item_id in matches[0]
+                    if self._keys[item_id][0] is not None and low <= self._keys[item_id][0] <= high
+                }
+                return selected.intersection(*matches[1:])
+        return set(self._time_ids[lo:hi]).intersection(*matches)
+
+    def clear(self) -> None:
+        """Remove all items from the index"""
+        for postings in self._fields.values():
+            postings.clear()
+        self._times.clear()
+        self._time_ids.clear()
+        self._keys.clear()
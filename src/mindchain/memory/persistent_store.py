@@ -0,0 +1,326 @@
+"""
+Persistent long-term memory store backed by memory-mapped files
+
+Layout of a store directory:
+
+    meta.json       format version and embedding dimension
+    records.log     append-only log of length-prefixed JSON payloads
+    offsets.idx     fixed-width (id, offset, length) rows, one per record
+    embeddings.f32  fixed-width float32 rows aligned with offsets.idx
+
+Rows are committed by appending to offsets.idx last, so readers never see
+a row whose payload or embedding is missing. A writer opening the store
+cuts embeddings.f32 and offsets.idx back to the committed rows, dropping
+whatever a crash left behind after the last commit. Opening a store only
+maps the files; payloads are decoded on demand, and read-only opens share
+their pages with every other process mapping the same files.
+"""
+import json
+import logging
+import mmap
+import os
+import struct
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from ..core.errors import MemoryError
+from .long_term import LongTermStore
+
+logger = logging.getLogger(__name__)
+
+FORMAT_VERSION = 1
+
+_OFFSET_DTYPE = np.dtype([("id", "<i8"), ("offset", "<i8"), ("length", "<i8")])
+_LENGTH_PREFIX = struct.Struct("<I")
+
+
+def _merge_runs(
+    older: Tuple[np.ndarray, np.ndarray],
+    newer: Tuple[np.ndarray, np.ndarray],
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Merge two sorted (ids, rows) runs, keeping older rows first among equal ids"""
+    older_ids, older_rows = older
+    newer_ids, newer_rows = newer
+    if older_ids[-1] <= newer_ids[0]:
+        return np.concatenate([older_ids, newer_ids]), np.concatenate([older_rows, newer_rows])
+    positions = np.searchsorted(older_ids, newer_ids, side="right") + np.arange(len(newer_ids))
+    from_newer = np.zeros(len(older_ids) + len(newer_ids), dtype=bool)
+    from_newer[positions] = True
+    ids = np.empty(len(from_newer), dtype=np.int64)
+    rows = np.empty(len(from_newer), dtype=np.int64)
+    ids[positions], rows[positions] = newer_ids, newer_rows
+    ids[~from_newer], rows[~from_newer] = older_ids, older_rows
+    return ids, rows
+
+
+class PersistentLongTermStore(LongTermStore):
+    """
+    Long-term store persisting items and embeddings to a directory
+
+    A single process should open the store for writing; any number of
+    processes may open it with readonly=True and call refresh() to pick up
+    rows appended since they opened it.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        dimension: Optional[int] = None,
+        readonly: bool = False,
+        sync: bool = False,
+    ) -> None:
+        """
+        Open or create a store
+
+        Args:
+            path: Directory holding the store files
+            dimension: Embedding dimension; taken from the existing store or
+                the first appended embeddings when omitted
+            readonly: Open without write access (for sharing across workers)
+            sync: fsync the files after every appended batch
+        """
+        self.path = path
+        self.readonly = readonly
+        self.sync = sync
+        self._meta_path = os.path.join(path, "meta.json")
+        self._records_path = os.path.join(path, "records.log")
+        self._offsets_path = os.path.join(path, "offsets.idx")
+        self._embeddings_path = os.path.join(path, "embeddings.f32")
+
+        if os.path.exists(self._meta_path):
+            with open(self._meta_path, "r") as f:
+                meta = json.load(f)
+            if meta.get("version") != FORMAT_VERSION:
+                raise MemoryError(f"Unsupported memory store version: {meta.get('version')}")
+            stored_dimension = meta.get("dimension")
+            if dimension is not None and stored_dimension not in (None, dimension):
+                raise MemoryError(
+                    f"Store at {path} has dimension {stored_dimension}, not {dimension}"
+                )
+            self.dimension = stored_dimension
+        elif readonly:
+            raise MemoryError(f"No memory store found at {path}")
+        else:
+            os.makedirs(path, exist_ok=True)
+            self.dimension = dimension
+            self._write_meta()
+
+        self._record_file = None
+        self._offset_file = None
+        self._embedding_file = None
+        if not readonly:
+            self._discard_uncommitted()
+            self._record_file = open(self._records_path, "ab")
+            self._offset_file = open(self._offsets_path, "ab")
+
+        self._records_map: Optional[mmap.mmap] = None
+        self._offsets = np.empty(0, dtype=_OFFSET_DTYPE)
+        self._embeddings: Optional[np.ndarray] = None
+        self._runs: List[Tuple[np.ndarray, np.ndarray]] = []
+        self._count = 0
+        self.refresh()
+        logger.info(f"Opened persistent memory store at {path} with {self._count} items")
+
+    def _write_meta(self) -> None:
+        tmp_path = self._meta_path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({"version": FORMAT_VERSION, "dimension": self.dimension}, f)
+        os.replace(tmp_path, self._meta_path)
+
+    def _discard_uncommitted(self) -> None:
+        """Truncate rows written after the last commit, e.g. by a crashed writer"""
+        if not os.path.exists(self._offsets_path):
+            return
+        count = os.path.getsize(self._offsets_path) // _OFFSET_DTYPE.itemsize
+        os.truncate(self._offsets_path, count * _OFFSET_DTYPE.itemsize)
+        # records.log needs no cut: offsets point into it and appends start at its end
+        if self.dimension and (count or os.path.exists(self._embeddings_path)):
+            expected = count * self.dimension * 4
+            if not os.path.exists(self._embeddings_path):
+                open(self._embeddings_path, "wb").close()
+            size = os.path.getsize(self._embeddings_path)
+            if size != expected:
+                logger.warning(
+                    f"Resizing {self._embeddings_path} from {size} to {expected} bytes "
+                    f"to match {count} committed rows"
+                )
+                # Extends with zero rows if the dimension was set but never backfilled
+                os.truncate(self._embeddings_path, expected)
+
+    def refresh(self) -> None:
+        """Map rows appended to the files since the last refresh"""
+        size = os.path.getsize(self._offsets_path) if os.path.exists(self._offsets_path) else 0
+        count = size // _OFFSET_DTYPE.itemsize
+        if count == self._count and self._count:
+            return
+        self._map(count)
+
+    def _map(self, count: int) -> None:
+        """Map the first count rows and index the ids of rows not seen before"""
+        # Mapping is lazy, so remapping the grown files costs the same at any size
+        if count:
+            self._offsets = np.memmap(self._offsets_path, dtype=_OFFSET_DTYPE, mode="r", shape=(count,))
+        else:
+            self._offsets = np.empty(0, dtype=_OFFSET_DTYPE)
+
+        if self._records_map is not None:
+            self._records_map.close()
+            self._records_map = None
+        if count and os.path.getsize(self._records_path):
+            with open(self._records_path, "rb") as f:
+                self._records_map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        if self.dimension and count and os.path.exists(self._embeddings_path):
+            self._embeddings = np.memmap(
+                self._embeddings_path, dtype=np.float32, mode="r", shape=(count, self.dimension)
+            )
+        else:
+            self._embeddings = None
+
+        self._index_ids(self._count, count)
+        self._count = count
+
+    def _index_ids(self, old_count: int, new_count: int) -> None:
+        """
+        Add the ids of rows old_count..new_count to the lookup
+
+        The lookup is a list of sorted (ids, rows) runs, oldest rows first.
+        New rows form a run of their own, merged into earlier runs while
+        those are not more than twice its size: there are O(log n) runs and
+        each id takes part in O(log n) merges, so appending stays cheap as
+        the store grows.
+        """
+        if old_count == 0 or new_count < old_count:
+            self._runs = []
+            old_count = 0
+        if new_count == old_count:
+            return
+        ids = np.array(self._offsets["id"][old_count:new_count], dtype=np.int64)
+        rows = np.arange(old_count, new_count, dtype=np.int64)
+        # Ids assigned by the MemoryManager are usually already ascending
+        if np.any(ids[1:] < ids[:-1]):
+            order = np.argsort(ids, kind="stable")
+            ids, rows = ids[order], rows[order]
+        self._runs.append((ids, rows))
+        while len(self._runs) > 1 and len(self._runs[-2][0]) <= 2 * len(self._runs[-1][0]):
+            newer = self._runs.pop()
+            older = self._runs.pop()
+            self._runs.append(_merge_runs(older, newer))
+
+    def _row_of(self, item_id: int) -> Optional[int]:
+        for sorted_ids, sorted_rows in self._runs:
+            position = int(np.searchsorted(sorted_ids, item_id))
+            if position < len(sorted_ids) and sorted_ids[position] == item_id:
+                return int(sorted_rows[position])
+        return None
+
+    def _decode(self, row: int) -> Dict[str, Any]:
+        record = self._offsets[row]
+        start = int(record["offset"]) + _LENGTH_PREFIX.size
+        return json.loads(self._records_map[start:start + int(record["length"])])
+
+    def append_batch(
+        self,
+        item_ids: Sequence[int],
+        items: Sequence[Dict[str, Any]],
+        embeddings: Optional[np.ndarray] = None,
+    ) -> None:
+        if self.readonly:
+            raise MemoryError("Cannot append to a read-only memory store")
+        if not item_ids:
+            return
+
+        if embeddings is not None:
+            embeddings = np.asarray(embeddings, dtype=np.float32)
+            if self.dimension is None:
+                self.dimension = int(embeddings.shape[1])
+                self._write_meta()
+                if self._count:
+                    # Keep embedding rows aligned with rows stored without one
+                    with open(self._embeddings_path, "wb") as f:
+                        f.write(bytes(self._count * self.dimension * 4))
+            elif embeddings.shape[1] != self.dimension:
+                raise MemoryError(
+                    f"Expected embeddings of dimension {self.dimension}, got {embeddings.shape[1]}"
+                )
+        elif self.dimension:
+            embeddings = np.zeros((len(item_ids), self.dimension), dtype=np.float32)
+
+        offset = self._record_file.tell()
+        rows = np.empty(len(item_ids), dtype=_OFFSET_DTYPE)
+        chunks = []
+        for i, (item_id, item) in enumerate(zip(item_ids, items)):
+            payload = json.dumps(item, separators=(",", ":"), default=str).encode("utf-8")
+            rows[i] = (item_id, offset, len(payload))
+            chunks.append(_LENGTH_PREFIX.pack(len(payload)))
+            chunks.append(payload)
+            offset += _LENGTH_PREFIX.size + len(payload)
+        self._record_file.write(b"".join(chunks))
+        self._record_file.flush()
+
+        if embeddings is not None:
+            if self._embedding_file is None:
+                self._embedding_file = open(self._embeddings_path, "ab")
+            self._embedding_file.write(embeddings.tobytes())
+            self._embedding_file.flush()
+
+        # The offsets row is the commit point for readers
+        self._offset_file.write(rows.tobytes())
+        self._offset_file.flush()
+        if self.sync:
+            for f in (self._record_file, self._embedding_file, self._offset_file):
+                if f is not None:
+                    os.fsync(f.fileno())
+        self._map(self._count + len(item_ids))
+
+    def get(self, item_id: int) -> Optional[Dict[str, Any]]:
+        row = self._row_of(item_id)
+        return self._decode(row) if row is not None else None
+
+    def entries(self) -> Iterator[Tuple[int, Dict[str, Any]]]:
+        for row in range(self._count):
+            yield int(self._offsets[row]["id"]), self._decode(row)
+
+    @property
+    def ids(self) -> np.ndarray:
+        """Ids of the stored items in row order"""
+        return np.asarray(self._offsets["id"])
+
+    def embedding_matrix(self) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+        if self._embeddings is None:
+            return None
+        return self.ids, self._embeddings
+
+    def max_id(self) -> int:
+        return max((int(sorted_ids[-1]) for sorted_ids, _ in self._runs), default=-1)
+
+    def clear(self) -> None:
+        if self.readonly:
+            raise MemoryError("Cannot clear a read-only memory store")
+        self._release_maps()
+        for f in (self._record_file, self._offset_file, self._embedding_file):
+            if f is not None:
+                f.truncate(0)
+                f.seek(0)
+        if os.path.exists(self._embeddings_path):
+            open(self._embeddings_path, "wb").close()
+        self._count = 0
+        self._map(0)
+
+    def _release_maps(self) -> None:
+        if self._records_map is not None:
+            self._records_map.close()
+            self._records_map = None
+        self._offsets = np.empty(0, dtype=_OFFSET_DTYPE)
+        self._embeddings = None
+
+    def close(self) -> None:
+        self._release_maps()
+        for f in (self._record_file, self._offset_file, self._embedding_file):
+            if f is not None:
+                f.close()
+        self._record_file = self._offset_file = self._embedding_file = None
+
+    def __len__(self) -> int:
+        return self._count
@@ -0,0 +1,219 @@
+"""
+Compact embedding storage for vector indexes
+
+Embeddings can be stored as float16 (half the size of float32) or as int8
+codes with one float32 scale per vector (about a quarter of the size).
+Scores are computed by dequantizing fixed-size row blocks on the fly, so a
+full float32 copy of the matrix is never materialized. Converting float16
+is noticeably slower than int8 on CPUs where NumPy has no hardware
+half-precision conversion; scripts/benchmark_memory_quantization.py
+reports the recall, memory and latency of each option.
+"""
+import logging
+from enum import Enum
+from typing import AbstractSet, Callable, List, Optional, Tuple, Union
+
+import numpy as np
+
+from .embeddings import EmbeddingProvider
+from .vector_index import VectorIndex
+
+logger = logging.getLogger(__name__)
+
+
+class EmbeddingStorage(str, Enum):
+    """Element type used to store embeddings"""
+    FLOAT32 = "float32"
+    FLOAT16 = "float16"
+    INT8 = "int8"
+
+
+def quantize_int8(vectors: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Quantize vectors to int8 with a symmetric per-vector scale
+
+    Args:
+        vectors: Array of shape (n, dimension)
+
+    Returns:
+        codes: int8 array of shape (n, dimension)
+        scales: float32 array of shape (n,) such that vectors ~= codes * scales
+    """
+    vectors = np.asarray(vectors, dtype=np.float32)
+    scales = np.abs(vectors).max(axis=1) / 127.0
+    scales[scales == 0] = 1.0
+    codes = np.rint(vectors / scales[:, None]).astype(np.int8)
+    return codes, scales.astype(np.float32)
+
+
+def dequantize_int8(codes: np.ndarray, scales: np.ndarray) -> np.ndarray:
+    """
+    Reconstruct float32 vectors from int8 codes
+
+    Args:
+        codes: int8 array of shape (n, dimension)
+        scales: float32 array of shape (n,)
+
+    Returns:
+        vectors: float32 array of shape (n, dimension)
+    """
+    return codes.astype(np.float32) * scales[:, None]
+
+
+class QuantizedVectorIndex(VectorIndex):
+    """
+    VectorIndex storing embeddings as float16 or scaled int8
+
+    With rerank > 0, the best rerank candidates from the quantized scores
+    are rescored exactly before the top k are returned, recovering most of
+    the recall lost to quantization. The exact vectors come from a
+    memory-mapped float32 copy at exact_path, of which a query only reads
+    the shortlisted rows. Without exact_path, the candidates' texts are
+    looked up with text_lookup and re-embedded on every query, which costs
+    a model call per search with anything but a local embedder.
+    MemoryManager sets text_lookup automatically.
+    """
+
+    def __init__(
+        self,
+        embedder: Optional[EmbeddingProvider] = None,
+        storage: Union[EmbeddingStorage, str] = EmbeddingStorage.INT8,
+        rerank: int = 0,
+        text_lookup: Optional[Callable[[int], Optional[str]]] = None,
+        initial_capacity: int = 1024,
+        min_score: float = 0.0,
+        block_size: int = 16384,
+        exact_path: Optional[str] = None,
+    ) -> None:
+        """
+        Initialize the index
+
+        Args:
+            embedder: Embedding provider (defaults to HashEmbeddingProvider)
+            storage: Element type of the stored embeddings
+            rerank: Number of candidates rescored exactly (0 disables).
+                Without exact_path each search re-embeds up to rerank texts
+            text_lookup: Returns the text of an item id, for re-ranking
+                without exact_path
+            initial_capacity: Number of rows to preallocate
+            min_score: Results scoring at or below this value are dropped
+            block_size: Rows dequantized per scoring block
+            exact_path: File keeping float32 copies of the embeddings for
+                re-ranking; it is memory-mapped, so the copy stays on disk
+                and in evictable page cache rather than in the heap
+        """
+        super().__init__(embedder, initial_capacity, min_score)
+        self.storage = EmbeddingStorage(storage)
+        self.rerank = rerank
+        self.text_lookup = text_lookup
+        self.block_size = max(1, block_size)
+        capacity = self._vectors.shape[0]
+        self._vectors = np.zeros((capacity, self.dimension), dtype=self.storage.value)
+        self._scales = np.ones(capacity, dtype=np.float32)
+        self.exact_path = exact_path
+        self._exact: Optional[np.memmap] = None
+        if exact_path is not None:
+            self._exact = np.memmap(exact_path, dtype=np.float32, mode="w+", shape=self._vectors.shape)
+
+    @property
+    def vectors(self) -> np.ndarray:
+        """Dequantized copy of the stored embeddings"""
+        return self._dequantize(0, self._size)
+
+    @property
+    def nbytes(self) -> int:
+        """Bytes used in memory by the stored embeddings (excluding exact_path)"""
+        per_row = self.dimension * self._vectors.itemsize
+        if self.storage == EmbeddingStorage.INT8:
+            per_row += self._scales.itemsize
+        return self._size * per_row
+
+    def _dequantize(self, start: int, stop: int) -> np.ndarray:
+        block = self._vectors[start:stop].astype(np.float32)
+        if self.storage == EmbeddingStorage.INT8:
+            block *= self._scales[start:stop, None]
+        return block
+
+    def _reserve(self, needed: int) -> None:
+        capacity = self._vectors.shape[0]
+        super()._reserve(needed)
+        if self._vectors.shape[0] != capacity:
+            scales = np.ones(self._vectors.shape[0], dtype=np.float32)
+            scales[:self._size] = self._scales[:self._size]
+            self._scales = scales
+            if self._exact is not None:
+                # Opening the file with a larger shape extends it
+                self._exact.flush()
+                self._exact = np.memmap(
+                    self.exact_path, dtype=np.float32, mode="r+", shape=self._vectors.shape
+                )
+
+    def _write_rows(self, positions: np.ndarray, vectors: np.ndarray) -> None:
+        if self.storage == EmbeddingStorage.INT8:
+            codes, scales = quantize_int8(vectors)
+            self._vectors[positions] = codes
+            self._scales[positions] = scales
+        else:
+            self._vectors[positions] = vectors.astype(self._vectors.dtype)
+        if self._exact is not None:
+            self._exact[positions] = vectors
+
+    def _move_row(self, src: int, dst: int) -> None:
+        super()._move_row(src, dst)
+        self._scales[dst] = self._scales[src]
+        if self._exact is not None:
+            self._exact[dst] = self._exact[src]
+
+    def _read_row(self, position: int) -> np.ndarray:
+        if self._exact is not None:
+            return np.array(self._exact[position])
+        return self._dequantize(position, position + 1)[0]
+
+    def _score_rows(self, query_vector: np.ndarray) -> np.ndarray:
+        scores = np.empty(self._size, dtype=np.float32)
+        for start in range(0, self._size, self.block_size):
+            stop = min(self._size, start + self.block_size)
+            np.dot(self._vectors[start:stop].astype(np.float32), query_vector, out=scores[start:stop])
+        if self.storage == EmbeddingStorage.INT8:
+            scores *= self._scales[:self._size]
+        return scores
+
+    def _score_positions(self, positions: np.ndarray, query_vector: np.ndarray) -> np.ndarray:
+        scores = self._vectors[positions].astype(np.float32) @ query_vector
+        if self.storage == EmbeddingStorage.INT8:
+            scores *= self._scales[positions]
+        return scores
+
+    def search(
+        self, query: str, k: int, candidates: Optional[AbstractSet[int]] = None
+    ) -> List[Tuple[int, float]]:
+        if len(self) == 0:
+            return []
+        query_vector = self.embedder.embed_one(query)
+        if self.rerank <= 0 or (self._exact is None and self.text_lookup is None):
+            return self._search_vector(query_vector, k, candidates)
+
+        shortlist = self._search_vector(query_vector, max(k, self.rerank), candidates)
+        if self._exact is not None:
+            # Base segment rows are float32 already; vectors_for reads both
+            ids = [item_id for item_id, _ in shortlist]
+            if not ids:
+                return []
+            exact = self.vectors_for(ids) @ query_vector
+        else:
+            ids = []
+            texts: List[str] = []
+            for item_id, _ in shortlist:
+                text = self.text_lookup(item_id)
+                if text is not None:
+                    ids.append(item_id)
+                    texts.append(text)
+            if not ids:
+                return shortlist[:k]
+            exact = self.embedder.embed(texts) @ query_vector
+        order = np.argsort(exact)[::-1][:k]
+        return [(ids[i], float(exact[i])) for i in order if exact[i] > self.min_score]
+
+    def clear(self) -> None:
+        super().clear()
+        self._scales.fill(1.0)
@@ -0,0 +1,143 @@
+"""
+Query result cache for memory retrieval
+"""
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Iterable, List, Optional, Set, Tuple
+
+from .text import tokenize
+
+logger = logging.getLogger(__name__)
+
+
+def normalize_query(query: str) -> str:
+    """
+    Normalize a query so near-identical phrasings share a cache entry
+
+    Case, punctuation and whitespace differences are dropped.
+
+    Args:
+        query: The raw query
+
+    Returns:
+        normalized: The normalized query
+    """
+    return " ".join(tokenize(query))
+
+
+class RetrievalCache:
+    """
+    LRU cache of query -> result ids with a time-to-live
+
+    Entries remember the terms of their query. When an index only matches
+    items sharing a query term, storing an item invalidates just the
+    entries whose queries share one of its terms; otherwise any store
+    clears the cache.
+    """
+
+    def __init__(self, max_size: int = 256, ttl: Optional[float] = 300.0) -> None:
+        """
+        Initialize the cache
+
+        Args:
+            max_size: Maximum number of cached queries
+            ttl: Seconds an entry stays valid (None for no expiry)
+        """
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries: "OrderedDict[Hashable, Tuple[float, List[int], Set[str]]]" = OrderedDict()
+        self._keys_by_term: Dict[str, Set[Hashable]] = {}
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Hashable) -> Optional[List[int]]:
+        """
+        Look up the cached result ids of a query
+
+        Args:
+            key: Cache key built from the normalized query
+
+        Returns:
+            item_ids: The cached ids, or None on a miss
+        """
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        expires, item_ids, _ = entry
+        if expires < time.monotonic():
+            self._discard(key)
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return item_ids
+
+    def put(self, key: Hashable, terms: Iterable[str], item_ids: List[int]) -> None:
+        """
+        Cache the result ids of a query
+
+        Args:
+            key: Cache key built from the normalized query
+            terms: Terms of the query, used for invalidation
+            item_ids: The result ids, best first
+        """
+        if self.max_size <= 0:
+            return
+        if key in self._entries:
+            self._discard(key)
+        expires = time.monotonic() + self.ttl if self.ttl is not None else float("inf")
+        term_set = set(terms)
+        self._entries[key] = (expires, item_ids, term_set)
+        for term in term_set:
+            self._keys_by_term.setdefault(term, set()).add(key)
+        while len(self._entries) > self.max_size:
+            self._discard(next(iter(self._entries)))
+
+    def _discard(self, key: Hashable) -> None:
+        _, _, terms = self._entries.pop(key)
+        for term in terms:
+            keys = self._keys_by_term.get(term)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._keys_by_term[term]
+
+    def invalidate_terms(self, terms: Iterable[str]) -> None:
+        """
+        Drop the entries whose query shares a term with a new item
+
+        Args:
+            terms: Terms of the stored item
+        """
+        stale: Set[Hashable] = set()
+        for term in set(terms):
+            stale.update(self._keys_by_term.get(term, ()))
+        for key in stale:
+            self._discard(key)
+        self.invalidations += len(stale)
+
+    def clear(self) -> None:
+        """Drop all entries"""
+        self.invalidations += len(self._entries)
+        self._entries.clear()
+        self._keys_by_term.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get cache statistics
+
+        Returns:
+            stats: Dictionary with size, hits, misses and invalidations
+        """
+        return {
+            "size": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "invalidations": self.invalidations,
+        }
@@ -0,0 +1,287 @@
+"""
+Read-only memory shared across processes on one host
+
+A MemoryPublisher writes the contents of a MemoryManager as numbered
+snapshot generations in a directory and then atomically repoints a small
+"current" file at the newest one. SharedMemoryReader objects in any number
+of processes memory-map the current generation and attach its embeddings
+to their vector index without copying, so the pages are shared through the
+OS page cache. Readers notice a new generation on their next query and
+switch to it; they never wait for the publisher, and queries already
+running finish on the generation they started with.
+"""
+import itertools
+import logging
+import os
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from ..core.errors import MemoryError
+from .base import MemoryIndex
+from .memory_manager import MemoryManager
+from .vector_index import VectorIndex
+
+logger = logging.getLogger(__name__)
+
+_MISSING = object()
+
+
+def _pointer_path(directory: str, name: str) -> str:
+    return os.path.join(directory, f"{name}.current")
+
+
+def _generation_path(directory: str, name: str, generation: int) -> str:
+    return os.path.join(directory, f"{name}.{generation:08d}.snap")
+
+
+def read_generation(directory: str, name: str = "memory") -> int:
+    """
+    Read the number of the current published generation
+
+    Args:
+        directory: Directory the publisher writes to
+        name: Name of the published memory
+
+    Returns:
+        generation: The current generation, or 0 if nothing is published
+    """
+    try:
+        with open(_pointer_path(directory, name)) as f:
+            return int(f.read().strip() or 0)
+    except FileNotFoundError:
+        return 0
+
+
+class MemoryPublisher:
+    """
+    Publishes generations of a MemoryManager for SharedMemoryReader objects
+    """
+
+    def __init__(self, directory: str, name: str = "memory", keep: int = 2) -> None:
+        """
+        Initialize the publisher
+
+        Args:
+            directory: Directory for the generation files (created if needed)
+            name: Name of the published memory
+            keep: Number of recent generations kept on disk, so a reader
+                opening the previous one while a new one is published
+                still finds it
+        """
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.name = name
+        self.keep = max(1, keep)
+        self.generation = read_generation(directory, name)
+
+    def publish(self, memory: MemoryManager, metadata: Optional[Dict[str, Any]] = None) -> int:
+        """
+        Publish the current contents of a memory manager
+
+        Args:
+            memory: The memory to publish
+            metadata: Optional JSON-serializable data stored with it
+
+        Returns:
+            generation: Number of the new generation
+        """
+        generation = self.generation + 1
+        path = _generation_path(self.directory, self.name, generation)
+        memory.snapshot(path, {"generation": generation, **(metadata or {})}, consolidated=True)
+
+        pointer = _pointer_path(self.directory, self.name)
+        with open(pointer + ".tmp", "w") as f:
+            f.write(str(generation))
+        os.replace(pointer + ".tmp", pointer)
+        self.generation = generation
+        self._remove_old_generations()
+        logger.info(f"Published generation {generation} of {self.name} to {self.directory}")
+        return generation
+
+    def _remove_old_generations(self) -> None:
+        prefix, suffix = f"{self.name}.", ".snap"
+        for filename in os.listdir(self.directory):
+            number = filename[len(prefix):-len(suffix)]
+            if not (filename.startswith(prefix) and filename.endswith(suffix) and number.isdigit()):
+                continue
+            if int(number) > self.generation - self.keep:
+                continue
+            try:
+                # Readers still mapping the file keep its pages until they switch
+                os.remove(os.path.join(self.directory, filename))
+            except OSError:
+                logger.debug(f"Generation file {filename} is still in use")
+
+
+class SharedMemoryReader:
+    """
+    Read-only memory following the generations of a MemoryPublisher
+
+    Exposes the MemoryManager interface used by Agent. The published
+    generations are never written: without a local memory, storing raises
+    MemoryError, so an Agent (which stores every turn) needs one. With a
+    local memory, the agent's own items are stored there and merged into
+    retrieval alongside the shared ones.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        name: str = "memory",
+        index_factory: Callable[[], MemoryIndex] = VectorIndex,
+        top_k: int = 5,
+        auto_refresh: bool = True,
+        local: Optional[MemoryManager] = None,
+    ) -> None:
+        """
+        Initialize the reader
+
+        Args:
+            directory: Directory the publisher writes to
+            name: Name of the published memory
+            index_factory: Builds the index for each generation. A
+                VectorIndex with the publisher's embedder attaches the
+                published embeddings in place; other indexes are rebuilt
+                from the items in every process.
+            top_k: Default number of items returned by retrieve_relevant
+            auto_refresh: Check for a new generation before every query
+            local: Process-local memory receiving stored items; its results
+                are interleaved with the shared ones, local first
+        """
+        self.directory = directory
+        self.name = name
+        self.index_factory = index_factory
+        self.top_k = top_k
+        self.auto_refresh = auto_refresh
+        self.local = local
+        self.generation = 0
+        self._memory: Optional[MemoryManager] = None
+        self._pointer_state: Optional[Tuple[int, int]] = None
+        self.refresh()
+
+    def refresh(self) -> bool:
+        """
+        Switch to the newest published generation
+
+        Returns:
+            switched: Whether a new generation was attached
+        """
+        try:
+            stat = os.stat(_pointer_path(self.directory, self.name))
+        except FileNotFoundError:
+            return False
+        state = (stat.st_ino, stat.st_mtime_ns)
+        if state == self._pointer_state:
+            return False
+        generation = read_generation(self.directory, self.name)
+        if generation == self.generation:
+            self._pointer_state = state
+            return False
+        try:
+            memory = MemoryManager.restore(
+                _generation_path(self.directory, self.name, generation),
+                index=self.index_factory(),
+                top_k=self.top_k,
+            )
+        except FileNotFoundError:
+            # Superseded while we were opening it; the next query retries
+            return False
+        self._memory, self.generation, self._pointer_state = memory, generation, state
+        logger.debug(f"Attached generation {generation} of {self.name}")
+        return True
+
+    @property
+    def memory(self) -> MemoryManager:
+        """The memory manager serving the attached generation"""
+        if self._memory is None:
+            raise MemoryError(f"Nothing published as {self.name} in {self.directory}")
+        return self._memory
+
+    def _writable(self) -> MemoryManager:
+        if self.local is None:
+            raise MemoryError("Shared memory is read-only; publish changes from the owning process")
+        return self.local
+
+    async def store(self, item: Dict[str, Any]) -> None:
+        """
+        Store an item in the local memory
+
+        Args:
+            item: The item to store
+        """
+        await self._writable().store(item)
+
+    async def store_batch(self, items: Sequence[Dict[str, Any]]) -> None:
+        """
+        Store several items in the local memory
+
+        Args:
+            items: The items to store
+        """
+        await self._writable().store_batch(items)
+
+    async def retrieve_relevant(self, query: str, k: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Retrieve items relevant to a query from the newest generation
+
+        Items from the local memory, if any, are interleaved with the shared
+        results, local first, since scores from two indexes do not compare.
+
+        Args:
+            query: The query to find relevant items for
+            k: Maximum number of items to return (defaults to top_k)
+
+        Returns:
+            relevant_items: List of relevant items, most relevant first
+        """
+        k = self.top_k if k is None else k
+        if self.auto_refresh:
+            self.refresh()
+        shared = [] if self._memory is None else await self._memory.retrieve_relevant(query, k)
+        if self.local is None:
+            return shared
+        local = await self.local.retrieve_relevant(query, k)
+        merged = [
+            item
+            for pair in itertools.zip_longest(local, shared, fillvalue=_MISSING)
+            for item in pair
+            if item is not _MISSING
+        ]
+        return merged[:k]
+
+    async def flush(self) -> None:
+        """Flush the local memory; published generations are never written"""
+        if self.local is not None:
+            await self.local.flush()
+
+    async def aclose(self) -> None:
+        """Detach from the current generation and close the local memory"""
+        self._memory = None
+        if self.local is not None:
+            await self.local.aclose()
+
+    def clear_short_term(self) -> None:
+        """Clear the local short-term items; the shared memory holds none"""
+        if self.local is not None:
+            self.local.clear_short_term()
+
+    def clear_all(self) -> None:
+        """Clear the local memory; published generations belong to the publisher"""
+        if self.local is not None:
+            self.local.clear_all()
+
+    def get_memory_status(self) -> Dict[str, Any]:
+        """
+        Get the status of the reader
+
+        Returns:
+            status: Dictionary with memory status information
+        """
+        status = self._memory.get_memory_status() if self._memory is not None else {
+            "short_term_count": 0,
+            "long_term_count": 0,
+            "indexed_count": 0,
+        }
+        status = {**status, "generation": self.generation}
+        if self.local is not None:
+            status["local"] = self.local.get_memory_status()
+        return status
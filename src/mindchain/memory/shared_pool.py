@@ -0,0 +1,307 @@
+"""
+Shared, content-addressed memory pool for teams of agents
+
+A SharedMemoryPool stores each distinct item once, keyed by a hash of its
+content, behind a single index. Agents hold lightweight MemoryView objects
+that record which pool items they stored and filter what they can see, so
+a team working on the same context keeps one copy of it.
+"""
+import hashlib
+import json
+import logging
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Set, Union
+
+from .base import MemoryIndex
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class PoolEntry:
+    """An item stored in a shared memory pool"""
+    item: Dict[str, Any]
+    content_hash: str
+    owners: Set[str] = field(default_factory=set)
+
+
+class SharedMemoryPool:
+    """
+    Deduplicating item store and index shared by several memory views
+    """
+
+    def __init__(
+        self,
+        index: Optional[MemoryIndex] = None,
+        ignore_fields: Iterable[str] = ("timestamp",),
+    ) -> None:
+        """
+        Initialize the pool
+
+        Args:
+            index: Optional index shared by all views
+            ignore_fields: Item fields left out of the content hash, so
+                the same content stored at different times deduplicates
+        """
+        self.index = index
+        self.ignore_fields = frozenset(ignore_fields)
+        self._entries: Dict[int, PoolEntry] = {}
+        self._ids_by_hash: Dict[str, int] = {}
+        self._next_id = 0
+        self.deduplicated_count = 0
+        logger.info("Shared memory pool initialized")
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def content_hash(self, item: Dict[str, Any]) -> str:
+        """
+        Hash the content of an item
+
+        Args:
+            item: The memory item
+
+        Returns:
+            digest: Hex SHA-256 of the item's canonical JSON form
+        """
+        content = {key: value for key, value in item.items() if key not in self.ignore_fields}
+        encoded = json.dumps(content, sort_keys=True, separators=(",", ":"), default=str)
+        return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+    def add(self, item: Dict[str, Any], owner: str) -> int:
+        """
+        Add an item on behalf of an owner, reusing an identical stored item
+
+        Args:
+            item: The memory item
+            owner: Id of the view storing the item
+
+        Returns:
+            item_id: Pool id of the stored (or existing) item
+        """
+        digest = self.content_hash(item)
+        item_id = self._ids_by_hash.get(digest)
+        if item_id is not None:
+            self._entries[item_id].owners.add(owner)
+            self.deduplicated_count += 1
+            return item_id
+
+        item_id = self._next_id
+        self._next_id += 1
+        self._entries[item_id] = PoolEntry(item=item, content_hash=digest, owners={owner})
+        self._ids_by_hash[digest] = item_id
+        if self.index is not None:
+            self.index.add(item_id, item)
+        return item_id
+
+    def release(self, item_id: int, owner: str) -> None:
+        """
+        Drop an owner's reference, deleting the item once unreferenced
+
+        Args:
+            item_id: Pool id of the item
+            owner: Id of the view releasing the item
+        """
+        entry = self._entries.get(item_id)
+        if entry is None:
+            return
+        entry.owners.discard(owner)
+        if not entry.owners:
+            del self._entries[item_id]
+            del self._ids_by_hash[entry.content_hash]
+            if self.index is not None:
+                self.index.remove(item_id)
+
+    def get(self, item_id: int) -> Optional[PoolEntry]:
+        """Get a pool entry by id"""
+        return self._entries.get(item_id)
+
+    def search(self, query: str, k: int, visible: Callable[[int, PoolEntry], bool]) -> List[int]:
+        """
+        Find the best matching items a view is allowed to see
+
+        The shared index is searched with a growing candidate count until k
+        visible items are found or the index is exhausted.
+
+        Args:
+            query: The query text
+            k: Maximum number of results
+            visible: Visibility filter of the calling view
+
+        Returns:
+            item_ids: Ids of the visible matches, best first
+        """
+        if k <= 0:
+            return []
+        if self.index is None or len(self.index) == 0:
+            return self.recent(k, visible)
+
+        fetch = k
+        while True:
+            results = self.index.search(query, fetch)
+            matches = [
+                item_id for item_id, _ in results
+                if item_id in self._entries and visible(item_id, self._entries[item_id])
+            ]
+            if len(matches) >= k or len(results) < fetch or fetch >= len(self.index):
+                return matches[:k]
+            fetch *= 4
+
+    def recent(self, k: int, visible: Callable[[int, PoolEntry], bool]) -> List[int]:
+        """
+        Get the most recently added items a view is allowed to see
+
+        Args:
+            k: Maximum number of results
+            visible: Visibility filter of the calling view
+
+        Returns:
+            item_ids: Ids of the items, oldest first
+        """
+        found: List[int] = []
+        for item_id in reversed(self._entries):
+            if len(found) >= k:
+                break
+            if visible(item_id, self._entries[item_id]):
+                found.append(item_id)
+        return found[::-1]
+
+    def view(
+        self,
+        owner: str,
+        visibility: Union[str, Callable[[int, PoolEntry], bool]] = "all",
+        top_k: int = 5,
+    ) -> "MemoryView":
+        """
+        Create a memory view for an agent
+
+        Args:
+            owner: Id of the view, typically the agent id
+            visibility: "all" to see every pool item, "own" to see only the
+                items this view stored, or a filter callable
+            top_k: Default number of items returned by retrieve_relevant
+
+        Returns:
+            view: A MemoryView usable as an agent's memory manager
+        """
+        return MemoryView(self, owner, visibility, top_k)
+
+    def get_pool_status(self) -> Dict[str, Any]:
+        """
+        Get the status of the pool
+
+        Returns:
+            status: Dictionary with pool status information
+        """
+        owners: Set[str] = set()
+        for entry in self._entries.values():
+            owners.update(entry.owners)
+        return {
+            "item_count": len(self._entries),
+            "view_count": len(owners),
+            "deduplicated_count": self.deduplicated_count,
+            "indexed_count": len(self.index) if self.index is not None else 0,
+        }
+
+
+class MemoryView:
+    """
+    Per-agent view of a SharedMemoryPool
+
+    Exposes the MemoryManager interface used by Agent while storing only
+    the ids of the pool items the agent added.
+    """
+
+    def __init__(
+        self,
+        pool: SharedMemoryPool,
+        owner: str,
+        visibility: Union[str, Callable[[int, PoolEntry], bool]] = "all",
+        top_k: int = 5,
+    ) -> None:
+        """
+        Initialize the view
+
+        Args:
+            pool: The shared pool
+            owner: Id of the view, typically the agent id
+            visibility: "all", "own" or a filter callable
+            top_k: Default number of items returned by retrieve_relevant
+        """
+        self.pool = pool
+        self.owner = owner
+        self.top_k = top_k
+        self._own: Dict[int, None] = {}
+        if visibility == "all":
+            self._visible: Callable[[int, PoolEntry], bool] = lambda item_id, entry: True
+        elif visibility == "own":
+            self._visible = lambda item_id, entry: owner in entry.owners
+        elif callable(visibility):
+            self._visible = visibility
+        else:
+            raise ValueError(f"Unknown visibility: {visibility}")
+
+    async def store(self, item: Dict[str, Any]) -> None:
+        """
+        Store an item in the shared pool
+
+        Args:
+            item: The item to store
+        """
+        item_id = self.pool.add(item, self.owner)
+        self._own.pop(item_id, None)
+        self._own[item_id] = None
+
+    async def store_batch(self, items: Sequence[Dict[str, Any]]) -> None:
+        """
+        Store several items in the shared pool
+
+        Args:
+            items: The items to store
+        """
+        for item in items:
+            await self.store(item)
+
+    async def retrieve_relevant(self, query: str, k: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Retrieve visible pool items relevant to a query
+
+        Args:
+            query: The query to find relevant items for
+            k: Maximum number of items to return (defaults to top_k)
+
+        Returns:
+            relevant_items: List of relevant items, most relevant first
+        """
+        k = self.top_k if k is None else k
+        return [self.pool.get(item_id).item for item_id in self.pool.search(query, k, self._visible)]
+
+    async def flush(self) -> None:
+        """Nothing to flush; the pool is updated by store()"""
+
+    async def aclose(self) -> None:
+        """Nothing to close; the pool outlives its views"""
+
+    def clear_short_term(self) -> None:
+        """Release every item this view stored"""
+        for item_id in self._own:
+            self.pool.release(item_id, self.owner)
+        self._own.clear()
+
+    def clear_all(self) -> None:
+        """Release every item this view stored"""
+        self.clear_short_term()
+
+    def get_memory_status(self) -> Dict[str, Any]:
+        """
+        Get the status of the view
+
+        Returns:
+            status: Dictionary with memory status information
+        """
+        return {
+            "short_term_count": len(self._own),
+            "long_term_count": 0,
+            "shared_pool_count": len(self.pool),
+            "indexed_count": len(self.pool.index) if self.pool.index is not None else 0,
+        }
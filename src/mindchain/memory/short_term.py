@@ -0,0 +1,232 @@
+"""
+Fixed-capacity short-term memory buffer with configurable eviction
+"""
+import logging
+from enum import Enum
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Placeholder for items restored by load() that have not been decoded yet
+_UNLOADED = object()
+
+
+class EvictionPolicy(str, Enum):
+    """Which item a full short-term buffer evicts to make room"""
+    FIFO = "fifo"
+    LRU = "lru"
+    IMPORTANCE = "importance"
+
+
+def default_importance(item: Dict[str, Any]) -> float:
+    """Read the importance score of an item from its 'importance' field"""
+    try:
+        return float(item.get("importance", 0.0))
+    except (AttributeError, TypeError, ValueError):
+        return 0.0
+
+
+class ShortTermBuffer:
+    """
+    Ring buffer of preallocated slots holding the most recent memory items
+
+    Bookkeeping for eviction (insertion tick, last access tick, importance)
+    is kept in NumPy arrays aligned with the slots, so choosing a victim is
+    a single vectorized argmin regardless of the policy.
+    """
+
+    def __init__(
+        self,
+        capacity: int = 1000,
+        policy: Union[EvictionPolicy, str] = EvictionPolicy.FIFO,
+        importance_fn: Optional[Callable[[Dict[str, Any]], float]] = None,
+    ) -> None:
+        """
+        Initialize the buffer
+
+        Args:
+            capacity: Maximum number of items held
+            policy: Eviction policy used once the buffer is full
+            importance_fn: Scores items for the importance policy
+        """
+        if capacity <= 0:
+            raise ValueError("capacity must be positive")
+        self.capacity = capacity
+        self.policy = EvictionPolicy(policy)
+        self.importance_fn = importance_fn or default_importance
+        self._items: List[Any] = [None] * capacity
+        self._loader: Optional[Callable[[int], Optional[Dict[str, Any]]]] = None
+        self._slot_ids = np.full(capacity, -1, dtype=np.int64)
+        self._inserted = np.zeros(capacity, dtype=np.int64)
+        self._accessed = np.zeros(capacity, dtype=np.int64)
+        self._importance = np.zeros(capacity, dtype=np.float64)
+        self._slot_of: Dict[int, int] = {}
+        self._free: List[int] = list(range(capacity - 1, -1, -1))
+        self._tick = 0
+
+    def __len__(self) -> int:
+        return len(self._slot_of)
+
+    def __contains__(self, item_id: int) -> bool:
+        return item_id in self._slot_of
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        """Iterate over items from oldest to newest"""
+        for _, item in self.entries():
+            yield item
+
+    def _next_tick(self) -> int:
+        self._tick += 1
+        return self._tick
+
+    def _item_at(self, slot: int) -> Optional[Dict[str, Any]]:
+        item = self._items[slot]
+        if item is _UNLOADED:
+            item = self._loader(int(self._slot_ids[slot]))
+            self._items[slot] = item
+        return item
+
+    def load(
+        self,
+        item_ids: Sequence[int],
+        importance: Sequence[float],
+        loader: Callable[[int], Optional[Dict[str, Any]]],
+    ) -> None:
+        """
+        Fill an empty buffer with items that are decoded on first access
+
+        Args:
+            item_ids: Ids of the items, oldest first
+            importance: Importance score of each item
+            loader: Returns the item for an id when it is first needed
+        """
+        if len(self._slot_of):
+            raise ValueError("load() requires an empty buffer")
+        if len(item_ids) > self.capacity:
+            raise ValueError("More items than the buffer capacity")
+        self._loader = loader
+        for item_id, score in zip(item_ids, importance):
+            slot = self._free.pop()
+            tick = self._next_tick()
+            self._items[slot] = _UNLOADED
+            self._slot_ids[slot] = item_id
+            self._inserted[slot] = tick
+            self._accessed[slot] = tick
+            self._importance[slot] = score
+            self._slot_of[int(item_id)] = slot
+
+    def _victim_slot(self) -> int:
+        if self.policy == EvictionPolicy.LRU:
+            return int(np.argmin(self._accessed))
+        if self.policy == EvictionPolicy.IMPORTANCE:
+            # Least important first, oldest among equally important items
+            least = self._importance == self._importance.min()
+            return int(np.argmin(np.where(least, self._inserted, np.iinfo(np.int64).max)))
+        return int(np.argmin(self._inserted))
+
+    def put(self, item_id: int, item: Dict[str, Any]) -> Optional[Tuple[int, Dict[str, Any]]]:
+        """
+        Add an item, evicting one if the buffer is full
+
+        Args:
+            item_id: Id of the item
+            item: The memory item
+
+        Returns:
+            evicted: (item_id, item) of the evicted entry, if any
+        """
+        evicted = None
+        if self._free:
+            slot = self._free.pop()
+        else:
+            slot = self._victim_slot()
+            old_id = int(self._slot_ids[slot])
+            evicted = (old_id, self._item_at(slot))
+            del self._slot_of[old_id]
+
+        tick = self._next_tick()
+        self._items[slot] = item
+        self._slot_ids[slot] = item_id
+        self._inserted[slot] = tick
+        self._accessed[slot] = tick
+        self._importance[slot] = self.importance_fn(item)
+        self._slot_of[item_id] = slot
+        return evicted
+
+    def get(self, item_id: int) -> Optional[Dict[str, Any]]:
+        """Get an item by id without counting it as an access"""
+        slot = self._slot_of.get(item_id)
+        return self._item_at(slot) if slot is not None else None
+
+    def touch(self, item_id: int) -> None:
+        """Record an access to an item for the LRU policy"""
+        slot = self._slot_of.get(item_id)
+        if slot is not None:
+            self._accessed[slot] = self._next_tick()
+
+    def remove(self, item_id: int) -> Optional[Dict[str, Any]]:
+        """
+        Remove an item from the buffer
+
+        Args:
+            item_id: Id of the item
+
+        Returns:
+            item: The removed item, if it was present
+        """
+        slot = self._slot_of.pop(item_id, None)
+        if slot is None:
+            return None
+        item = self._item_at(slot)
+        self._items[slot] = None
+        self._slot_ids[slot] = -1
+        self._free.append(slot)
+        return item
+
+    def ids(self) -> List[int]:
+        """
+        Get the ids of the buffered items from oldest to newest
+
+        Returns:
+            item_ids: The buffered ids in insertion order
+        """
+        slots = sorted(self._slot_of.values(), key=lambda s: self._inserted[s])
+        return [int(self._slot_ids[s]) for s in slots]
+
+    def entries(self) -> List[Tuple[int, Dict[str, Any]]]:
+        """
+        Get all (item_id, item) pairs from oldest to newest
+
+        Returns:
+            entries: The buffered entries in insertion order
+        """
+        slots = sorted(self._slot_of.values(), key=lambda s: self._inserted[s])
+        return [(int(self._slot_ids[s]), self._item_at(s)) for s in slots]
+
+    def recent(self, k: int) -> List[Dict[str, Any]]:
+        """
+        Get the k most recently inserted items, oldest first
+
+        Args:
+            k: Number of items to return
+
+        Returns:
+            items: The most recent items
+        """
+        if k <= 0 or not self._slot_of:
+            return []
+        occupied = np.fromiter(self._slot_of.values(), dtype=np.int64)
+        order = occupied[np.argsort(self._inserted[occupied])][-k:]
+        return [self._item_at(s) for s in order]
+
+    def clear(self) -> None:
+        """Remove all items"""
+        self._items = [None] * self.capacity
+        self._slot_ids.fill(-1)
+        self._inserted.fill(0)
+        self._accessed.fill(0)
+        self._importance.fill(0.0)
+        self._slot_of.clear()
+        self._free = list(range(self.capacity - 1, -1, -1))
@@ -0,0 +1,345 @@
+"""
+Compact binary snapshots of memory for fast warm starts
+
+Layout of a snapshot file (little-endian, sections aligned to 64 bytes):
+
+    header          magic, format version, embedding dimension and the
+                    row counts of each tier
+    meta            JSON with manager state and caller metadata
+    ids             int64[count]
+    timestamps      float64[count] ("timestamp" field, NaN when missing)
+    importance      float64[count] short-term importance scores
+    embeddings      float32[count, dimension] (absent when dimension is 0)
+    offsets         int64[count] position of each record in the blob
+    blob            length-prefixed compact JSON payloads
+
+Rows are ordered long-term, then pending consolidation, then short-term
+from oldest to newest. Opening a snapshot maps the file and validates the
+header; the columns are zero-copy views and payloads are decoded on demand.
+"""
+import json
+import logging
+import math
+import mmap
+import os
+import struct
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from ..core.errors import MemoryError
+from .long_term import LongTermStore
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_MAGIC = b"MCMEMSNP"
+SNAPSHOT_VERSION = 1
+
+_HEADER = struct.Struct("<8sIIQQQQQQ")
+_LENGTH_PREFIX = struct.Struct("<I")
+_ALIGNMENT = 64
+
+
+def _aligned(offset: int) -> int:
+    return (offset + _ALIGNMENT - 1) // _ALIGNMENT * _ALIGNMENT
+
+
+def _layout(count: int, dimension: int, meta_length: int) -> Dict[str, int]:
+    """Byte offsets of every section"""
+    offsets = {"meta": _aligned(_HEADER.size)}
+    offsets["ids"] = _aligned(offsets["meta"] + meta_length)
+    offsets["timestamps"] = _aligned(offsets["ids"] + 8 * count)
+    offsets["importance"] = _aligned(offsets["timestamps"] + 8 * count)
+    offsets["embeddings"] = _aligned(offsets["importance"] + 8 * count)
+    offsets["offsets"] = _aligned(offsets["embeddings"] + 4 * count * dimension)
+    offsets["blob"] = _aligned(offsets["offsets"] + 8 * count)
+    return offsets
+
+
+def write_snapshot(
+    path: str,
+    tiers: Sequence[Sequence[Tuple[int, Dict[str, Any]]]],
+    embeddings: Optional[np.ndarray] = None,
+    importance: Optional[np.ndarray] = None,
+    meta: Optional[Dict[str, Any]] = None,
+) -> None:
+    """
+    Write a snapshot file atomically
+
+    Args:
+        path: Destination file
+        tiers: (item_id, item) rows of the long-term, pending and
+            short-term tiers, in that order
+        embeddings: Optional float32 array with one row per item
+        importance: Optional importance score per item
+        meta: JSON-serializable state stored alongside the items
+    """
+    if len(tiers) != 3:
+        raise ValueError("Expected long-term, pending and short-term rows")
+    rows = [row for tier in tiers for row in tier]
+    count = len(rows)
+    dimension = int(embeddings.shape[1]) if embeddings is not None and embeddings.ndim == 2 else 0
+    meta_bytes = json.dumps(meta or {}, separators=(",", ":"), default=str).encode("utf-8")
+
+    ids = np.fromiter((item_id for item_id, _ in rows), dtype="<i8", count=count)
+    timestamps = np.full(count, np.nan, dtype="<f8")
+    record_offsets = np.empty(count, dtype="<i8")
+    chunks: List[bytes] = []
+    position = 0
+    for row, (_, item) in enumerate(rows):
+        timestamp = item.get("timestamp")
+        if isinstance(timestamp, (int, float)):
+            timestamps[row] = timestamp
+        payload = json.dumps(item, separators=(",", ":"), default=str).encode("utf-8")
+        record_offsets[row] = position
+        chunks.append(_LENGTH_PREFIX.pack(len(payload)))
+        chunks.append(payload)
+        position += _LENGTH_PREFIX.size + len(payload)
+    scores = np.zeros(count, dtype="<f8") if importance is None else np.asarray(importance, dtype="<f8")
+
+    layout = _layout(count, dimension, len(meta_bytes))
+    header = _HEADER.pack(
+        SNAPSHOT_MAGIC, SNAPSHOT_VERSION, dimension,
+        len(tiers[0]), len(tiers[1]), len(tiers[2]), len(meta_bytes), position, 0,
+    )
+    sections = [
+        (0, header),
+        (layout["meta"], meta_bytes),
+        (layout["ids"], ids.tobytes()),
+        (layout["timestamps"], timestamps.tobytes()),
+        (layout["importance"], scores.tobytes()),
+        (layout["offsets"], record_offsets.tobytes()),
+    ]
+    if dimension:
+        sections.insert(5, (layout["embeddings"], np.ascontiguousarray(embeddings, dtype="<f4").tobytes()))
+
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        for offset, data in sections:
+            f.write(bytes(offset - f.tell()))
+            f.write(data)
+        f.write(bytes(layout["blob"] - f.tell()))
+        for chunk in chunks:
+            f.write(chunk)
+    os.replace(tmp_path, path)
+    logger.debug(f"Wrote memory snapshot of {count} items to {path}")
+
+
+def read_snapshot_meta(path: str) -> Dict[str, Any]:
+    """
+    Read only the metadata section of a snapshot
+
+    Args:
+        path: Snapshot file
+
+    Returns:
+        meta: The metadata stored with the snapshot
+    """
+    with open(path, "rb") as f:
+        header = _read_header(f.read(_HEADER.size), path)
+        f.seek(_aligned(_HEADER.size))
+        return json.loads(f.read(header[6]) or b"{}")
+
+
+def _read_header(data: bytes, path: str) -> Tuple[Any, ...]:
+    if len(data) < _HEADER.size:
+        raise MemoryError(f"Truncated memory snapshot: {path}")
+    header = _HEADER.unpack(data[:_HEADER.size])
+    if header[0] != SNAPSHOT_MAGIC:
+        raise MemoryError(f"Not a memory snapshot: {path}")
+    if header[1] != SNAPSHOT_VERSION:
+        raise MemoryError(f"Unsupported memory snapshot version: {header[1]}")
+    return header
+
+
+class SnapshotReader:
+    """
+    Memory-mapped view of a snapshot file
+    """
+
+    def __init__(self, path: str) -> None:
+        """
+        Open a snapshot
+
+        Args:
+            path: Snapshot file
+        """
+        self.path = path
+        with open(path, "rb") as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        _, _, dimension, n_long, n_pending, n_short, meta_length, blob_length, _ = _read_header(
+            self._map, path
+        )
+        self.dimension = dimension
+        self.tier_sizes = (n_long, n_pending, n_short)
+        count = n_long + n_pending + n_short
+        layout = _layout(count, dimension, meta_length)
+        if len(self._map) < layout["blob"] + blob_length:
+            raise MemoryError(f"Truncated memory snapshot: {path}")
+
+        self.meta: Dict[str, Any] = json.loads(
+            self._map[layout["meta"]:layout["meta"] + meta_length] or b"{}"
+        )
+        self.ids = np.frombuffer(self._map, dtype="<i8", count=count, offset=layout["ids"])
+        self.timestamps = np.frombuffer(self._map, dtype="<f8", count=count, offset=layout["timestamps"])
+        self.importance = np.frombuffer(self._map, dtype="<f8", count=count, offset=layout["importance"])
+        self.embeddings: Optional[np.ndarray] = None
+        if dimension:
+            self.embeddings = np.frombuffer(
+                self._map, dtype="<f4", count=count * dimension, offset=layout["embeddings"]
+            ).reshape(count, dimension)
+        self._offsets = np.frombuffer(self._map, dtype="<i8", count=count, offset=layout["offsets"])
+        self._blob_start = layout["blob"]
+        self._sorted_ids: Optional[np.ndarray] = None
+        self._sorted_rows: Optional[np.ndarray] = None
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def tier(self, number: int) -> slice:
+        """
+        Get the rows of a tier
+
+        Args:
+            number: 0 for long-term, 1 for pending, 2 for short-term
+
+        Returns:
+            rows: Slice of the rows holding the tier
+        """
+        start = sum(self.tier_sizes[:number])
+        return slice(start, start + self.tier_sizes[number])
+
+    def decode(self, row: int) -> Dict[str, Any]:
+        """
+        Decode the item stored in a row
+
+        Args:
+            row: Row number
+
+        Returns:
+            item: The memory item
+        """
+        start = self._blob_start + int(self._offsets[row])
+        (length,) = _LENGTH_PREFIX.unpack_from(self._map, start)
+        start += _LENGTH_PREFIX.size
+        return json.loads(self._map[start:start + length])
+
+    def row_of(self, item_id: int) -> Optional[int]:
+        """
+        Find the row holding an item
+
+        Args:
+            item_id: Id of the item
+
+        Returns:
+            row: Row number, or None if the item is not in the snapshot
+        """
+        if self._sorted_ids is None:
+            if len(self.ids) < 2 or bool(np.all(np.diff(self.ids) > 0)):
+                self._sorted_ids = self.ids
+                self._sorted_rows = np.arange(len(self.ids))
+            else:
+                self._sorted_rows = np.argsort(self.ids, kind="stable")
+                self._sorted_ids = self.ids[self._sorted_rows]
+        position = int(np.searchsorted(self._sorted_ids, item_id))
+        if position < len(self._sorted_ids) and self._sorted_ids[position] == item_id:
+            return int(self._sorted_rows[position])
+        return None
+
+    def get(self, item_id: int) -> Optional[Dict[str, Any]]:
+        """
+        Decode an item by id
+
+        Args:
+            item_id: Id of the item
+
+        Returns:
+            item: The item, or None if it is not in the snapshot
+        """
+        row = self.row_of(item_id)
+        return self.decode(row) if row is not None else None
+
+    def timestamp(self, row: int) -> Optional[float]:
+        """Timestamp of a row, or None when the item had none"""
+        value = float(self.timestamps[row])
+        return None if math.isnan(value) else value
+
+
+class SnapshotLongTermStore(LongTermStore):
+    """
+    Long-term store serving the long-term rows of a snapshot
+
+    Snapshot rows are decoded on demand from the mapped file; items
+    consolidated after the restore are kept in memory on top of them.
+    """
+
+    def __init__(self, reader: SnapshotReader) -> None:
+        """
+        Initialize the store
+
+        Args:
+            reader: The opened snapshot
+        """
+        self.reader = reader
+        self._rows = reader.tier(0)
+        self._removed = False
+        self._items: Dict[int, Dict[str, Any]] = {}
+        self._embeddings: Dict[int, np.ndarray] = {}
+
+    def append_batch(
+        self,
+        item_ids: Sequence[int],
+        items: Sequence[Dict[str, Any]],
+        embeddings: Optional[np.ndarray] = None,
+    ) -> None:
+        for i, (item_id, item) in enumerate(zip(item_ids, items)):
+            self._items[item_id] = item
+            if embeddings is not None:
+                self._embeddings[item_id] = np.asarray(embeddings[i], dtype=np.float32)
+
+    def _base_row(self, item_id: int) -> Optional[int]:
+        if self._removed:
+            return None
+        row = self.reader.row_of(item_id)
+        if row is None or not self._rows.start <= row < self._rows.stop:
+            return None
+        return row
+
+    def get(self, item_id: int) -> Optional[Dict[str, Any]]:
+        item = self._items.get(item_id)
+        if item is None:
+            row = self._base_row(item_id)
+            if row is not None:
+                item = self.reader.decode(row)
+        return item
+
+    def entries(self) -> Iterator[Tuple[int, Dict[str, Any]]]:
+        if not self._removed:
+            for row in range(self._rows.start, self._rows.stop):
+                yield int(self.reader.ids[row]), self.reader.decode(row)
+        yield from self._items.items()
+
+    def embedding_matrix(self) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+        if self.reader.embeddings is None or self._removed or len(self._items) != len(self._embeddings):
+            return None
+        ids = self.reader.ids[self._rows]
+        vectors = self.reader.embeddings[self._rows]
+        if self._embeddings:
+            ids = np.concatenate([ids, np.fromiter(self._embeddings, dtype=np.int64)])
+            vectors = np.concatenate([vectors, np.stack(list(self._embeddings.values()))])
+        return ids, vectors
+
+    def max_id(self) -> int:
+        base = self.reader.ids[self._rows]
+        largest = int(base.max()) if len(base) and not self._removed else -1
+        return max([largest, *self._items])
+
+    def clear(self) -> None:
+        # The snapshot file is left untouched; its rows are just hidden
+        self._removed = True
+        self._items.clear()
+        self._embeddings.clear()
+
+    def __len__(self) -> int:
+        base = 0 if self._removed else self._rows.stop - self._rows.start
+        return base + len(self._items)
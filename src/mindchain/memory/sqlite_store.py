@@ -0,0 +1,306 @@
+"""
+Durable memory backend on SQLite with an FTS5 full-text index
+
+SQLiteMemoryStore keeps long-term items in a WAL-mode database file, and
+SQLiteFTSIndex ranks items with the database's FTS5 bm25() over the same
+file. Writes are batched into one transaction per call on a single writer
+connection; reads go through a small pool of read-only connections, which
+WAL lets run concurrently with the writer. SQL statements are module
+constants, so each connection's statement cache keeps them prepared.
+
+Everything is local to one file, with no external service.
+"""
+import json
+import logging
+import queue
+import sqlite3
+import threading
+from contextlib import contextmanager
+from typing import AbstractSet, Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from ..core.errors import MemoryError
+from .base import MemoryIndex
+from .long_term import LongTermStore
+from .text import item_text, tokenize
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS items (
+    id INTEGER PRIMARY KEY,
+    payload TEXT NOT NULL,
+    embedding BLOB
+);
+CREATE VIRTUAL TABLE IF NOT EXISTS items_fts USING fts5(body, tokenize = 'unicode61');
+CREATE TABLE IF NOT EXISTS unconsolidated (id INTEGER PRIMARY KEY);
+"""
+
+_INSERT_ITEM = "INSERT OR REPLACE INTO items (id, payload, embedding) VALUES (?, ?, ?)"
+_SETTLE_ITEM = "DELETE FROM unconsolidated WHERE id = ?"
+_SELECT_ITEM = "SELECT payload FROM items WHERE id = ?"
+_SELECT_ITEMS = "SELECT id, payload FROM items ORDER BY id"
+_SELECT_EMBEDDINGS = "SELECT id, embedding FROM items WHERE embedding IS NOT NULL ORDER BY id"
+_DELETE_ITEM = "DELETE FROM items WHERE id = ?"
+_COUNT_ITEMS = "SELECT count(*) FROM items"
+_COUNT_EXISTING = "SELECT count(*) FROM items WHERE id IN (SELECT value FROM json_each(?))"
+_MAX_ID = "SELECT max(id) FROM items"
+
+_DELETE_TEXT = "DELETE FROM items_fts WHERE rowid = ?"
+_INSERT_TEXT = "INSERT INTO items_fts (rowid, body) VALUES (?, ?)"
+_MARK_UNCONSOLIDATED = (
+    "INSERT OR IGNORE INTO unconsolidated (id) "
+    "SELECT ? WHERE NOT EXISTS (SELECT 1 FROM items WHERE id = ?)"
+)
+_COUNT_TEXTS = "SELECT count(*) FROM items_fts"
+_SEARCH = (
+    "SELECT rowid, bm25(items_fts) FROM items_fts WHERE items_fts MATCH ? "
+    "ORDER BY bm25(items_fts) LIMIT ?"
+)
+_SEARCH_CANDIDATES = (
+    "SELECT rowid, bm25(items_fts) FROM items_fts WHERE items_fts MATCH ? "
+    "AND rowid IN (SELECT value FROM json_each(?)) ORDER BY bm25(items_fts) LIMIT ?"
+)
+_DROP_UNCONSOLIDATED = "DELETE FROM items_fts WHERE rowid IN (SELECT id FROM unconsolidated)"
+
+
+class SQLiteMemoryStore(LongTermStore):
+    """
+    Long-term store persisting items in a WAL-mode SQLite database
+    """
+
+    def __init__(
+        self,
+        path: str,
+        read_pool_size: int = 4,
+        synchronous: str = "NORMAL",
+        cached_statements: int = 64,
+    ) -> None:
+        """
+        Open or create a store
+
+        Args:
+            path: Database file
+            read_pool_size: Maximum number of pooled read connections
+            synchronous: SQLite synchronous pragma ("NORMAL" survives
+                process crashes in WAL mode, "FULL" also power loss)
+            cached_statements: Prepared statements cached per connection
+        """
+        if path == ":memory:" or path.startswith("file::memory:"):
+            raise MemoryError("SQLiteMemoryStore needs a database file")
+        self.path = path
+        self.read_pool_size = max(1, read_pool_size)
+        self.cached_statements = cached_statements
+        self._lock = threading.Lock()
+        self._writer = sqlite3.connect(
+            path, check_same_thread=False, cached_statements=cached_statements
+        )
+        self._writer.execute("PRAGMA journal_mode=WAL")
+        self._writer.execute(f"PRAGMA synchronous={synchronous}")
+        with self._writer:
+            self._writer.executescript(_SCHEMA)
+            # Short-term rows indexed by the previous process were never
+            # consolidated, so their items are gone
+            self._writer.execute(_DROP_UNCONSOLIDATED)
+            self._writer.execute("DELETE FROM unconsolidated")
+        self._readers: "queue.LifoQueue[sqlite3.Connection]" = queue.LifoQueue()
+        self._reader_count = 0
+        self._count = self._writer.execute(_COUNT_ITEMS).fetchone()[0]
+        logger.info(f"Opened SQLite memory store at {path} with {self._count} items")
+
+    @contextmanager
+    def reader(self) -> Iterator[sqlite3.Connection]:
+        """
+        Borrow a read-only connection from the pool
+
+        When every pooled connection is in use, a temporary connection is
+        opened and closed after use instead of waiting for one: a blocking
+        wait would stall the event loop, and connections held by open
+        entries() iterators may not come back until it resumes.
+
+        Returns:
+            connection: Context manager yielding the connection
+        """
+        try:
+            connection = self._readers.get_nowait()
+            pooled = True
+        except queue.Empty:
+            with self._lock:
+                pooled = self._reader_count < self.read_pool_size
+                if pooled:
+                    self._reader_count += 1
+            connection = sqlite3.connect(
+                f"file:{self.path}?mode=ro", uri=True,
+                check_same_thread=False, cached_statements=self.cached_statements,
+            )
+        try:
+            yield connection
+        finally:
+            if pooled:
+                self._readers.put(connection)
+            else:
+                connection.close()
+
+    @contextmanager
+    def transaction(self) -> Iterator[sqlite3.Connection]:
+        """
+        Run statements on the writer connection in one transaction
+
+        Returns:
+            connection: Context manager yielding the writer connection
+        """
+        with self._lock, self._writer:
+            yield self._writer
+
+    def append_batch(
+        self,
+        item_ids: Sequence[int],
+        items: Sequence[Dict[str, Any]],
+        embeddings: Optional[np.ndarray] = None,
+    ) -> None:
+        if not item_ids:
+            return
+        blobs: List[Optional[bytes]] = [None] * len(item_ids)
+        if embeddings is not None:
+            blobs = [np.asarray(row, dtype=np.float32).tobytes() for row in embeddings]
+        rows = [
+            (item_id, json.dumps(item, separators=(",", ":"), default=str), blob)
+            for item_id, item, blob in zip(item_ids, items, blobs)
+        ]
+        with self.transaction() as connection:
+            existing = connection.execute(
+                _COUNT_EXISTING, (json.dumps([int(item_id) for item_id in item_ids]),)
+            ).fetchone()[0]
+            connection.executemany(_INSERT_ITEM, rows)
+            connection.executemany(_SETTLE_ITEM, [(item_id,) for item_id in item_ids])
+        self._count += len(rows) - existing
+        logger.debug(f"Appended {len(rows)} items to {self.path}")
+
+    def get(self, item_id: int) -> Optional[Dict[str, Any]]:
+        with self.reader() as connection:
+            row = connection.execute(_SELECT_ITEM, (item_id,)).fetchone()
+        return json.loads(row[0]) if row is not None else None
+
+    def entries(self) -> Iterator[Tuple[int, Dict[str, Any]]]:
+        with self.reader() as connection:
+            cursor = connection.execute(_SELECT_ITEMS)
+            while True:
+                rows = cursor.fetchmany(1024)
+                if not rows:
+                    break
+                for item_id, payload in rows:
+                    yield item_id, json.loads(payload)
+
+    def embedding_matrix(self) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+        with self.reader() as connection:
+            rows = connection.execute(_SELECT_EMBEDDINGS).fetchall()
+        if not rows or len(rows) != self._count:
+            return None
+        ids = np.fromiter((item_id for item_id, _ in rows), dtype=np.int64, count=len(rows))
+        vectors = np.frombuffer(b"".join(blob for _, blob in rows), dtype=np.float32)
+        return ids, vectors.reshape(len(rows), -1)
+
+    def remove(self, item_id: int) -> bool:
+        with self.transaction() as connection:
+            removed = connection.execute(_DELETE_ITEM, (item_id,)).rowcount > 0
+        if removed:
+            self._count -= 1
+        return removed
+
+    def max_id(self) -> int:
+        with self.reader() as connection:
+            largest = connection.execute(_MAX_ID).fetchone()[0]
+        return largest if largest is not None else -1
+
+    def clear(self) -> None:
+        with self.transaction() as connection:
+            connection.execute("DELETE FROM items")
+            connection.execute("DELETE FROM items_fts")
+            connection.execute("DELETE FROM unconsolidated")
+        self._count = 0
+
+    def close(self) -> None:
+        while True:
+            try:
+                self._readers.get_nowait().close()
+            except queue.Empty:
+                break
+        self._reader_count = 0
+        self._writer.close()
+
+    def __len__(self) -> int:
+        return self._count
+
+
+class SQLiteFTSIndex(MemoryIndex):
+    """
+    Full-text index ranking items with FTS5 bm25() in a SQLiteMemoryStore
+
+    The index lives in the store's database, so it survives restarts and
+    is not rebuilt when the MemoryManager starts.
+    """
+
+    term_scoped = True
+    persistent = True
+
+    def __init__(self, store: SQLiteMemoryStore) -> None:
+        """
+        Initialize the index
+
+        Args:
+            store: The store whose database holds the index
+        """
+        self.store = store
+        with store.reader() as connection:
+            self._count = connection.execute(_COUNT_TEXTS).fetchone()[0]
+
+    def __len__(self) -> int:
+        return self._count
+
+    def add_batch(self, item_ids: Sequence[int], items: Sequence[Dict[str, Any]]) -> None:
+        if not item_ids:
+            return
+        with self.store.transaction() as connection:
+            replaced = connection.executemany(
+                _DELETE_TEXT, [(item_id,) for item_id in item_ids]
+            ).rowcount
+            connection.executemany(
+                _INSERT_TEXT,
+                [(item_id, item_text(item)) for item_id, item in zip(item_ids, items)],
+            )
+            connection.executemany(
+                _MARK_UNCONSOLIDATED, [(item_id, item_id) for item_id in item_ids]
+            )
+        self._count += len(item_ids) - max(0, replaced)
+
+    def remove(self, item_id: int) -> bool:
+        with self.store.transaction() as connection:
+            removed = connection.execute(_DELETE_TEXT, (item_id,)).rowcount > 0
+            connection.execute(_SETTLE_ITEM, (item_id,))
+        if removed:
+            self._count -= 1
+        return removed
+
+    def search(
+        self, query: str, k: int, candidates: Optional[AbstractSet[int]] = None
+    ) -> List[Tuple[int, float]]:
+        terms = sorted(set(tokenize(query)))
+        if not terms or k <= 0 or (candidates is not None and not candidates):
+            return []
+        match = " OR ".join('"' + term.replace('"', '""') + '"' for term in terms)
+        with self.store.reader() as connection:
+            if candidates is None:
+                rows = connection.execute(_SEARCH, (match, k)).fetchall()
+            else:
+                rows = connection.execute(
+                    _SEARCH_CANDIDATES, (match, json.dumps(sorted(candidates)), k)
+                ).fetchall()
+        # bm25() is lower for better matches
+        return [(item_id, -score) for item_id, score in rows]
+
+    def clear(self) -> None:
+        with self.store.transaction() as connection:
+            connection.execute("DELETE FROM items_fts")
+            connection.execute("DELETE FROM unconsolidated")
+        self._count = 0
@@ -0,0 +1,40 @@
+"""
+Text helpers shared by the memory indexes
+"""
+import re
+from typing import Any, Dict, List
+
+# Fields written by Agent.run (input/response) and by knowledge items (content)
+TEXT_FIELDS = ("input", "response", "content")
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Split text into lower-cased word tokens
+
+    Args:
+        text: The text to tokenize
+
+    Returns:
+        tokens: List of tokens in order of appearance
+    """
+    return _TOKEN_RE.findall(text.lower())
+
+
+def item_text(item: Dict[str, Any]) -> str:
+    """
+    Build the searchable text of a memory item
+
+    Args:
+        item: The stored memory item
+
+    Returns:
+        text: The text fields of the item joined by newlines
+    """
+    if not isinstance(item, dict):
+        return str(item)
+    return "\n".join(
+        str(item[field]) for field in TEXT_FIELDS if item.get(field)
+    )
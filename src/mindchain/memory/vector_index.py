@@ -0,0 +1,322 @@
+"""
+Exact cosine-similarity index over a contiguous embedding matrix
+"""
+import logging
+from typing import AbstractSet, Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .base import MemoryIndex
+from .embeddings import EmbeddingProvider, HashEmbeddingProvider
+from .text import item_text
+
+logger = logging.getLogger(__name__)
+
+
+def top_k_indices(scores: np.ndarray, k: int) -> np.ndarray:
+    """
+    Positions of the k highest scores, best first
+
+    Uses a partial sort so only the selected entries are fully ordered.
+
+    Args:
+        scores: 1-D array of scores
+        k: Number of positions to return
+
+    Returns:
+        positions: Array of at most k positions into scores
+    """
+    n = scores.shape[0]
+    if k <= 0 or n == 0:
+        return np.empty(0, dtype=np.int64)
+    if k < n:
+        candidates = np.argpartition(scores, n - k)[n - k:]
+    else:
+        candidates = np.arange(n)
+    return candidates[np.argsort(scores[candidates])[::-1]]
+
+
+class VectorIndex(MemoryIndex):
+    """
+    Embedding-backed index answering top-k cosine queries
+
+    Embeddings live in one contiguous float32 matrix that grows by doubling,
+    so a query is a single matrix-vector product followed by a partial sort.
+    Removal swaps the last row into the freed slot to keep rows dense.
+    """
+
+    def __init__(
+        self,
+        embedder: Optional[EmbeddingProvider] = None,
+        initial_capacity: int = 1024,
+        min_score: float = 0.0,
+    ) -> None:
+        """
+        Initialize the index
+
+        Args:
+            embedder: Embedding provider (defaults to HashEmbeddingProvider)
+            initial_capacity: Number of rows to preallocate
+            min_score: Results scoring at or below this value are dropped
+        """
+        self.embedder = embedder or HashEmbeddingProvider()
+        self.dimension = self.embedder.dimension
+        self.min_score = min_score
+        capacity = max(1, initial_capacity)
+        self._vectors = np.zeros((capacity, self.dimension), dtype=np.float32)
+        self._ids = np.zeros(capacity, dtype=np.int64)
+        self._positions: Dict[int, int] = {}
+        self._size = 0
+        # Optional read-only segment, e.g. the memory-mapped embeddings of
+        # a persistent long-term store, scored without copying it
+        self._base_ids: Optional[np.ndarray] = None
+        self._base_vectors: Optional[np.ndarray] = None
+        # Argsort of the base ids, built on the first filtered search
+        self._base_order: Optional[np.ndarray] = None
+
+    @property
+    def term_scoped(self) -> bool:  # type: ignore[override]
+        return self.embedder.term_scoped
+
+    @property
+    def vectors(self) -> np.ndarray:
+        """View of the stored embeddings, one row per item"""
+        return self._vectors[:self._size]
+
+    @property
+    def ids(self) -> np.ndarray:
+        """View of the stored item ids, aligned with vectors"""
+        return self._ids[:self._size]
+
+    def __len__(self) -> int:
+        base = len(self._base_ids) if self._base_ids is not None else 0
+        return self._size + base
+
+    def __contains__(self, item_id: int) -> bool:
+        if item_id in self._positions:
+            return True
+        return self._base_ids is not None and bool(np.any(self._base_ids == item_id))
+
+    def attach_base(self, item_ids: np.ndarray, vectors: np.ndarray) -> None:
+        """
+        Attach a read-only segment of precomputed embeddings
+
+        The arrays are used as-is (memory-mapped arrays stay mapped), so
+        several processes attaching the same file share its pages. Items in
+        the base segment cannot be removed individually.
+
+        Args:
+            item_ids: Ids of the items, aligned with vectors
+            vectors: Array of shape (len(item_ids), dimension)
+        """
+        if vectors.ndim != 2 or vectors.shape[1] != self.dimension:
+            raise ValueError(
+                f"Expected embeddings of shape (n, {self.dimension}), got {vectors.shape}"
+            )
+        self._base_ids = item_ids
+        self._base_vectors = vectors
+        self._base_order = None
+
+    def _reserve(self, needed: int) -> None:
+        """Grow the backing arrays so they can hold needed rows"""
+        capacity = self._vectors.shape[0]
+        if needed <= capacity:
+            return
+        while capacity < needed:
+            capacity *= 2
+        vectors = np.zeros((capacity, self.dimension), dtype=self._vectors.dtype)
+        vectors[:self._size] = self._vectors[:self._size]
+        ids = np.zeros(capacity, dtype=np.int64)
+        ids[:self._size] = self._ids[:self._size]
+        self._vectors, self._ids = vectors, ids
+
+    def _write_rows(self, positions: np.ndarray, vectors: np.ndarray) -> None:
+        """Store embeddings at the given row positions"""
+        self._vectors[positions] = vectors
+
+    def _read_row(self, position: int) -> np.ndarray:
+        """Read the embedding stored at a row position as float32"""
+        return self._vectors[position]
+
+    def _move_row(self, src: int, dst: int) -> None:
+        """Copy row src into row dst"""
+        self._vectors[dst] = self._vectors[src]
+        self._ids[dst] = self._ids[src]
+
+    def embed_items(self, items: Sequence[Dict[str, Any]]) -> np.ndarray:
+        """
+        Embed memory items with this index's provider
+
+        Args:
+            items: The memory items to embed
+
+        Returns:
+            embeddings: Array of shape (len(items), dimension)
+        """
+        return self.embedder.embed([item_text(item) for item in items])
+
+    def add_batch(self, item_ids: Sequence[int], items: Sequence[Dict[str, Any]]) -> None:
+        if not item_ids:
+            return
+        self.add_vectors(item_ids, self.embed_items(items))
+
+    def add_vectors(self, item_ids: Sequence[int], vectors: np.ndarray) -> None:
+        """
+        Add precomputed embeddings to the index
+
+        Args:
+            item_ids: Ids of the items, aligned with vectors
+            vectors: Array of shape (len(item_ids), dimension)
+        """
+        vectors = np.asarray(vectors, dtype=np.float32)
+        if vectors.ndim != 2 or vectors.shape[1] != self.dimension:
+            raise ValueError(
+                f"Expected embeddings of shape (n, {self.dimension}), got {vectors.shape}"
+            )
+        self._reserve(self._size + len(item_ids))
+        positions = np.empty(len(item_ids), dtype=np.int64)
+        for i, item_id in enumerate(item_ids):
+            position = self._positions.get(item_id)
+            if position is None:
+                position = self._size
+                self._positions[item_id] = position
+                self._ids[position] = item_id
+                self._size += 1
+            positions[i] = position
+        self._write_rows(positions, vectors)
+
+    def vectors_for(self, item_ids: Sequence[int]) -> np.ndarray:
+        """
+        Get the stored embeddings of items
+
+        Args:
+            item_ids: Ids of the items
+
+        Returns:
+            embeddings: Array of shape (len(item_ids), dimension); rows of
+                items that are not in the index are zero
+        """
+        vectors = np.zeros((len(item_ids), self.dimension), dtype=np.float32)
+        missing: Dict[int, int] = {}
+        for i, item_id in enumerate(item_ids):
+            position = self._positions.get(item_id)
+            if position is not None:
+                vectors[i] = self._read_row(position)
+            else:
+                missing[item_id] = i
+        if missing and self._base_ids is not None and len(self._base_ids):
+            rows = self._candidate_base_rows(missing.keys())
+            for row in rows:
+                vectors[missing[int(self._base_ids[row])]] = self._base_vectors[row]
+        return vectors
+
+    def remove(self, item_id: int) -> bool:
+        position = self._positions.pop(item_id, None)
+        if position is None:
+            return False
+        last = self._size - 1
+        if position != last:
+            self._move_row(last, position)
+            self._positions[int(self._ids[position])] = position
+        self._size = last
+        return True
+
+    def _score_rows(self, query_vector: np.ndarray) -> np.ndarray:
+        """Score the rows outside the base segment against a query embedding"""
+        return self.vectors @ query_vector
+
+    def _score_positions(self, positions: np.ndarray, query_vector: np.ndarray) -> np.ndarray:
+        """Score selected rows outside the base segment against a query embedding"""
+        return self._vectors[positions] @ query_vector
+
+    def _candidate_positions(self, candidates: AbstractSet[int]) -> np.ndarray:
+        """Row positions of the candidates stored outside the base segment"""
+        positions = self._positions
+        return np.fromiter(
+            (positions[item_id] for item_id in candidates if item_id in positions),
+            dtype=np.int64,
+        )
+
+    def _candidate_base_rows(self, candidates: AbstractSet[int]) -> np.ndarray:
+        """Rows of the base segment holding any of the candidates"""
+        if self._base_order is None:
+            self._base_order = np.argsort(self._base_ids, kind="stable")
+        sorted_ids = self._base_ids[self._base_order]
+        wanted = np.fromiter(candidates, dtype=np.int64, count=len(candidates))
+        slots = np.minimum(np.searchsorted(sorted_ids, wanted), len(sorted_ids) - 1)
+        found = sorted_ids[slots] == wanted
+        return self._base_order[slots[found]]
+
+    def _rank_scores(self, similarities: np.ndarray, rows: Any, base: bool) -> np.ndarray:
+        """
+        Turn the similarities of some rows into ranking scores
+
+        Args:
+            similarities: Cosine similarities of the rows
+            rows: Positions (or a slice) of the rows in their segment
+            base: Whether the rows belong to the base segment
+
+        Returns:
+            scores: Ranking scores aligned with similarities
+        """
+        return similarities
+
+    def scores(self, query: str) -> np.ndarray:
+        """
+        Cosine similarity of every item outside the base segment to a query
+
+        Args:
+            query: The query text
+
+        Returns:
+            scores: Array aligned with ids
+        """
+        return self._score_rows(self.embedder.embed_one(query))
+
+    def _search_vector(
+        self,
+        query_vector: np.ndarray,
+        k: int,
+        candidates: Optional[AbstractSet[int]] = None,
+    ) -> List[Tuple[int, float]]:
+        """Top-k search for a query embedding across all segments"""
+        if candidates is None:
+            scores = self._score_rows(query_vector)
+            segments = [(self.ids, self._rank_scores(scores, slice(0, self._size), False))]
+            if self._base_ids is not None:
+                scores = self._base_vectors @ query_vector
+                segments.append((self._base_ids, self._rank_scores(scores, slice(None), True)))
+        else:
+            # Gather only the candidate rows instead of scoring every row
+            positions = self._candidate_positions(candidates)
+            scores = self._score_positions(positions, query_vector)
+            segments = [(self._ids[positions], self._rank_scores(scores, positions, False))]
+            if self._base_ids is not None and len(self._base_ids) and candidates:
+                rows = self._candidate_base_rows(candidates)
+                scores = self._base_vectors[rows] @ query_vector
+                segments.append((self._base_ids[rows], self._rank_scores(scores, rows, True)))
+
+        results: List[Tuple[int, float]] = []
+        for ids, scores in segments:
+            results.extend(
+                (int(ids[p]), float(scores[p]))
+                for p in top_k_indices(scores, k)
+                if scores[p] > self.min_score
+            )
+        if len(segments) > 1:
+            results.sort(key=lambda result: result[1], reverse=True)
+        return results[:k]
+
+    def search(
+        self, query: str, k: int, candidates: Optional[AbstractSet[int]] = None
+    ) -> List[Tuple[int, float]]:
+        if len(self) == 0:
+            return []
+        return self._search_vector(self.embedder.embed_one(query), k, candidates)
+
+    def clear(self) -> None:
+        self._positions.clear()
+        self._size = 0
+        self._base_ids = None
+        self._base_vectors = None
+        self._base_order = None
@@ -0,0 +1,197 @@
+"""
+Vector index ranking by similarity, recency and importance
+"""
+import logging
+import math
+import time
+from typing import Any, Callable, Dict, Optional, Sequence
+
+import numpy as np
+
+from .embeddings import EmbeddingProvider
+from .short_term import default_importance
+from .vector_index import VectorIndex
+
+logger = logging.getLogger(__name__)
+
+
+class WeightedVectorIndex(VectorIndex):
+    """
+    VectorIndex whose ranking mixes similarity with time decay and importance
+
+    An item scores
+
+        similarity_weight * cosine
+        + recency_weight * 0.5 ** (age / half_life)
+        + importance_weight * importance
+
+    Decay factors live in a float64 array aligned with the embedding rows,
+    relative to a reference time. A query only computes the scalar decay of
+    the reference time itself, so ranking stays one fused vectorized pass
+    over the matrix with no per-item exponentials; the array is rescaled
+    once per half-life to keep the reference close to the present.
+    """
+
+    def __init__(
+        self,
+        embedder: Optional[EmbeddingProvider] = None,
+        half_life: float = 86400.0,
+        similarity_weight: float = 1.0,
+        recency_weight: float = 0.5,
+        importance_weight: float = 0.5,
+        importance_fn: Optional[Callable[[Dict[str, Any]], float]] = None,
+        timestamp_field: str = "timestamp",
+        clock: Callable[[], float] = time.time,
+        initial_capacity: int = 1024,
+        min_score: float = 0.0,
+    ) -> None:
+        """
+        Initialize the index
+
+        Args:
+            embedder: Embedding provider (defaults to HashEmbeddingProvider)
+            half_life: Seconds after which an item's recency halves
+            similarity_weight: Weight of the cosine similarity
+            recency_weight: Weight of the time decay (1.0 for a new item)
+            importance_weight: Weight of the importance score
+            importance_fn: Scores items for importance, ideally in [0, 1]
+                (defaults to the item's "importance" field)
+            timestamp_field: Item field holding the creation time in
+                seconds; items without it count as created when indexed
+            clock: Returns the current time in seconds
+            initial_capacity: Number of rows to preallocate
+            min_score: Results whose combined score is at or below this
+                value are dropped. Items with no similarity to the query
+                are never returned, however recent or important.
+        """
+        if half_life <= 0:
+            raise ValueError("half_life must be positive")
+        super().__init__(embedder, initial_capacity, min_score)
+        self.half_life = half_life
+        self.similarity_weight = similarity_weight
+        self.recency_weight = recency_weight
+        self.importance_weight = importance_weight
+        self.importance_fn = importance_fn or default_importance
+        self.timestamp_field = timestamp_field
+        self.clock = clock
+        self._rate = math.log(2.0) / half_life
+        self._reference = clock()
+        capacity = self._vectors.shape[0]
+        self._decay = np.zeros(capacity, dtype=np.float64)
+        self._importance = np.zeros(capacity, dtype=np.float64)
+        self._base_decay: Optional[np.ndarray] = None
+        self._base_importance: Optional[np.ndarray] = None
+
+    def _decay_at_reference(self, timestamps: np.ndarray, now: float) -> np.ndarray:
+        """Decay factors of creation times relative to the reference time"""
+        ages = self._reference - np.minimum(timestamps, now)
+        return np.exp(-self._rate * ages)
+
+    def _reference_decay(self) -> float:
+        """
+        Decay of the reference time, rebasing the arrays once it halves
+
+        Returns:
+            factor: Multiplier turning stored factors into current recency
+        """
+        now = self.clock()
+        factor = math.exp(-self._rate * max(0.0, now - self._reference))
+        if factor < 0.5:
+            self._decay[:self._size] *= factor
+            if self._base_decay is not None:
+                self._base_decay *= factor
+            self._reference = now
+            factor = 1.0
+        return factor
+
+    def attach_base(self, item_ids: np.ndarray, vectors: np.ndarray) -> None:
+        """
+        Attach a read-only segment of precomputed embeddings
+
+        Base items rank on similarity alone until set_weights() gives them
+        their creation time and importance.
+
+        Args:
+            item_ids: Ids of the items, aligned with vectors
+            vectors: Array of shape (len(item_ids), dimension)
+        """
+        super().attach_base(item_ids, vectors)
+        self._base_decay = np.zeros(len(item_ids), dtype=np.float64)
+        self._base_importance = np.zeros(len(item_ids), dtype=np.float64)
+
+    def _reserve(self, needed: int) -> None:
+        capacity = self._vectors.shape[0]
+        super()._reserve(needed)
+        if self._vectors.shape[0] != capacity:
+            for name in ("_decay", "_importance"):
+                grown = np.zeros(self._vectors.shape[0], dtype=np.float64)
+                grown[:self._size] = getattr(self, name)[:self._size]
+                setattr(self, name, grown)
+
+    def _move_row(self, src: int, dst: int) -> None:
+        super()._move_row(src, dst)
+        self._decay[dst] = self._decay[src]
+        self._importance[dst] = self._importance[src]
+
+    def add_batch(self, item_ids: Sequence[int], items: Sequence[Dict[str, Any]]) -> None:
+        if not item_ids:
+            return
+        self.add_vectors(item_ids, self.embed_items(items))
+        self.set_weights(item_ids, items)
+
+    def add_vectors(self, item_ids: Sequence[int], vectors: np.ndarray) -> None:
+        super().add_vectors(item_ids, vectors)
+        # Until set_weights() says otherwise, items are new and unimportant
+        now = self.clock()
+        positions = [self._positions[item_id] for item_id in item_ids]
+        self._decay[positions] = self._decay_at_reference(np.full(len(positions), now), now)
+        self._importance[positions] = 0.0
+
+    def set_weights(self, item_ids: Sequence[int], items: Sequence[Dict[str, Any]]) -> None:
+        """
+        Record the creation time and importance of indexed items
+
+        Args:
+            item_ids: Ids of the items, aligned with items
+            items: The memory items
+        """
+        if not item_ids:
+            return
+        now = self.clock()
+        timestamps = np.empty(len(items), dtype=np.float64)
+        for i, item in enumerate(items):
+            value = item.get(self.timestamp_field)
+            timestamps[i] = value if isinstance(value, (int, float)) else now
+        decay = self._decay_at_reference(timestamps, now)
+        importance = np.fromiter(
+            (self.importance_fn(item) for item in items), dtype=np.float64, count=len(items)
+        )
+
+        missing: Dict[int, int] = {}
+        for i, item_id in enumerate(item_ids):
+            position = self._positions.get(item_id)
+            if position is not None:
+                self._decay[position] = decay[i]
+                self._importance[position] = importance[i]
+            else:
+                missing[item_id] = i
+        if missing and self._base_ids is not None and len(self._base_ids):
+            for row in self._candidate_base_rows(missing.keys()):
+                i = missing[int(self._base_ids[row])]
+                self._base_decay[row] = decay[i]
+                self._base_importance[row] = importance[i]
+
+    def _rank_scores(self, similarities: np.ndarray, rows: Any, base: bool) -> np.ndarray:
+        decay = self._base_decay if base else self._decay
+        importance = self._base_importance if base else self._importance
+        scores = self.similarity_weight * similarities
+        scores += (self.recency_weight * self._reference_decay()) * decay[rows]
+        scores += self.importance_weight * importance[rows]
+        scores[similarities <= 0.0] = -np.inf
+        return scores
+
+    def clear(self) -> None:
+        super().clear()
+        self._base_decay = None
+        self._base_importance = None
+        self._reference = self.clock()
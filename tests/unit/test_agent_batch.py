@@ -0,0 +1,81 @@
+"""
+Unit tests for batch runs of an agent
+"""
+import asyncio
+
+import pytest
+
+from mindchain import Agent, AgentConfig
+from mindchain.core import BatchResult
+from mindchain.llm import LLMBackend, LLMRequest, LLMResponse
+
+
+class RecordingBackend(LLMBackend):
+    """Echoes the last message, failing on "bad" inputs and sleeping on "slow" ones"""
+
+    def __init__(self):
+        self.in_flight = 0
+        self.peak = 0
+        self.requests = []
+
+    async def generate(self, request: LLMRequest) -> LLMResponse:
+        prompt = request.messages[-1]["content"]
+        self.requests.append(request)
+        self.in_flight += 1
+        self.peak = max(self.peak, self.in_flight)
+        try:
+            await asyncio.sleep(0.05 if "slow" in prompt else 0.001)
+            if "bad" in prompt:
+                raise RuntimeError(f"cannot answer {prompt}")
+            return LLMResponse(content=f"echo {prompt}")
+        finally:
+            self.in_flight -= 1
+
+
+class TestAgentBatch:
+    """Tests for Agent.run_batch and Agent.iter_batch"""
+
+    @pytest.mark.asyncio
+    async def test_results_in_input_order_with_bounded_concurrency(self):
+        """Test that a batch keeps input order, bounds concurrency and stores every interaction"""
+        backend = RecordingBackend()
+        agent = Agent(AgentConfig(name="Nightly"), backend=backend)
+
+        results = await agent.run_batch((f"item {i}" for i in range(50)), concurrency=4, store_batch_size=8)
+
+        assert [result.index for result in results] == list(range(50))
+        assert all(result.ok for result in results)
+        assert results[7].response == "echo item 7"
+        assert backend.peak == 4
+        assert agent.memory.get_memory_status()["short_term_count"] == 50
+        assert agent._history == []
+        assert agent.status.value == "idle"
+        # Items are independent: each request carries only its own input
+        assert all(request.messages[-2]["role"] == "system" for request in backend.requests)
+
+    @pytest.mark.asyncio
+    async def test_item_errors_do_not_abort_batch(self):
+        """Test that failing inputs are captured in their results"""
+        agent = Agent(AgentConfig(name="Nightly"), backend=RecordingBackend())
+
+        results = await agent.run_batch(["good 1", "bad 2", "good 3"], concurrency=2)
+
+        assert [result.ok for result in results] == [True, False, True]
+        assert isinstance(results[1].error, RuntimeError)
+        assert results[1].response is None
+        assert agent.memory.get_memory_status()["short_term_count"] == 2
+        assert agent.status.value == "idle"
+
+    @pytest.mark.asyncio
+    async def test_iter_batch_yields_in_completion_order(self):
+        """Test that iter_batch yields fast inputs before slow ones"""
+        agent = Agent(AgentConfig(name="Nightly"), backend=RecordingBackend())
+
+        results = [
+            result async for result in
+            agent.iter_batch(["slow 0", "fast 1", "fast 2"], concurrency=3, store_batch_size=1)
+        ]
+
+        assert [result.index for result in results] == [1, 2, 0]
+        assert isinstance(results[0], BatchResult)
+        assert results[2].latency >= 0.05
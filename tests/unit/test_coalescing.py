@@ -0,0 +1,85 @@
+"""
+Unit tests for single-flight request coalescing
+"""
+import asyncio
+
+import pytest
+
+from mindchain import Agent, AgentConfig
+from mindchain.core import SingleFlight
+from mindchain.llm import LatencyModel, SimulatedBackend
+
+
+class TestSingleFlight:
+    """Tests for SingleFlight and its use by Agent"""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_calls_share_one_execution(self):
+        """Test that identical concurrent calls run once and all get the result"""
+        flight = SingleFlight()
+        started = []
+
+        async def call():
+            started.append(1)
+            await asyncio.sleep(0.01)
+            return "result"
+
+        results = await asyncio.gather(*(flight.do("key", call) for _ in range(10)))
+        other = await flight.do("other", call)
+
+        assert results == ["result"] * 10
+        assert other == "result"
+        assert len(started) == 2
+        assert flight.get_stats() == {"calls": 11, "executions": 2, "coalesced": 9, "in_flight": 0}
+
+    @pytest.mark.asyncio
+    async def test_failure_propagates_to_all_waiters(self):
+        """Test that every waiter sees the exception of the shared call"""
+        flight = SingleFlight()
+
+        async def call():
+            await asyncio.sleep(0.01)
+            raise ValueError("backend down")
+
+        results = await asyncio.gather(*(flight.do("key", call) for _ in range(3)), return_exceptions=True)
+
+        assert all(isinstance(result, ValueError) for result in results)
+        assert len(flight) == 0
+
+    @pytest.mark.asyncio
+    async def test_cancelled_waiter_does_not_cancel_call(self):
+        """Test that the shared call survives the cancellation of a waiter"""
+        flight = SingleFlight()
+        release = asyncio.Event()
+
+        async def call():
+            await release.wait()
+            return "done"
+
+        first = asyncio.ensure_future(flight.do("key", call))
+        second = asyncio.ensure_future(flight.do("key", call))
+        await asyncio.sleep(0)
+        first.cancel()
+        await asyncio.sleep(0)
+        release.set()
+
+        assert await second == "done"
+        assert first.cancelled()
+        assert flight.get_stats()["executions"] == 1
+
+    @pytest.mark.asyncio
+    async def test_agents_coalesce_identical_backend_calls(self):
+        """Test that a burst of identical agent requests reaches the backend once"""
+        backend = SimulatedBackend(LatencyModel(
+            first_token_median=0.02, first_token_sigma=0.0,
+            tokens_per_second=10000.0, completion_tokens_median=8,
+        ))
+        flight = SingleFlight()
+        config = AgentConfig(name="Health", temperature=0.0)
+        agents = [Agent(config, backend=backend, coalescer=flight) for _ in range(20)]
+
+        responses = await asyncio.gather(*(agent.run("ping") for agent in agents))
+
+        assert len(set(responses)) == 1
+        assert backend.get_stats()["requests"] == 1
+        assert agents[0].get_status()["coalescing"]["coalesced"] == 19
@@ -0,0 +1,131 @@
+"""
+Unit tests for token-budget context packing
+"""
+import pytest
+
+from mindchain import Agent, AgentConfig
+from mindchain.core import ApproximateTokenizer, ContextPacker, Tokenizer
+from mindchain.core.errors import AgentError
+from mindchain.llm import LLMBackend, LLMRequest, LLMResponse
+
+
+class WordTokenizer(Tokenizer):
+    """One token per word, counting calls"""
+
+    def __init__(self):
+        self.calls = 0
+
+    def count(self, text):
+        self.calls += 1
+        return len(text.split())
+
+
+class CapturingBackend(LLMBackend):
+    """Records requests and fails like a model whose context overflows"""
+
+    def __init__(self, context_window):
+        self.context_window = context_window
+        self.requests = []
+
+    async def generate(self, request: LLMRequest) -> LLMResponse:
+        self.requests.append(request)
+        prompt = sum(ApproximateTokenizer().count(message["content"]) + 4 for message in request.messages)
+        if prompt + request.max_tokens > self.context_window:
+            raise RuntimeError("context length exceeded")
+        return LLMResponse(content="noted " + "x" * 200)
+
+
+def _history(turns, words=10):
+    history = []
+    for i in range(turns):
+        history.append({"role": "user", "content": " ".join([f"q{i}"] * words)})
+        history.append({"role": "assistant", "content": " ".join([f"a{i}"] * words)})
+    return history
+
+
+class TestContextPacker:
+    """Tests for ContextPacker and its use by Agent"""
+
+    def test_keeps_newest_history_within_budget(self):
+        """Test that the most recent contiguous history fits the budget"""
+        packer = ContextPacker(WordTokenizer(), message_overhead=0, context_share=0.0)
+        history = _history(10) + [{"role": "user", "content": "latest question"}]
+
+        packed = packer.pack("be brief", [], history, budget=45)
+
+        assert packed.messages[0] == {"role": "system", "content": "be brief"}
+        assert packed.messages[-1]["content"] == "latest question"
+        assert packed.messages[1:-1] == history[-5:-1]
+        assert packed.prompt_tokens == 2 + 2 + 40
+        assert packed.dropped_history == 16
+
+    def test_context_items_fill_their_share_in_order(self):
+        """Test that context is added by relevance up to its share of the budget"""
+        packer = ContextPacker(WordTokenizer(), message_overhead=0, context_share=0.5)
+        context = ["one two three four", "five six seven eight", "", "nine ten"]
+
+        packed = packer.pack("sys", context, [{"role": "user", "content": "hi"}], budget=26)
+
+        assert packed.context_items == 2
+        assert packed.messages[1]["content"] == "Relevant context: one two three four\n\nfive six seven eight"
+        assert packed.dropped_context == 1
+
+    def test_token_counts_are_cached_per_message(self):
+        """Test that each turn only tokenizes texts it has not seen"""
+        tokenizer = WordTokenizer()
+        packer = ContextPacker(tokenizer)
+        history = _history(20)
+        packer.pack("sys", [], history, budget=10000)
+        calls = tokenizer.calls
+
+        history.append({"role": "user", "content": "new turn"})
+        packer.pack("sys", [], history, budget=10000)
+
+        assert tokenizer.calls - calls == 1
+        assert packer.get_stats()["hits"] > 40
+
+    def test_oversized_inputs(self):
+        """Test that an oversized newest message is cut and an oversized system prompt rejected"""
+        packer = ContextPacker(WordTokenizer(), message_overhead=0)
+
+        packed = packer.pack("sys", [], [{"role": "user", "content": "w " * 100}], budget=11)
+        assert packed.prompt_tokens == 11
+        assert packed.messages[-1]["content"].split() == ["w"] * 10
+
+        with pytest.raises(AgentError, match="System prompt"):
+            packer.pack("a b c", [], [], budget=2)
+
+    @pytest.mark.asyncio
+    async def test_stored_turns_are_packed_as_context(self):
+        """Test that the text of an earlier turn reaches the packed prompt"""
+        backend = CapturingBackend(context_window=4096)
+        agent = Agent(AgentConfig(name="Recall", context_window=4096, max_tokens=128), backend=backend)
+        await agent.run("the launch code is 0000")
+
+        await agent.run("what is the launch code?")
+
+        context = [
+            message["content"] for message in backend.requests[-1].messages
+            if message["content"].startswith("Relevant context: ")
+        ]
+        assert len(context) == 1
+        assert "the launch code is 0000\nnoted" in context[0]
+
+    @pytest.mark.asyncio
+    async def test_long_session_never_overflows_context(self):
+        """Test that an agent with a context window keeps long sessions within it"""
+        config = AgentConfig(name="Chatty", context_window=512, max_tokens=128)
+        backend = CapturingBackend(context_window=512)
+        agent = Agent(config, backend=backend)
+
+        for turn in range(40):
+            await agent.run(f"turn {turn} " + "detail " * 30)
+
+        assert len(agent._history) == 80
+        assert agent.get_status()["context_packer"]["hits"] > 0
+        last = backend.requests[-1].messages
+        assert last[-1]["content"].startswith("turn 39")
+        assert len(last) < 80
+
+        unpacked = Agent(AgentConfig(name="Legacy", max_tokens=128), backend=CapturingBackend(512))
+        assert unpacked.context_packer is None
@@ -0,0 +1,44 @@
+"""
+Unit tests for MinHash near-duplicate detection
+"""
+import pytest
+
+from mindchain.memory import MinHashDeduplicator
+from mindchain.memory.dedup import lsh_bands
+
+
+class TestMinHashDeduplicator:
+    """Tests for MinHashDeduplicator"""
+
+    def test_lsh_bands_track_threshold(self):
+        """Test that stricter thresholds use longer bands"""
+        loose_bands, loose_rows = lsh_bands(0.5, 64)
+        strict_bands, strict_rows = lsh_bands(0.9, 64)
+
+        assert loose_bands * loose_rows == strict_bands * strict_rows == 64
+        assert strict_rows > loose_rows
+
+    @pytest.mark.parametrize("threshold, expect_match", [(0.5, True), (0.95, False)])
+    def test_threshold_controls_matches(self, threshold, expect_match):
+        """Test that the similarity threshold decides what counts as a duplicate"""
+        dedup = MinHashDeduplicator(threshold=threshold, num_perm=128)
+        base = "the build failed because the cache directory was missing on the runner"
+        dedup.add(1, dedup.signature({"input": base}))
+        dedup.add(2, dedup.signature({"input": "deploy the frontend to staging"}))
+
+        variant = dedup.signature({"input": base.replace("runner", "worker")})
+
+        assert (dedup.find(variant) == 1) is expect_match
+        assert dedup.find(dedup.signature({"input": "unrelated text entirely"})) is None
+        assert dedup.signature({"input": ""}) is None
+
+    def test_remove_forgets_signature(self):
+        """Test that removed items are no longer matched"""
+        dedup = MinHashDeduplicator()
+        signature = dedup.signature({"content": "continue from where you left off"})
+        dedup.add(7, signature)
+        assert dedup.find(signature) == 7
+
+        assert dedup.remove(7) is True
+        assert dedup.find(signature) is None
+        assert len(dedup) == 0
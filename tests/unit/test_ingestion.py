@@ -0,0 +1,66 @@
+"""
+Unit tests for streaming document ingestion
+"""
+import pytest
+
+from mindchain import MemoryManager
+from mindchain.memory import BM25Index, ingest, iter_chunks
+
+
+class TestIngestion:
+    """Tests for chunking and batched ingestion"""
+
+    def test_chunks_overlap_and_respect_words(self, tmp_path):
+        """Test that chunks overlap, cover the file and end on whitespace"""
+        path = tmp_path / "doc.txt"
+        words = [f"wörd{i}" for i in range(400)]
+        path.write_text(" ".join(words), encoding="utf-8")
+
+        chunks = list(iter_chunks(str(path), chunk_size=200, overlap=40))
+
+        assert len(chunks) > 10
+        assert chunks[0][0] == 0
+        for (_, previous), (_, current) in zip(chunks, chunks[1:]):
+            assert previous.split()[-1] in current
+        assert set(" ".join(text for _, text in chunks).split()) >= set(words)
+        assert all(len(text.encode("utf-8")) <= 200 for _, text in chunks)
+
+    def test_large_overlap_still_advances_by_step(self, tmp_path):
+        """Test that whitespace snapping never shrinks the step below chunk_size - overlap"""
+        path = tmp_path / "sparse.txt"
+        words = [f"{i:04d}" + "x" * 55 for i in range(100)]
+        path.write_text(" ".join(words))
+
+        chunks = list(iter_chunks(str(path), chunk_size=100, overlap=90))
+
+        starts = [offset for offset, _ in chunks]
+        assert all(current - previous >= 10 for previous, current in zip(starts, starts[1:]))
+        assert len(chunks) <= 6000 // 10 + 1
+        assert "".join(text for _, text in chunks).count("0099") >= 1
+        with pytest.raises(ValueError):
+            list(iter_chunks(str(path), chunk_size=100, overlap=100))
+        with pytest.raises(ValueError):
+            list(iter_chunks(str(path), chunk_size=100, overlap=-1))
+
+    @pytest.mark.asyncio
+    async def test_ingest_directory_in_batches(self, tmp_path):
+        """Test that a directory is streamed into memory with a throughput report"""
+        (tmp_path / "nested").mkdir()
+        (tmp_path / "a.md").write_text("Kubernetes runbook. " * 200)
+        (tmp_path / "nested" / "b.md").write_text("Billing escalation policy. " * 200)
+        (tmp_path / "skip.bin").write_bytes(b"\x00" * 100)
+        memory = MemoryManager(index=BM25Index(), short_term_capacity=16, consolidation_batch_size=8)
+
+        report = await ingest(memory, str(tmp_path), chunk_size=256, overlap=32, batch_size=10,
+                              extensions=[".md"], metadata={"corpus": "docs"})
+
+        assert report.files == 2
+        assert report.batches == -(-report.chunks // 10)
+        assert report.chunks_per_second > 0 and report.mb_per_second > 0
+        status = memory.get_memory_status()
+        assert status["short_term_count"] == 16
+        assert status["pending_consolidation"] == 0
+        assert status["short_term_count"] + status["long_term_count"] == report.chunks
+        relevant = await memory.retrieve_relevant("billing escalation", k=1)
+        assert relevant[0]["source"].endswith("b.md")
+        assert relevant[0]["corpus"] == "docs"
@@ -0,0 +1,72 @@
+"""
+Unit tests for the BM25 lexical index
+"""
+import pytest
+
+from mindchain import MemoryManager
+from mindchain.memory import BM25Index
+
+
+class TestBM25Index:
+    """Tests for BM25Index"""
+
+    def test_rare_terms_outrank_common_terms(self):
+        """Test BM25 ranking over the fields written by Agent.run"""
+        index = BM25Index()
+        index.add_batch(
+            [1, 2, 3],
+            [
+                {"input": "the deployment failed", "response": "check the logs"},
+                {"input": "the weather is nice", "response": "the sun is out"},
+                {"content": "kubernetes deployment guide"},
+            ],
+        )
+
+        results = index.search("kubernetes deployment", k=3)
+
+        assert [item_id for item_id, _ in results] == [3, 1]
+        assert index.search("unknown words", k=3) == []
+
+    def test_remove_updates_postings(self):
+        """Test that removal drops the item from all postings"""
+        index = BM25Index()
+        index.add(1, {"input": "alpha beta"})
+        index.add(2, {"input": "beta gamma"})
+
+        assert index.remove(1) is True
+        assert index.remove(1) is False
+        assert len(index) == 1
+        assert index.search("alpha", k=5) == []
+        assert [item_id for item_id, _ in index.search("beta", k=5)] == [2]
+
+    def test_common_terms_only_rescore_candidates(self):
+        """Test that very common terms do not pull in unrelated items"""
+        index = BM25Index(common_term_ratio=0.5)
+        for i in range(10):
+            index.add(i, {"input": f"hello item{i}"})
+
+        index.add(10, {"input": "item3 again"})
+
+        results = index.search("hello item3", k=2)
+
+        assert [item_id for item_id, _ in results] == [3, 10]
+
+    def test_search_restricted_to_candidates(self):
+        """Test that a candidate filter limits the scored documents"""
+        index = BM25Index()
+        for i in range(10):
+            index.add(i, {"input": f"hello item{i}"})
+
+        assert [item_id for item_id, _ in index.search("hello item3", k=5, candidates={3, 4})] == [3, 4]
+        assert [item_id for item_id, _ in index.search("item3", k=5, candidates={4})] == []
+
+    @pytest.mark.asyncio
+    async def test_lexical_retrieval_mode(self):
+        """Test MemoryManager retrieval with a BM25 index"""
+        memory = MemoryManager(index=BM25Index())
+        await memory.store({"input": "What port does Redis use?", "response": "6379"})
+        await memory.store({"input": "Where is the office?", "response": "Downtown"})
+
+        relevant = await memory.retrieve_relevant("redis port")
+
+        assert [item["response"] for item in relevant] == ["6379"]
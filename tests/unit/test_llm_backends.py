@@ -0,0 +1,183 @@
+"""
+Unit tests for the LLM backends
+"""
+import asyncio
+import random
+
+import pytest
+
+from mindchain import Agent, AgentConfig
+from mindchain.core.errors import AgentError, BackendError
+from mindchain.llm import (HTTPBackend, LatencyModel, LLMRequest, SimulatedBackend,
+                           StubLLMServer)
+
+FAST = LatencyModel(
+    first_token_median=0.01,
+    first_token_sigma=0.0,
+    tokens_per_second=10000.0,
+    tokens_per_second_sigma=0.0,
+    completion_tokens_median=8,
+    completion_tokens_sigma=0.0,
+)
+
+
+def _request(text="hello", **metadata):
+    return LLMRequest(
+        model="test-model",
+        messages=[{"role": "user", "content": text}],
+        max_tokens=16,
+        metadata=metadata,
+    )
+
+
+class TestSimulatedBackend:
+    """Tests for requests, latency models and the in-process backend"""
+
+    def test_fingerprint_ignores_metadata(self):
+        """Test that only the completion inputs are hashed"""
+        assert _request(agent_id="a").fingerprint() == _request(agent_id="b").fingerprint()
+        assert _request("hello").fingerprint() != _request("goodbye").fingerprint()
+
+    def test_latency_model_respects_max_tokens(self):
+        """Test that sampled completions never exceed max_tokens"""
+        model = LatencyModel(completion_tokens_median=500)
+        samples = [model.sample(random.Random(i), 32) for i in range(50)]
+
+        assert all(1 <= sample["completion_tokens"] <= 32 for sample in samples)
+        assert all(sample["first_token"] > 0 for sample in samples)
+
+    @pytest.mark.asyncio
+    async def test_completion_is_deterministic(self):
+        """Test that the same request yields the same content"""
+        backend = SimulatedBackend(FAST, seed=1)
+
+        first = await backend.generate(_request())
+        second = await backend.generate(_request())
+
+        assert first.content == second.content
+        assert first.completion_tokens == 8
+        assert first.latency >= 0.01
+        assert backend.get_stats()["requests"] == 2
+
+    @pytest.mark.asyncio
+    async def test_stream_yields_tokens_in_order(self):
+        """Test that streaming produces the same content token by token"""
+        backend = SimulatedBackend(FAST)
+
+        chunks = [chunk async for chunk in backend.stream(_request())]
+
+        assert len(chunks) == 8
+        assert "".join(chunks) == (await backend.generate(_request())).content
+
+
+class TestHTTPBackend:
+    """Tests for HTTPBackend against the stub server"""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_requests_reuse_pooled_connections(self):
+        """Test that many requests share a bounded set of keep-alive connections"""
+        async with StubLLMServer(FAST, seed=1) as server:
+            backend = HTTPBackend(server.url, max_connections=2)
+            responses = await asyncio.gather(*(backend.generate(_request(f"q{i}")) for i in range(20)))
+            await backend.aclose()
+
+        assert all(response.completion_tokens == 8 for response in responses)
+        assert responses[3].content == (await SimulatedBackend(FAST).generate(_request("q3"))).content
+        assert server.stats["connections"] == 2
+        assert server.stats["requests"] == 20
+        stats = backend.get_stats()
+        assert stats["connections_opened"] == 2
+        assert stats["connections_reused"] == 18
+        assert stats["in_flight"] == 0
+
+    @pytest.mark.asyncio
+    async def test_timeout_and_http_errors(self):
+        """Test that slow and failed requests raise BackendError"""
+        slow = LatencyModel(first_token_median=1.0, first_token_sigma=0.0)
+        async with StubLLMServer(slow) as server:
+            backend = HTTPBackend(server.url, timeout=0.05, max_retries=1, retry_backoff=0.0)
+            with pytest.raises(BackendError, match="timed out"):
+                await backend.generate(_request())
+            assert backend.get_stats()["retries"] == 1
+
+            missing = HTTPBackend(server.url, path="/v1/missing")
+            with pytest.raises(BackendError, match="404"):
+                await missing.generate(_request())
+            assert missing.get_stats()["retries"] == 0
+            await missing.aclose()
+
+    @pytest.mark.asyncio
+    async def test_reconnects_after_server_restart(self):
+        """Test that dropped keep-alive connections are replaced"""
+        server = await StubLLMServer(FAST).start()
+        backend = HTTPBackend(server.url, retry_backoff=0.0)
+        await backend.generate(_request())
+        await server.stop()
+
+        server = await StubLLMServer(FAST, port=server.port).start()
+        response = await backend.generate(_request())
+        await backend.aclose()
+        await server.stop()
+
+        assert response.completion_tokens == 8
+        assert backend.get_stats()["connections_opened"] == 2
+
+    @pytest.mark.asyncio
+    async def test_stream_over_keep_alive_connection(self):
+        """Test that event streams are decoded and finished streams free their connection"""
+        async with StubLLMServer(FAST) as server:
+            backend = HTTPBackend(server.url, max_connections=1)
+            first = [chunk async for chunk in backend.stream(_request())]
+            second = [chunk async for chunk in backend.stream(_request("again"))]
+
+            abandoned = backend.stream(_request())
+            await abandoned.__anext__()
+            await abandoned.aclose()
+            await backend.generate(_request())
+            await backend.aclose()
+
+        assert len(first) == 8
+        assert "".join(first) == (await SimulatedBackend(FAST).generate(_request())).content
+        assert len(second) == 8
+        stats = backend.get_stats()
+        assert stats["connections_reused"] == 2
+        assert stats["connections_opened"] == 2
+        assert stats["in_flight"] == 0
+
+    @pytest.mark.asyncio
+    async def test_agent_generates_through_backend(self):
+        """Test that Agent.run sends its messages to the backend"""
+        async with StubLLMServer(FAST) as server:
+            backend = HTTPBackend(server.url)
+            agent = Agent(AgentConfig(name="Remote", model_name="stub-model"), backend=backend)
+
+            response = await agent.run("Summarize the plan")
+            await backend.aclose()
+
+        assert response and "simulated response" not in response
+        assert agent.memory.short_term_memory.recent(1)[0]["response"] == response
+
+        failing = Agent(AgentConfig(name="Down"), backend=HTTPBackend(server.url, max_retries=0))
+        with pytest.raises(AgentError):
+            await failing.run("Anyone there?")
+
+    @pytest.mark.asyncio
+    async def test_agent_run_stream(self):
+        """Test that run_stream yields chunks and records the interaction once"""
+        async with StubLLMServer(FAST) as server:
+            backend = HTTPBackend(server.url)
+            agent = Agent(AgentConfig(name="Streamer", model_name="stub-model"), backend=backend)
+
+            chunks = [chunk async for chunk in agent.run_stream("Summarize the plan")]
+
+            stream = agent.run_stream("And the next step?")
+            first = await stream.__anext__()
+            await stream.aclose()
+            await backend.aclose()
+
+        assert len(chunks) == 8
+        assert [message["role"] for message in agent._history] == ["user", "assistant"] * 2
+        assert agent._history[1]["content"] == "".join(chunks)
+        assert agent._history[3]["content"] == first
+        assert agent.memory.get_memory_status()["short_term_count"] == 2
+        assert agent.status.value == "idle"
@@ -9,9 +9,11 @@ from unittest.mock import MagicMock, AsyncMock, patch
 try:
     from mindchain import MCP, Agent
     from mindchain.core.errors import MCPError
+    from mindchain.llm import LatencyModel, SimulatedBackend
 except ImportError:
     from src.mindchain import MCP, Agent
     from src.mindchain.core.errors import MCPError
+    from src.mindchain.llm import LatencyModel, SimulatedBackend
 
 class TestMCP:
     """Test cases for the MCP class"""
@@ -123,3 +125,25 @@ class TestMCP:
         
         with pytest.raises(ValueError, match="Test error"):
             await mcp.supervise_execution(agent_id, mock_task)
+
+    @pytest.mark.asyncio
+    async def test_supervise_stream_stops_at_token_limit(self, mcp, agent_config):
+        """Test that streamed output is truncated and generation stopped at the limit"""
+        backend = SimulatedBackend(LatencyModel(
+            first_token_median=0.001, first_token_sigma=0.0,
+            tokens_per_second=10000.0, tokens_per_second_sigma=0.0,
+            completion_tokens_median=200, completion_tokens_sigma=0.0,
+        ))
+        agent = Agent(agent_config, backend=backend)
+        agent_id = mcp.register_agent(agent)
+        mcp.policy_manager.update_policy("max_tokens_per_response", 5)
+
+        chunks = [chunk async for chunk in mcp.supervise_stream(agent_id, lambda: agent.run_stream("Go"))]
+
+        text = "".join(chunks)
+        assert text.endswith("... [Content truncated due to token limit]")
+        assert len(text.split("...")[0]) == 20
+        assert backend.get_stats()["completion_tokens"] < 200
+        assert agent._history[-1]["role"] == "assistant"
+        assert mcp.agent_metrics[agent_id].total_tasks_completed == 1
+        assert mcp.resource_manager.get_resource_usage()["active_tasks"] == 0
@@ -0,0 +1,352 @@
+"""
+Unit tests for the MemoryManager
+"""
+import asyncio
+
+import pytest
+
+from mindchain import MemoryManager
+from mindchain.core.errors import MemoryError
+from mindchain.memory import (BM25Index, ExtractiveSummarizer, HashEmbeddingProvider, HybridIndex,
+                              MetadataIndex, MinHashDeduplicator, RetrievalCache, VectorIndex,
+                              reciprocal_rank_fusion)
+
+
+class FlakyEmbedder(HashEmbeddingProvider):
+    """Hash embeddings that raise while failing is set"""
+
+    def __init__(self):
+        super().__init__()
+        self.failing = False
+
+    def embed(self, texts):
+        if self.failing:
+            raise RuntimeError("embedding service unavailable")
+        return super().embed(texts)
+
+
+class TestMemoryManager:
+    """Test cases for MemoryManager"""
+
+    @pytest.mark.asyncio
+    async def test_retrieve_without_index_returns_recent_items(self):
+        """Test the recency fallback when no index is configured"""
+        memory = MemoryManager()
+        for i in range(8):
+            await memory.store({"input": f"message {i}"})
+
+        relevant = await memory.retrieve_relevant("anything")
+
+        assert [item["input"] for item in relevant] == [f"message {i}" for i in range(3, 8)]
+
+    @pytest.mark.asyncio
+    async def test_retrieve_with_vector_index_uses_query(self):
+        """Test that a vector index ranks items against the query"""
+        memory = MemoryManager(index=VectorIndex())
+        await memory.store({"input": "Tell me about Paris", "response": "Paris is in France."})
+        for i in range(10):
+            await memory.store({"input": f"filler question {i}", "response": "filler answer"})
+
+        relevant = await memory.retrieve_relevant("what is the capital of France", k=1)
+
+        assert relevant[0]["input"] == "Tell me about Paris"
+        assert memory.get_memory_status()["indexed_count"] == 11
+
+    @pytest.mark.asyncio
+    async def test_clear_short_term_removes_indexed_items(self):
+        """Test that clearing short-term memory also clears the index"""
+        memory = MemoryManager(index=VectorIndex())
+        await memory.store({"input": "hello world"})
+
+        memory.clear_short_term()
+
+        assert await memory.retrieve_relevant("hello") == []
+        assert memory.get_memory_status()["indexed_count"] == 0
+
+    @pytest.mark.asyncio
+    async def test_short_term_is_bounded_and_consolidated(self):
+        """Test that evicted items are consolidated into long-term memory"""
+        memory = MemoryManager(
+            index=VectorIndex(), short_term_capacity=4, consolidation_batch_size=2
+        )
+        for i in range(9):
+            await memory.store({"input": f"topic{i} question"})
+        await memory.consolidate()
+
+        status = memory.get_memory_status()
+        assert status["short_term_count"] == 4
+        assert status["long_term_count"] == 5
+        assert status["evicted_count"] == 5
+        assert status["consolidated_count"] == 5
+        assert status["consolidation_batches"] == 3
+        # Consolidated items stay reachable through the index
+        relevant = await memory.retrieve_relevant("topic0", k=1)
+        assert relevant[0]["input"] == "topic0 question"
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize(
+        "policy, expected_victim",
+        [("fifo", "a"), ("lru", "b"), ("importance", "c")],
+    )
+    async def test_eviction_policies(self, policy, expected_victim):
+        """Test which item each eviction policy evicts"""
+        memory = MemoryManager(
+            index=VectorIndex(), short_term_capacity=3, eviction_policy=policy
+        )
+        await memory.store({"input": "a", "importance": 0.5})
+        await memory.store({"input": "b", "importance": 1.0})
+        await memory.store({"input": "c", "importance": 0.1})
+        await memory.retrieve_relevant("a")
+        await memory.retrieve_relevant("c")
+        await memory.store({"input": "d"})
+
+        survivors = {item["input"] for item in memory.short_term_memory}
+        assert survivors == {"a", "b", "c", "d"} - {expected_victim}
+        assert memory.get_memory_status()["evicted_count"] == 1
+
+    def test_reciprocal_rank_fusion(self):
+        """Test that items ranked well by several indexes win"""
+        fused = reciprocal_rank_fusion([[(1, 9.0), (2, 5.0)], [(2, 0.9), (3, 0.8)]], k=3)
+
+        assert [item_id for item_id, _ in fused] == [2, 1, 3]
+
+    @pytest.mark.asyncio
+    async def test_hybrid_retrieval(self):
+        """Test MemoryManager retrieval through a HybridIndex"""
+        memory = MemoryManager(index=HybridIndex([BM25Index(), VectorIndex()]))
+        await memory.store({"input": "reset my password", "response": "Use the account page."})
+        await memory.store({"input": "billing question", "response": "Invoices are monthly."})
+
+        relevant = await memory.retrieve_relevant("password reset", k=1)
+
+        assert relevant[0]["input"] == "reset my password"
+
+    @pytest.mark.asyncio
+    async def test_retrieval_cache_hits_and_incremental_invalidation(self):
+        """Test that stores only invalidate cached queries sharing a term"""
+        cache = RetrievalCache(max_size=8, ttl=60)
+        memory = MemoryManager(index=BM25Index(), retrieval_cache=cache)
+        await memory.store({"input": "deploy the service"})
+        await memory.store({"input": "rotate the logs"})
+
+        await memory.retrieve_relevant("Deploy service?")
+        await memory.retrieve_relevant("deploy   SERVICE")
+        await memory.retrieve_relevant("logs")
+        assert cache.get_stats()["hits"] == 1
+
+        await memory.store({"input": "deploy again"})
+        relevant = await memory.retrieve_relevant("deploy service")
+        await memory.retrieve_relevant("logs")
+
+        assert len(relevant) == 2
+        stats = memory.get_memory_status()["retrieval_cache"]
+        assert stats["hits"] == 2
+        assert stats["invalidations"] == 1
+
+    @pytest.mark.asyncio
+    async def test_retrieval_cache_with_hash_collisions(self):
+        """Test that a stored token hashing into a query's bucket invalidates the query"""
+        embedder = HashEmbeddingProvider(dimension=16)
+        memory = MemoryManager(index=VectorIndex(embedder), retrieval_cache=RetrievalCache())
+        await memory.store({"input": "apple pie"})
+        assert await memory.retrieve_relevant("zebra") == []
+
+        # "aak" shares no token with "zebra" but lands in the same bucket
+        assert embedder._hash_token("aak")[0] == embedder._hash_token("zebra")[0]
+        await memory.store({"input": "aak"})
+
+        assert await memory.retrieve_relevant("zebra") == [{"input": "aak"}]
+
+    @pytest.mark.asyncio
+    async def test_write_behind_batches_and_reads_own_writes(self):
+        """Test that buffered stores are indexed in batches and visible to reads"""
+        manager = MemoryManager(index=BM25Index(), write_behind=True, write_batch_size=64)
+
+        for i in range(100):
+            await manager.store({"content": f"ticket {i} about printers"})
+        assert manager.get_memory_status()["write_buffer_count"] == 100
+        assert len(manager.index) == 0
+
+        results = await manager.retrieve_relevant("ticket 99", k=1)
+
+        assert results == [{"content": "ticket 99 about printers"}]
+        status = manager.get_memory_status()
+        assert status["write_buffer_count"] == 0
+        assert status["indexed_count"] == 100
+        assert status["write_batches"] == 2
+
+    @pytest.mark.asyncio
+    async def test_write_behind_background_flush_and_aclose(self):
+        """Test the background writer, buffer bound and aclose"""
+        manager = MemoryManager(
+            index=BM25Index(), short_term_capacity=4, consolidation_batch_size=2,
+            write_behind=True, write_buffer_size=3,
+        )
+        await manager.store({"content": "a"})
+        await manager.store({"content": "b"})
+        await asyncio.sleep(0.01)
+        assert manager.get_memory_status()["write_buffer_count"] == 0
+
+        for i in range(3):
+            await manager.store({"content": f"item {i}"})
+        # A full buffer is written on the caller's path
+        assert manager.get_memory_status()["write_buffer_count"] == 0
+
+        await manager.store({"content": "last"})
+        await manager.aclose()
+
+        status = manager.get_memory_status()
+        assert status["write_buffer_count"] == 0
+        assert status["short_term_count"] == 4
+        assert status["long_term_count"] == 2
+        assert status["pending_consolidation"] == 0
+
+    @pytest.mark.asyncio
+    async def test_filtered_retrieval_uses_metadata_prefilter(self):
+        """Test time-range and field filters composed with similarity search"""
+        memory = MemoryManager(
+            index=VectorIndex(), metadata_index=MetadataIndex(fields=["agent_id", "step_id"])
+        )
+        for i in range(30):
+            await memory.store({
+                "input": f"deploy step {i}",
+                "agent_id": f"agent-{i % 3}",
+                "step_id": i,
+                "timestamp": 1000 + i,
+            })
+
+        recent = await memory.retrieve_relevant("deploy", k=10, since=1025)
+        assert sorted(item["step_id"] for item in recent) == [25, 26, 27, 28, 29]
+
+        tagged = await memory.retrieve_relevant(
+            "deploy", k=10, since=1010, until=1019, where={"agent_id": "agent-1"}
+        )
+        assert sorted(item["step_id"] for item in tagged) == [10, 13, 16, 19]
+
+        newest = await memory.retrieve_relevant("", k=2, where={"step_id": [3, 4, 5]})
+        assert [item["step_id"] for item in newest] == [4, 5]
+
+        assert await memory.retrieve_relevant("deploy", where={"agent_id": "nobody"}) == []
+        with pytest.raises(MemoryError):
+            await memory.retrieve_relevant("deploy", where={"unknown": 1})
+
+    @pytest.mark.asyncio
+    async def test_near_duplicates_are_merged(self):
+        """Test that near-identical interactions are reference-counted, not stored again"""
+        dedup = MinHashDeduplicator(threshold=0.7)
+        memory = MemoryManager(index=BM25Index(), deduplicator=dedup)
+        await memory.store({"input": "Please continue from where you left off.", "timestamp": 1})
+        await memory.store({"input": "please continue from where you left off", "timestamp": 2})
+        await memory.store({"input": "Please continue from where you left off!!", "timestamp": 3})
+        await memory.store({"input": "Summarize the quarterly revenue report", "timestamp": 4})
+
+        status = memory.get_memory_status()
+        assert status["short_term_count"] == 2
+        assert status["indexed_count"] == 2
+        assert status["duplicates_merged"] == 2
+        assert dedup.count(0) == 3
+
+        memory.clear_short_term()
+        await memory.store({"input": "Please continue from where you left off."})
+        assert memory.get_memory_status()["short_term_count"] == 1
+
+    @pytest.mark.asyncio
+    async def test_duplicates_merge_only_within_scope_and_refresh_timestamp(self, tmp_path):
+        """Test that repeats from other sessions are kept and merged repeats count as recent"""
+        dedup = MinHashDeduplicator(threshold=0.7)
+        memory = MemoryManager(
+            index=BM25Index(), metadata_index=MetadataIndex(fields=["session_id"]), deduplicator=dedup
+        )
+        await memory.store({"input": "reset my password please", "session_id": "a", "timestamp": 10})
+        await memory.store({"input": "reset my password please", "session_id": "b", "timestamp": 20})
+        await memory.store({"input": "Reset my password, please!", "session_id": "a", "timestamp": 30})
+
+        assert memory.get_memory_status()["duplicates_merged"] == 1
+        assert await memory.retrieve_relevant("password", where={"session_id": "b"}) == [
+            {"input": "reset my password please", "session_id": "b", "timestamp": 20}
+        ]
+        recent = await memory.retrieve_relevant("password", since=25, where={"session_id": "a"})
+        assert recent == [
+            {"input": "reset my password please", "session_id": "a", "timestamp": 30, "occurrences": 2}
+        ]
+
+        path = str(tmp_path / "memory.snap")
+        memory.snapshot(path)
+        restored = MemoryManager.restore(path, deduplicator=MinHashDeduplicator(threshold=0.7))
+        assert restored.deduplicator.count(0) == 2
+
+    @pytest.mark.asyncio
+    async def test_failed_write_batch_is_rolled_back(self):
+        """Test that a batch whose indexing fails leaves no trace and can be retried"""
+        embedder = FlakyEmbedder()
+        memory = MemoryManager(
+            index=HybridIndex([BM25Index(), VectorIndex(embedder)]),
+            metadata_index=MetadataIndex(),
+            deduplicator=MinHashDeduplicator(threshold=0.7),
+            write_behind=True,
+        )
+        await memory.store({"input": "rotate the signing keys", "timestamp": 1})
+        await memory.store({"input": "renew the TLS certificate", "timestamp": 2})
+
+        embedder.failing = True
+        with pytest.raises(RuntimeError):
+            await memory.flush()
+        status = memory.get_memory_status()
+        assert (status["short_term_count"], status["indexed_count"], status["write_buffer_count"]) == (0, 0, 2)
+
+        embedder.failing = False
+        await memory.flush()
+
+        status = memory.get_memory_status()
+        assert (status["short_term_count"], status["indexed_count"], status["write_buffer_count"]) == (2, 2, 0)
+        assert status["duplicates_merged"] == 0
+        assert memory._next_id == 2
+        assert len(memory.metadata_index) == 2
+        relevant = await memory.retrieve_relevant("signing keys", k=5)
+        assert relevant == [{"input": "rotate the signing keys", "timestamp": 1}]
+
+    @pytest.mark.asyncio
+    async def test_extractive_summarizer_is_deterministic(self):
+        """Test that the default summarizer keeps recurring sentences in order"""
+        summarizer = ExtractiveSummarizer(max_sentences=2)
+        items = [
+            {"input": "The deploy failed on staging.", "response": "Check the staging logs."},
+            {"input": "Staging deploy failed again.", "response": "Nice weather today."},
+        ]
+
+        summary = await summarizer.summarize(items)
+
+        assert summary == await summarizer.summarize(items)
+        assert summary == "The deploy failed on staging. Staging deploy failed again."
+
+    @pytest.mark.asyncio
+    async def test_background_summaries_fold_old_items(self):
+        """Test that old short-term items are folded into rate-limited summaries"""
+        memory = MemoryManager(
+            index=BM25Index(),
+            short_term_capacity=100,
+            summarizer=ExtractiveSummarizer(),
+            summary_batch_size=4,
+            summary_threshold=6,
+            summary_interval=0.05,
+        )
+        for i in range(12):
+            await memory.store({"input": f"incident {i} on the payment service", "timestamp": i})
+        await asyncio.sleep(0.01)
+
+        # The second fold waits for the rate limit
+        status = memory.get_memory_status()
+        assert status["summaries_created"] == 1
+        assert status["short_term_count"] == 8
+
+        await asyncio.sleep(0.1)
+        status = memory.get_memory_status()
+        assert status["summaries_created"] == 2
+        assert status["summarized_count"] == 8
+        assert status["short_term_count"] == 4
+        assert status["long_term_count"] == 2
+
+        relevant = await memory.retrieve_relevant("incident 2", k=1)
+        assert relevant[0]["type"] == "summary"
+        assert relevant[0]["summary_of"] == [0, 1, 2, 3]
+        assert relevant[0]["timestamp"] == 3
@@ -0,0 +1,339 @@
+"""
+Unit tests for the long-term memory stores
+"""
+import asyncio
+
+import numpy as np
+import pytest
+
+from mindchain import Agent, AgentConfig, MemoryManager
+from mindchain.core.errors import MemoryError
+from mindchain.memory import (CompressedLongTermStore, PersistentLongTermStore,
+                              SnapshotLongTermStore, SnapshotReader, SQLiteFTSIndex,
+                              SQLiteMemoryStore, VectorIndex)
+
+
+class TestPersistentLongTermStore:
+    """Tests for the memory-mapped persistent store"""
+
+    def test_append_and_reopen(self, tmp_path):
+        """Test that items and embeddings survive reopening the store"""
+        store = PersistentLongTermStore(str(tmp_path))
+        embeddings = np.eye(3, 4, dtype=np.float32)
+        store.append_batch([5, 6, 7], [{"input": "a"}, {"input": "b"}, {"input": "c"}], embeddings)
+        store.close()
+
+        reopened = PersistentLongTermStore(str(tmp_path), readonly=True)
+
+        assert len(reopened) == 3
+        assert reopened.dimension == 4
+        assert reopened.get(6) == {"input": "b"}
+        assert reopened.get(8) is None
+        assert reopened.max_id() == 7
+        ids, vectors = reopened.embedding_matrix()
+        assert ids.tolist() == [5, 6, 7]
+        np.testing.assert_array_equal(vectors, embeddings)
+        with pytest.raises(MemoryError):
+            reopened.append_batch([8], [{"input": "d"}])
+
+    def test_reader_refresh_sees_new_rows(self, tmp_path):
+        """Test that a read-only opener picks up appended rows"""
+        writer = PersistentLongTermStore(str(tmp_path))
+        writer.append_batch([3, 1], [{"input": "x"}, {"input": "y"}])
+        reader = PersistentLongTermStore(str(tmp_path), readonly=True)
+
+        writer.append_batch([2], [{"input": "z"}])
+        reader.refresh()
+
+        assert len(reader) == 3
+        assert [item_id for item_id, _ in reader.entries()] == [3, 1, 2]
+        assert reader.get(1) == {"input": "y"}
+
+    def test_many_small_appends_index_incrementally(self, tmp_path):
+        """Test that appends merge new ids into a few sorted runs"""
+        store = PersistentLongTermStore(str(tmp_path))
+        item_ids = np.random.default_rng(0).permutation(500).tolist()
+        for item_id in item_ids:
+            store.append_batch([item_id], [{"input": f"item {item_id}"}])
+
+        assert len(store._runs) <= 9
+        assert store.max_id() == 499
+        assert all(store.get(item_id) == {"input": f"item {item_id}"} for item_id in range(500))
+        assert store.get(500) is None
+
+        store.append_batch([7], [{"input": "again"}])
+        assert store.get(7) == {"input": "item 7"}
+        store.close()
+
+    def test_reopen_discards_partial_batch(self, tmp_path):
+        """Test that rows a crashed writer left uncommitted do not misalign later rows"""
+        store = PersistentLongTermStore(str(tmp_path))
+        store.append_batch([1, 2], [{"input": "a"}, {"input": "b"}], np.eye(2, 4, dtype=np.float32))
+        # A crash after writing a batch's payloads and embeddings, before its offsets
+        store._record_file.write(b"\x05\x00\x00\x00{}   ")
+        store._embedding_file.write(np.full((3, 4), 9, dtype=np.float32).tobytes())
+        store._offset_file.write(b"\x03" * 10)
+        store.close()
+
+        store = PersistentLongTermStore(str(tmp_path))
+        assert len(store) == 2
+        store.append_batch([3], [{"input": "c"}], np.full((1, 4), 0.5, dtype=np.float32))
+        store.close()
+
+        reopened = PersistentLongTermStore(str(tmp_path), readonly=True)
+        ids, vectors = reopened.embedding_matrix()
+        assert ids.tolist() == [1, 2, 3]
+        np.testing.assert_array_equal(vectors[2], np.full(4, 0.5, dtype=np.float32))
+        np.testing.assert_array_equal(vectors[:2], np.eye(2, 4, dtype=np.float32))
+        assert reopened.get(3) == {"input": "c"}
+        reopened.close()
+
+    @pytest.mark.asyncio
+    async def test_memory_manager_warm_start(self, tmp_path):
+        """Test that a restarted MemoryManager retrieves persisted items"""
+        memory = MemoryManager(
+            index=VectorIndex(),
+            short_term_capacity=2,
+            consolidation_batch_size=1,
+            long_term_store=PersistentLongTermStore(str(tmp_path)),
+        )
+        for topic in ("astronomy", "botany", "chemistry", "dentistry"):
+            await memory.store({"input": f"{topic} lecture"})
+        await memory.consolidate()
+        memory.long_term_memory.close()
+
+        restarted = MemoryManager(
+            index=VectorIndex(),
+            long_term_store=PersistentLongTermStore(str(tmp_path)),
+        )
+        relevant = await restarted.retrieve_relevant("botany", k=1)
+
+        assert relevant == [{"input": "botany lecture"}]
+        assert restarted.get_memory_status()["long_term_count"] == 2
+        await restarted.store({"input": "ecology lecture"})
+        assert restarted._next_id == 3
+
+
+class TestCompressedLongTermStore:
+    """Tests for the block-compressed store"""
+
+    def _interaction(self, i):
+        return {
+            "input": f"What is the status of ticket {i}?",
+            "response": f"Ticket {i} is assigned to the support team and awaiting review.",
+            "timestamp": 1700000000.0 + i,
+        }
+
+    def test_round_trip_and_compression(self):
+        """Test that items read back intact from much smaller storage"""
+        store = CompressedLongTermStore(block_size=16, cache_blocks=2)
+        items = [self._interaction(i) for i in range(200)]
+        store.append_batch(list(range(200)), items)
+
+        assert len(store) == 200
+        assert store.dictionary
+        assert store.get(3) == items[3]
+        assert store.get(199) == items[199]
+        assert store.get(500) is None
+        assert [item for _, item in store.entries()] == items
+        assert store.compression_ratio > 3
+
+    def test_block_cache_is_bounded(self):
+        """Test that repeated reads hit the LRU and it keeps only hot blocks"""
+        store = CompressedLongTermStore(block_size=4, cache_blocks=2)
+        store.append_batch(list(range(20)), [self._interaction(i) for i in range(20)])
+
+        for item_id in (0, 1, 4, 5, 8, 0):
+            store.get(item_id)
+
+        assert store.cache_hits == 2
+        assert store.cache_misses == 4
+        assert len(store._cache) == 2
+
+    def test_remove_replace_and_embeddings(self):
+        """Test that removed and replaced items drop out of reads and embeddings are not kept"""
+        store = CompressedLongTermStore(block_size=2)
+        embeddings = np.eye(3, dtype=np.float32)
+        store.append_batch([1, 2, 3], [{"input": "a"}, {"input": "b"}, {"input": "c"}], embeddings)
+        store.append_batch([2], [{"input": "b2"}], embeddings[:1])
+
+        assert store.remove(1)
+        assert not store.remove(1)
+        assert store.get(2) == {"input": "b2"}
+        assert list(store.entries()) == [(3, {"input": "c"}), (2, {"input": "b2"})]
+        assert store.embedding_matrix() is None
+        assert store.max_id() == 3
+
+    @pytest.mark.asyncio
+    async def test_memory_manager_consolidates_into_blocks(self):
+        """Test retrieval of items consolidated into compressed blocks"""
+        memory = MemoryManager(
+            index=VectorIndex(),
+            short_term_capacity=2,
+            consolidation_batch_size=1,
+            long_term_store=CompressedLongTermStore(block_size=2),
+        )
+        for topic in ("astronomy", "botany", "chemistry", "dentistry", "ecology"):
+            await memory.store({"input": f"{topic} lecture"})
+        await memory.consolidate()
+
+        assert await memory.retrieve_relevant("botany", k=1) == [{"input": "botany lecture"}]
+        assert memory.get_memory_status()["long_term_count"] == 3
+
+        # A new manager over the same store re-embeds the consolidated items
+        reopened = MemoryManager(index=VectorIndex(), long_term_store=memory.long_term_memory)
+        assert await reopened.retrieve_relevant("chemistry", k=1) == [{"input": "chemistry lecture"}]
+
+
+class TestSQLiteMemoryStore:
+    """Tests for the SQLite store and its FTS5 index"""
+
+    def test_round_trip(self, tmp_path):
+        """Test that items and embeddings survive reopening the database"""
+        path = str(tmp_path / "memory.db")
+        store = SQLiteMemoryStore(path)
+        embeddings = np.eye(2, 3, dtype=np.float32)
+        store.append_batch([4, 9], [{"input": "a"}, {"input": "b"}], embeddings)
+        store.append_batch([4], [{"input": "c"}], embeddings[:1])
+        store.close()
+
+        reopened = SQLiteMemoryStore(path)
+
+        assert len(reopened) == 2
+        assert reopened.get(4) == {"input": "c"}
+        assert reopened.max_id() == 9
+        ids, vectors = reopened.embedding_matrix()
+        assert ids.tolist() == [4, 9]
+        np.testing.assert_array_equal(vectors, embeddings)
+        assert reopened.remove(9)
+        assert [item_id for item_id, _ in reopened.entries()] == [4]
+        with pytest.raises(MemoryError):
+            SQLiteMemoryStore(":memory:")
+
+    def test_reads_beyond_pool_do_not_wait(self, tmp_path):
+        """Test that more open iterators than pooled readers get temporary connections"""
+        store = SQLiteMemoryStore(str(tmp_path / "memory.db"), read_pool_size=1)
+        store.append_batch([1, 2], [{"input": "a"}, {"input": "b"}])
+
+        iterators = [store.entries() for _ in range(3)]
+        firsts = [next(iterator) for iterator in iterators]
+
+        assert firsts == [(1, {"input": "a"})] * 3
+        assert store.get(2) == {"input": "b"}
+        assert [list(iterator) for iterator in iterators] == [[(2, {"input": "b"})]] * 3
+        assert store._readers.qsize() == 1
+        store.close()
+
+    def test_fts_search_with_candidates(self, tmp_path):
+        """Test bm25 ranking and candidate filtering"""
+        index = SQLiteFTSIndex(SQLiteMemoryStore(str(tmp_path / "memory.db")))
+        index.add_batch(
+            [0, 1, 2],
+            [{"input": "solar panel wiring"}, {"input": "solar solar eclipse"}, {"input": "garden"}],
+        )
+
+        assert len(index) == 3
+        assert [item_id for item_id, _ in index.search("solar", k=5)] == [1, 0]
+        assert [item_id for item_id, _ in index.search("solar", k=5, candidates={0, 2})] == [0]
+        assert index.search('"quoted" OR', k=5) == []
+        assert index.remove(1)
+        assert [item_id for item_id, _ in index.search("solar eclipse", k=5)] == [0]
+
+    @pytest.mark.asyncio
+    async def test_restart_keeps_consolidated_items_indexed(self, tmp_path):
+        """Test that consolidated rows stay searchable and short-term rows are dropped"""
+        path = str(tmp_path / "memory.db")
+        store = SQLiteMemoryStore(path)
+        memory = MemoryManager(
+            index=SQLiteFTSIndex(store),
+            short_term_capacity=2,
+            consolidation_batch_size=1,
+            long_term_store=store,
+        )
+        for topic in ("astronomy", "botany", "chemistry", "dentistry"):
+            await memory.store({"input": f"{topic} lecture"})
+        await memory.aclose()
+
+        store = SQLiteMemoryStore(path)
+        index = SQLiteFTSIndex(store)
+        restarted = MemoryManager(index=index, long_term_store=store)
+
+        assert len(index) == 2
+        assert await restarted.retrieve_relevant("botany", k=1) == [{"input": "botany lecture"}]
+        assert await restarted.retrieve_relevant("dentistry", k=1) == []
+        assert restarted.get_memory_status()["long_term_count"] == 2
+
+
+class TestMemorySnapshot:
+    """Tests for binary memory snapshots"""
+
+    @pytest.mark.asyncio
+    async def test_snapshot_round_trip_is_lazy(self, tmp_path):
+        """Test that all tiers survive a snapshot and short-term items decode lazily"""
+        path = str(tmp_path / "memory.snap")
+        memory = MemoryManager(index=VectorIndex(), short_term_capacity=3, consolidation_batch_size=2)
+        topics = ["astronomy", "botany", "chemistry", "dentistry", "ecology", "forestry"]
+        for i, topic in enumerate(topics):
+            await memory.store({"input": f"{topic} lecture", "timestamp": 100 + i})
+        await asyncio.sleep(0)
+        memory.snapshot(path, metadata={"owner": "test"})
+
+        restored = MemoryManager.restore(path, index=VectorIndex(), short_term_capacity=3)
+
+        status = restored.get_memory_status()
+        assert status["short_term_count"] == 3
+        assert status["long_term_count"] + status["pending_consolidation"] == 3
+        assert status["indexed_count"] == 6
+        assert isinstance(restored.long_term_memory, SnapshotLongTermStore)
+        assert restored.short_term_memory._items.count(None) == 0
+        assert not any(isinstance(item, dict) for item in restored.short_term_memory._items)
+        relevant = await restored.retrieve_relevant("botany", k=1)
+        assert relevant == [{"input": "botany lecture", "timestamp": 101}]
+        assert restored.short_term_memory.recent(1) == [{"input": "forestry lecture", "timestamp": 105}]
+        await restored.store({"input": "geology lecture"})
+        assert restored._next_id == 7
+        assert SnapshotReader(path).meta["metadata"] == {"owner": "test"}
+
+    def test_snapshot_outside_event_loop(self, tmp_path):
+        """Test that a sync snapshot applying buffered writes defers background work"""
+        path = str(tmp_path / "memory.snap")
+        memory = MemoryManager(
+            index=VectorIndex(), short_term_capacity=2, consolidation_batch_size=1, write_behind=True
+        )
+
+        async def fill():
+            for topic in ("astronomy", "botany", "chemistry", "dentistry"):
+                await memory.store({"input": f"{topic} lecture"})
+
+        asyncio.run(fill())
+        assert len(memory._write_buffer) == 4
+        memory.snapshot(path)
+
+        assert memory.get_memory_status()["pending_consolidation"] == 2
+        restored = MemoryManager.restore(path, index=VectorIndex(), short_term_capacity=2)
+        assert restored.get_memory_status()["indexed_count"] == 4
+        asyncio.run(memory.consolidate())
+        assert memory.get_memory_status()["long_term_count"] == 2
+
+    def test_rejects_foreign_files(self, tmp_path):
+        """Test that restore validates the header"""
+        path = tmp_path / "bogus.snap"
+        path.write_bytes(b"not a snapshot" * 10)
+
+        with pytest.raises(MemoryError):
+            MemoryManager.restore(str(path))
+
+    @pytest.mark.asyncio
+    async def test_agent_snapshot_restores_history(self, tmp_path):
+        """Test the agent-level snapshot and restore"""
+        path = str(tmp_path / "agent.snap")
+        config = AgentConfig(name="snap", description="test")
+        agent = Agent(config)
+        await agent.run("hello there")
+        agent.snapshot(path)
+
+        restored = Agent.restore(config, path)
+
+        assert restored.id == agent.id
+        assert restored.get_status()["history_length"] == 2
+        assert await restored.memory.retrieve_relevant("hello") == await agent.memory.retrieve_relevant("hello")
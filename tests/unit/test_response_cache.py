@@ -0,0 +1,105 @@
+"""
+Unit tests for the agent response cache
+"""
+import pytest
+
+from mindchain import Agent, AgentConfig
+from mindchain.core import ResponseCache
+from mindchain.llm import LatencyModel, LLMRequest, SimulatedBackend
+
+FAST = LatencyModel(
+    first_token_median=0.001,
+    first_token_sigma=0.0,
+    tokens_per_second=10000.0,
+    tokens_per_second_sigma=0.0,
+    completion_tokens_median=8,
+    completion_tokens_sigma=0.0,
+)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestResponseCache:
+    """Tests for ResponseCache and its use by Agent"""
+
+    def test_ttl_expiry(self):
+        """Test that entries expire after the TTL"""
+        clock = FakeClock()
+        cache = ResponseCache(ttl=10.0, clock=clock)
+        cache.put("a", "cached")
+
+        assert cache.get("a") == "cached"
+        clock.now = 11.0
+        assert cache.get("a") is None
+        assert len(cache) == 0
+        assert cache.get_stats()["expirations"] == 1
+        assert cache.get_stats()["misses"] == 1
+
+    def test_byte_bounded_lru_eviction(self):
+        """Test that the least recently used entries go once the byte budget is exceeded"""
+        cache = ResponseCache(max_bytes=25)
+        cache.put("a", "x" * 9)
+        cache.put("b", "y" * 9)
+        cache.get("a")
+        cache.put("c", "z" * 9)
+
+        assert cache.get("b") is None
+        assert cache.get("a") == "x" * 9
+        assert cache.bytes == 20
+        assert cache.get_stats()["evictions"] == 1
+
+        cache.put("d", "too long for the whole cache" * 2)
+        assert cache.get("d") is None
+        assert cache.bytes == 20
+
+    def test_only_deterministic_requests_cached_by_default(self):
+        """Test that sampled requests bypass the cache unless allowed"""
+        request = LLMRequest(model="m", messages=[], temperature=0.7)
+
+        assert not ResponseCache().cacheable(request)
+        assert ResponseCache(max_temperature=1.0).cacheable(request)
+
+    @pytest.mark.asyncio
+    async def test_temperature_zero_agents_skip_backend_on_hit(self):
+        """Test that identical requests from agents sharing a cache reach the backend once"""
+        backend = SimulatedBackend(FAST)
+        cache = ResponseCache()
+        config = AgentConfig(name="FAQ", temperature=0.0)
+
+        first = await Agent(config, backend=backend, response_cache=cache).run("What are your hours?")
+        second_agent = Agent(config, backend=backend, response_cache=cache)
+        second = await second_agent.run("What are your hours?")
+        streamed = [
+            chunk async for chunk in
+            Agent(config, backend=backend, response_cache=cache).run_stream("What are your hours?")
+        ]
+
+        assert first == second == "".join(streamed)
+        assert backend.get_stats()["requests"] == 1
+        assert second_agent.get_status()["response_cache"] == cache.get_stats()
+        assert cache.get_stats()["hits"] == 2
+
+        sampled = Agent(AgentConfig(name="Chat"), backend=backend, response_cache=cache)
+        await sampled.run("What are your hours?")
+        assert backend.get_stats()["requests"] == 2
+        assert len(cache) == 1
+
+    @pytest.mark.asyncio
+    async def test_abandoned_stream_not_cached(self):
+        """Test that a partial streamed response is never cached"""
+        backend = SimulatedBackend(FAST)
+        cache = ResponseCache()
+        config = AgentConfig(name="FAQ", temperature=0.0)
+
+        stream = Agent(config, backend=backend, response_cache=cache).run_stream("Hello")
+        await stream.__anext__()
+        await stream.aclose()
+
+        assert len(cache) == 0
+        assert Agent(config).get_status()["response_cache"] is None
@@ -0,0 +1,155 @@
+"""
+Unit tests for multi-session agents
+"""
+import asyncio
+
+import pytest
+
+from mindchain import Agent, AgentConfig, MemoryManager
+from mindchain.core import ContextPacker, SessionTable
+from mindchain.core.errors import AgentError
+from mindchain.llm import LLMBackend, LLMRequest, LLMResponse
+from mindchain.memory import MetadataIndex
+
+
+class EchoBackend(LLMBackend):
+    """Answers with the messages it was sent; fails on "boom" """
+
+    def __init__(self):
+        self.requests = []
+
+    async def generate(self, request: LLMRequest) -> LLMResponse:
+        self.requests.append(request)
+        await asyncio.sleep(0.001)
+        prompt = request.messages[-1]["content"]
+        if "boom" in prompt:
+            raise RuntimeError("backend failure")
+        history = [message["content"] for message in request.messages if message["role"] == "user"]
+        return LLMResponse(content=f"re: {prompt} | seen {len(history)}")
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestSessions:
+    """Tests for SessionTable and session-aware Agent runs"""
+
+    @pytest.mark.asyncio
+    async def test_thousands_of_concurrent_sessions_keep_separate_history(self):
+        """Test that concurrent sessions on one agent never see each other's turns"""
+        agent = Agent(AgentConfig(name="Support"), backend=EchoBackend())
+
+        async def conversation(user):
+            first = await agent.run(f"{user} hello", session_id=user)
+            second = await agent.run(f"{user} again", session_id=user)
+            return first, second
+
+        users = [f"user{i}" for i in range(1000)]
+        results = await asyncio.gather(*(conversation(user) for user in users))
+
+        assert results[42] == ("re: user42 hello | seen 1", "re: user42 again | seen 2")
+        status = agent.get_session_status("user42")
+        assert status == {"session_id": "user42", "status": "idle", "turns": 2, "history_length": 4}
+        assert agent.get_status()["sessions"]["sessions"] == 1000
+        assert agent.get_status()["sessions"]["active"] == 0
+        assert agent._history == []
+        assert agent.memory.get_memory_status()["short_term_count"] == 1000
+
+    @pytest.mark.asyncio
+    async def test_turns_of_one_session_run_in_order(self):
+        """Test that concurrent turns of a session do not interleave"""
+        agent = Agent(AgentConfig(name="Support"), backend=EchoBackend())
+
+        responses = await asyncio.gather(*(agent.run(f"q{i}", session_id="s") for i in range(5)))
+        streamed = "".join([chunk async for chunk in agent.run_stream("q5", session_id="s")])
+
+        history = list(agent.sessions.get("s").history)
+        assert responses[4] == "re: q4 | seen 3"
+        assert streamed == "re: q5 | seen 3"
+        assert [message["role"] for message in history] == ["user", "assistant"] * 3
+        assert history[-1]["content"] == streamed
+
+    @pytest.mark.asyncio
+    async def test_session_errors_and_memory_are_isolated(self):
+        """Test that a failing session leaves others running and memory can be scoped"""
+        memory = MemoryManager(metadata_index=MetadataIndex(fields=["session_id"]))
+        agent = Agent(AgentConfig(name="Support"), memory_manager=memory, backend=EchoBackend())
+        await agent.run("alpha secret", session_id="a")
+
+        with pytest.raises(AgentError):
+            await agent.run("boom", session_id="b")
+        with pytest.raises(AgentError, match="error state"):
+            await agent.run("hello", session_id="b")
+        assert agent.get_session_status("b")["status"] == "error"
+
+        agent.reset(session_id="b")
+        await agent.run("hello", session_id="b")
+        assert await agent._retrieve_context("anything", "b") == [memory.short_term_memory.recent(1)[0]]
+        assert all(item["session_id"] == "a" for item in await agent._retrieve_context("alpha", "a"))
+        assert agent.status.value == "idle"
+
+    @pytest.mark.asyncio
+    async def test_sessions_never_retrieve_each_others_turns(self):
+        """Test that shared default memory keeps each session's context to itself"""
+        backend = EchoBackend()
+        agent = Agent(AgentConfig(name="Support"), backend=backend)
+        await agent.run("my password is swordfish", session_id="alice")
+        await agent.run("my card ends in 4242", session_id="bob")
+
+        await agent.run("what did I tell you?", session_id="bob")
+        await agent.run("what did I tell you?", session_id="alice")
+
+        bob_prompt = " ".join(message["content"] for message in backend.requests[2].messages)
+        alice_prompt = " ".join(message["content"] for message in backend.requests[3].messages)
+        assert "swordfish" not in bob_prompt and "4242" in bob_prompt
+        assert "4242" not in alice_prompt and "swordfish" in alice_prompt
+        bob_context = await agent._retrieve_context("anything", "bob")
+        assert bob_context and all(item["session_id"] == "bob" for item in bob_context)
+
+    def test_table_evicts_and_expires_idle_sessions(self):
+        """Test LRU eviction beyond max_sessions and TTL expiry of idle sessions"""
+        clock = FakeClock()
+        table = SessionTable(max_sessions=2, idle_ttl=10.0, clock=clock)
+        table.open("a")
+        table.open("b")
+        table.open("a")
+        table.open("c")
+
+        assert "b" not in table
+        assert "a" in table and "c" in table
+
+        clock.now = 11.0
+        table.open("d")
+        assert len(table) == 1
+        assert table.get_stats() == {"sessions": 1, "active": 0, "created": 4, "evicted": 1, "expired": 2}
+
+    @pytest.mark.asyncio
+    async def test_snapshot_keeps_sessions(self, tmp_path):
+        """Test that sessions survive an agent snapshot and restore"""
+        path = str(tmp_path / "agent.snap")
+        agent = Agent(AgentConfig(name="Support"), backend=EchoBackend(),
+                      sessions=SessionTable(history_limit=4, idle_ttl=None))
+        await agent.run("alpha hello", session_id="a")
+        await agent.run("alpha again", session_id="a")
+        with pytest.raises(AgentError):
+            await agent.run("boom", session_id="b")
+        agent.snapshot(path)
+
+        restored = Agent.restore(AgentConfig(name="Support"), path, backend=EchoBackend())
+
+        assert restored.sessions.history_limit == 4 and restored.sessions.idle_ttl is None
+        assert list(restored.sessions.get("a").history) == list(agent.sessions.get("a").history)
+        assert restored.get_session_status("a") == agent.get_session_status("a")
+        assert restored.get_session_status("b")["status"] == "error"
+        assert await restored.run("alpha third", session_id="a") == "re: alpha third | seen 2"
+
+        table = SessionTable(history_limit=2)
+        packer = ContextPacker()
+        into = Agent.restore(AgentConfig(name="Support"), path, sessions=table, context_packer=packer)
+        assert into.sessions is table and into.context_packer is packer
+        assert len(table) == 2 and len(table.get("a").history) == 2
@@ -0,0 +1,110 @@
+"""
+Unit tests for memory shared across processes
+"""
+import asyncio
+import multiprocessing
+import os
+
+import pytest
+
+from mindchain import Agent, AgentConfig, AgentStatus, MemoryManager
+from mindchain.core.errors import MemoryError
+from mindchain.memory import MemoryPublisher, SharedMemoryReader, VectorIndex
+
+
+def _query_in_child(directory, query, results):
+    reader = SharedMemoryReader(directory)
+    results.put([item["input"] for item in asyncio.run(reader.retrieve_relevant(query, k=1))])
+
+
+async def _memory(topics):
+    memory = MemoryManager(index=VectorIndex(), short_term_capacity=2, consolidation_batch_size=1)
+    for topic in topics:
+        await memory.store({"input": f"{topic} lecture"})
+    return memory
+
+
+class TestSharedMemory:
+    """Tests for MemoryPublisher and SharedMemoryReader"""
+
+    @pytest.mark.asyncio
+    async def test_reader_attaches_published_embeddings_in_place(self, tmp_path):
+        """Test that a reader queries the published generation without copying it"""
+        memory = await _memory(["astronomy", "botany", "chemistry"])
+        MemoryPublisher(str(tmp_path)).publish(memory)
+
+        reader = SharedMemoryReader(str(tmp_path))
+        vector_index = reader.memory.index
+
+        assert reader.generation == 1
+        assert await reader.retrieve_relevant("chemistry", k=1) == [{"input": "chemistry lecture"}]
+        assert len(vector_index) == 3
+        assert vector_index._size == 0
+        assert not vector_index._base_vectors.flags.owndata
+        with pytest.raises(MemoryError):
+            await reader.store({"input": "dentistry lecture"})
+
+    @pytest.mark.asyncio
+    async def test_generation_swap(self, tmp_path):
+        """Test that readers move to new generations and old files are removed"""
+        publisher = MemoryPublisher(str(tmp_path), keep=1)
+        memory = await _memory(["astronomy"])
+        publisher.publish(memory)
+        reader = SharedMemoryReader(str(tmp_path))
+        held = reader.memory
+
+        await memory.store({"input": "botany lecture"})
+        publisher.publish(memory)
+        await memory.store({"input": "chemistry lecture"})
+        publisher.publish(memory)
+
+        assert sorted(os.listdir(tmp_path)) == ["memory.00000003.snap", "memory.current"]
+        # The attached generation keeps working after its file is removed
+        assert await held.retrieve_relevant("astronomy", k=1) == [{"input": "astronomy lecture"}]
+        assert await reader.retrieve_relevant("botany", k=1) == [{"input": "botany lecture"}]
+        assert reader.generation == 3
+        assert not reader.refresh()
+        assert MemoryPublisher(str(tmp_path)).generation == 3
+
+    @pytest.mark.asyncio
+    async def test_reader_in_another_process(self, tmp_path):
+        """Test that a worker process reads what this process published"""
+        MemoryPublisher(str(tmp_path)).publish(await _memory(["astronomy", "botany"]))
+        context = multiprocessing.get_context("fork")
+        results = context.Queue()
+        worker = context.Process(target=_query_in_child, args=(str(tmp_path), "botany", results))
+        worker.start()
+        worker.join(timeout=30)
+
+        assert results.get(timeout=5) == ["botany lecture"]
+
+    @pytest.mark.asyncio
+    async def test_reader_before_first_publish(self, tmp_path):
+        """Test that a reader starts empty and picks up the first generation"""
+        reader = SharedMemoryReader(str(tmp_path))
+
+        assert await reader.retrieve_relevant("astronomy") == []
+        assert reader.get_memory_status()["generation"] == 0
+
+        MemoryPublisher(str(tmp_path)).publish(await _memory(["astronomy"]))
+
+        assert await reader.retrieve_relevant("astronomy") == [{"input": "astronomy lecture"}]
+
+    @pytest.mark.asyncio
+    async def test_reader_as_agent_memory(self, tmp_path):
+        """Test that an agent stores its turns locally and retrieves both memories"""
+        MemoryPublisher(str(tmp_path)).publish(await _memory(["astronomy", "botany"]))
+
+        with pytest.raises(MemoryError, match="read-only"):
+            await SharedMemoryReader(str(tmp_path)).store({"input": "note"})
+
+        reader = SharedMemoryReader(str(tmp_path), local=MemoryManager(index=VectorIndex()))
+        agent = Agent(AgentConfig(name="Reader"), memory_manager=reader)
+        await agent.run("astronomy homework")
+        await agent.run("botany homework")
+
+        assert agent.status == AgentStatus.IDLE
+        for topic in ("astronomy", "botany"):
+            relevant = await reader.retrieve_relevant(topic, k=2)
+            assert [item["input"] for item in relevant] == [f"{topic} homework", f"{topic} lecture"]
+        assert reader.get_memory_status()["local"]["short_term_count"] == 2
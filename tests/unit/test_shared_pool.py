@@ -0,0 +1,74 @@
+"""
+Unit tests for the shared memory pool
+"""
+import pytest
+
+from mindchain import Agent, AgentConfig
+from mindchain.memory import BM25Index, SharedMemoryPool
+
+
+class TestSharedMemoryPool:
+    """Tests for SharedMemoryPool and MemoryView"""
+
+    @pytest.mark.asyncio
+    async def test_identical_items_are_stored_once(self):
+        """Test that views storing the same content share one pool entry"""
+        pool = SharedMemoryPool(index=BM25Index())
+        views = [pool.view(f"agent-{i}") for i in range(50)]
+
+        for i, view in enumerate(views):
+            await view.store({"content": "project brief: migrate billing", "timestamp": float(i)})
+
+        status = pool.get_pool_status()
+        assert status["item_count"] == 1
+        assert status["indexed_count"] == 1
+        assert status["view_count"] == 50
+        assert status["deduplicated_count"] == 49
+        assert await views[7].retrieve_relevant("billing") == [
+            {"content": "project brief: migrate billing", "timestamp": 0.0}
+        ]
+
+    @pytest.mark.asyncio
+    async def test_visibility_filters(self):
+        """Test own-only and custom visibility filters"""
+        pool = SharedMemoryPool(index=BM25Index())
+        writer = pool.view("writer")
+        reader = pool.view("reader", visibility="own")
+        tagged = pool.view("tagged", visibility=lambda item_id, entry: entry.item.get("team") == "red")
+
+        for i in range(20):
+            await writer.store({"content": f"weather report {i}", "team": "blue"})
+        await reader.store({"content": "weather notes", "team": "red"})
+
+        assert await reader.retrieve_relevant("weather", k=3) == [{"content": "weather notes", "team": "red"}]
+        assert await tagged.retrieve_relevant("weather", k=3) == [{"content": "weather notes", "team": "red"}]
+        assert len(await writer.retrieve_relevant("weather", k=3)) == 3
+
+    @pytest.mark.asyncio
+    async def test_release_keeps_items_still_referenced(self):
+        """Test that clearing a view only drops items no other view holds"""
+        pool = SharedMemoryPool(index=BM25Index())
+        first, second = pool.view("first"), pool.view("second")
+        await first.store({"content": "shared plan"})
+        await second.store({"content": "shared plan"})
+        await first.store({"content": "private scratch"})
+
+        first.clear_short_term()
+
+        assert len(pool) == 1
+        assert await second.retrieve_relevant("plan") == [{"content": "shared plan"}]
+        assert await second.retrieve_relevant("scratch") == []
+        assert first.get_memory_status()["short_term_count"] == 0
+
+    @pytest.mark.asyncio
+    async def test_agent_uses_view(self):
+        """Test that an agent can run on a pool view"""
+        pool = SharedMemoryPool()
+        agents = [
+            Agent(AgentConfig(name=f"agent-{i}", description="test"), memory_manager=pool.view(f"agent-{i}"))
+            for i in range(2)
+        ]
+        await agents[0].run("hello")
+
+        assert len(pool) == 1
+        assert len(await agents[1].memory.retrieve_relevant("hello")) == 1
@@ -0,0 +1,283 @@
+"""
+Unit tests for the vector memory index
+"""
+import asyncio
+
+import numpy as np
+import pytest
+
+from mindchain import MemoryManager
+from mindchain.memory import HashEmbeddingProvider, PersistentLongTermStore, VectorIndex
+from mindchain.memory import IVFIndex, QuantizedVectorIndex, WeightedVectorIndex
+from mindchain.memory.quantization import dequantize_int8, quantize_int8
+from mindchain.memory.vector_index import top_k_indices
+
+
+class CountingEmbedder(HashEmbeddingProvider):
+    """Hash embeddings counting embed calls"""
+
+    def __init__(self, dimension):
+        super().__init__(dimension=dimension)
+        self.calls = 0
+
+    def embed(self, texts):
+        self.calls += 1
+        return super().embed(texts)
+
+
+class TestHashEmbeddingProvider:
+    """Tests for the deterministic hash embeddings"""
+
+    def test_embeddings_are_deterministic_and_normalized(self):
+        """Test that the same text always maps to the same unit vector"""
+        provider = HashEmbeddingProvider(dimension=64)
+        first = provider.embed(["the quick brown fox", ""])
+        second = HashEmbeddingProvider(dimension=64).embed(["the quick brown fox", ""])
+
+        assert first.shape == (2, 64)
+        assert first.dtype == np.float32
+        np.testing.assert_array_equal(first, second)
+        assert np.linalg.norm(first[0]) == pytest.approx(1.0)
+        assert not first[1].any()
+
+
+class TestVectorIndex:
+    """Tests for VectorIndex"""
+
+    def test_top_k_indices_orders_best_first(self):
+        """Test partial-sort top-k selection"""
+        scores = np.array([0.1, 0.9, 0.5, 0.7])
+        assert top_k_indices(scores, 2).tolist() == [1, 3]
+        assert top_k_indices(scores, 10).tolist() == [1, 3, 2, 0]
+        assert top_k_indices(scores, 0).tolist() == []
+
+    def test_search_returns_most_similar_items(self):
+        """Test that search ranks items by cosine similarity"""
+        index = VectorIndex(initial_capacity=2)
+        index.add_batch(
+            [1, 2, 3],
+            [
+                {"input": "How do I bake bread?", "response": "Use flour and yeast."},
+                {"input": "What is the weather today?", "response": "Sunny."},
+                {"content": "Sourdough bread needs a starter."},
+            ],
+        )
+
+        results = index.search("fresh bread", k=2)
+
+        assert len(index) == 3
+        assert {item_id for item_id, _ in results} == {1, 3}
+        assert results[0][1] >= results[1][1]
+
+    def test_remove_keeps_rows_dense(self):
+        """Test that removal moves the last row into the freed slot"""
+        index = VectorIndex()
+        index.add_batch([10, 20, 30], [{"content": "alpha"}, {"content": "beta"}, {"content": "gamma"}])
+
+        assert index.remove(10) is True
+        assert index.remove(10) is False
+        assert len(index) == 2
+        assert sorted(index.ids.tolist()) == [20, 30]
+        assert index.search("gamma", k=1)[0][0] == 30
+        assert index.search("alpha", k=1) == []
+
+    @pytest.mark.parametrize("factory", [
+        lambda embedder: VectorIndex(embedder),
+        lambda embedder: QuantizedVectorIndex(embedder, storage="int8"),
+        lambda embedder: IVFIndex(embedder, n_lists=4, train_threshold=8),
+        lambda embedder: WeightedVectorIndex(embedder, recency_weight=0.0, importance_weight=0.0),
+    ])
+    def test_search_restricted_to_candidates(self, factory):
+        """Test that only candidate ids are scored, across both segments"""
+        embedder = HashEmbeddingProvider(dimension=64)
+        texts = [f"report number {i}" for i in range(40)]
+        index = factory(embedder)
+        if isinstance(index, VectorIndex) and not isinstance(index, QuantizedVectorIndex):
+            index.attach_base(np.arange(100, 120), embedder.embed(texts[20:]))
+            index.add_vectors(list(range(20)), embedder.embed(texts[:20]))
+            candidates = {3, 7, 105, 999}
+        else:
+            index.add_vectors(list(range(40)), embedder.embed(texts))
+            candidates = {3, 7, 25, 999}
+
+        results = index.search("report number 7", k=2, candidates=candidates)
+
+        assert results[0][0] == 7
+        assert {item_id for item_id, _ in results} <= candidates
+        assert index.search("report", k=5, candidates=set()) == []
+
+
+class TestWeightedVectorIndex:
+    """Tests for recency and importance weighted ranking"""
+
+    class Clock:
+        def __init__(self, now=1000.0):
+            self.now = now
+
+        def __call__(self):
+            return self.now
+
+    def test_recency_and_importance_break_similarity_ties(self):
+        """Test that newer and more important items rank first among equals"""
+        clock = self.Clock()
+        index = WeightedVectorIndex(half_life=100.0, clock=clock)
+        index.add_batch([1, 2, 3], [
+            {"input": "weekly status meeting", "timestamp": 700.0},
+            {"input": "weekly status meeting", "timestamp": 1000.0},
+            {"input": "weekly status meeting", "timestamp": 700.0, "importance": 1.0},
+        ])
+
+        results = index.search("weekly status meeting", k=3)
+
+        assert [item_id for item_id, _ in results] == [3, 2, 1]
+        assert results[1][1] == pytest.approx(1.0 + 0.5, abs=1e-5)
+        assert results[2][1] == pytest.approx(1.0 + 0.5 * 0.125, abs=1e-5)
+        assert index.search("unrelated words", k=3) == []
+
+    def test_decay_advances_without_recomputing_rows(self):
+        """Test that scores follow the clock across rebases and row moves"""
+        clock = self.Clock()
+        index = WeightedVectorIndex(half_life=100.0, recency_weight=1.0, clock=clock)
+        index.add_batch([1, 2], [
+            {"input": "garden notes", "timestamp": 1000.0},
+            {"input": "garden notes", "timestamp": 900.0},
+        ])
+        index.remove(1)
+        index.add_batch([3], [{"input": "garden notes", "timestamp": 1000.0}])
+
+        clock.now = 1050.0
+        early = dict(index.search("garden notes", k=2))
+        clock.now = 1300.0
+        late = dict(index.search("garden notes", k=2))
+
+        assert early[3] - 1.0 == pytest.approx(0.5 ** 0.5, abs=1e-5)
+        assert early[2] - 1.0 == pytest.approx(0.5 ** 1.5, abs=1e-5)
+        assert late[3] - 1.0 == pytest.approx(0.5 ** 3, abs=1e-5)
+        assert late[2] - 1.0 == pytest.approx(0.5 ** 4, abs=1e-5)
+
+    @pytest.mark.asyncio
+    async def test_memory_manager_warm_start_keeps_weights(self, tmp_path):
+        """Test that long-term items attached as a base segment keep their weights"""
+        clock = self.Clock()
+        memory = MemoryManager(
+            index=WeightedVectorIndex(clock=clock),
+            short_term_capacity=1,
+            consolidation_batch_size=1,
+            long_term_store=PersistentLongTermStore(str(tmp_path)),
+        )
+        await memory.store({"input": "tax filing", "timestamp": 0.0})
+        await memory.store({"input": "tax filing reminder", "timestamp": 1000.0, "importance": 1.0})
+        await memory.store({"input": "unrelated"})
+        await memory.aclose()
+
+        restarted = MemoryManager(
+            index=WeightedVectorIndex(clock=clock),
+            long_term_store=PersistentLongTermStore(str(tmp_path)),
+        )
+        relevant = await restarted.retrieve_relevant("tax filing", k=1)
+
+        assert relevant[0]["timestamp"] == 1000.0
+
+
+class TestQuantizedVectorIndex:
+    """Tests for QuantizedVectorIndex"""
+
+    def test_quantize_int8_round_trip(self):
+        """Test that int8 codes with per-vector scales approximate the input"""
+        vectors = np.random.default_rng(0).normal(size=(20, 16)).astype(np.float32)
+        vectors[3] = 0.0
+
+        codes, scales = quantize_int8(vectors)
+
+        assert codes.dtype == np.int8
+        np.testing.assert_allclose(dequantize_int8(codes, scales), vectors, atol=0.02)
+
+    @pytest.mark.parametrize("storage", ["float16", "int8"])
+    def test_quantized_search_matches_exact_top_result(self, storage):
+        """Test that quantized scoring finds the same best match"""
+        items = [{"content": f"note {i} regarding subject{i % 7}"} for i in range(50)]
+        exact = VectorIndex()
+        exact.add_batch(list(range(50)), items)
+        quantized = QuantizedVectorIndex(storage=storage, initial_capacity=8, block_size=16)
+        quantized.add_batch(list(range(50)), items)
+
+        assert quantized.search("subject3", k=1)[0][0] in {i for i in range(50) if i % 7 == 3}
+        assert quantized.remove(0) is True
+        assert len(quantized) == 49
+        assert quantized.nbytes < exact.vectors.nbytes
+
+    def test_rerank_uses_exact_scores(self):
+        """Test that re-ranking rescores candidates from their text"""
+        texts = {1: "red apple", 2: "green apple pie", 3: "blue sky"}
+        index = QuantizedVectorIndex(rerank=3, text_lookup=texts.get)
+        index.add_batch(list(texts), [{"content": text} for text in texts.values()])
+
+        results = index.search("red apple", k=2)
+
+        assert results[0][0] == 1
+        assert results[0][1] == pytest.approx(1.0, abs=1e-5)
+
+    def test_rerank_from_exact_file_skips_reembedding(self, tmp_path):
+        """Test that re-ranking reads exact rows from exact_path instead of embedding texts"""
+        embedder = CountingEmbedder(dimension=32)
+        texts = [f"note {i} about topic{i % 5}" for i in range(40)]
+        index = QuantizedVectorIndex(
+            embedder, rerank=10, initial_capacity=2, exact_path=str(tmp_path / "exact.f32")
+        )
+        index.add_batch(list(range(40)), [{"content": text} for text in texts])
+        assert index.remove(0)
+        embedder.calls = 0
+
+        results = index.search("note 7 about topic2", k=3)
+
+        assert embedder.calls == 1
+        assert results[0][0] == 7
+        assert results[0][1] == pytest.approx(1.0, abs=1e-5)
+        np.testing.assert_array_equal(index.vectors_for([39]), embedder.embed([texts[39]]))
+
+
+class TestIVFIndex:
+    """Tests for the inverted-file ANN index"""
+
+    @staticmethod
+    def _clustered_vectors(n, dimension=16, clusters=8, seed=0):
+        rng = np.random.default_rng(seed)
+        centers = rng.normal(size=(clusters, dimension))
+        vectors = centers[rng.integers(0, clusters, size=n)] + 0.1 * rng.normal(size=(n, dimension))
+        return (vectors / np.linalg.norm(vectors, axis=1, keepdims=True)).astype(np.float32)
+
+    def test_trained_index_matches_exact_search(self):
+        """Test that probing a few lists finds the exact nearest neighbours"""
+        vectors = self._clustered_vectors(400)
+        index = IVFIndex(HashEmbeddingProvider(dimension=16), n_lists=8, nprobe=3, train_threshold=100)
+        index.add_vectors(list(range(200)), vectors[:200])
+        assert index.needs_maintenance()
+
+        index.recluster()
+        index.add_vectors(list(range(200, 400)), vectors[200:])
+
+        assert index.is_trained
+        assert len(index) == 400
+        query = vectors[123]
+        exact = np.argsort(vectors @ query)[::-1][:5].tolist()
+        assert [item_id for item_id, _ in index.search_vector(query, 5)] == exact
+        assert index.remove(123) is True
+        assert 123 not in {item_id for item_id, _ in index.search_vector(query, 5)}
+
+    @pytest.mark.asyncio
+    async def test_background_maintenance_replays_concurrent_changes(self):
+        """Test that inserts made during re-clustering are kept"""
+        vectors = self._clustered_vectors(300)
+        index = IVFIndex(HashEmbeddingProvider(dimension=16), n_lists=4, nprobe=4, train_threshold=100)
+        index.add_vectors(list(range(200)), vectors[:200])
+
+        maintenance = asyncio.ensure_future(index.maintain())
+        await asyncio.sleep(0)
+        index.add_vectors(list(range(200, 300)), vectors[200:])
+        index.remove(0)
+        await maintenance
+
+        assert index.is_trained
+        assert len(index) == 299
+        assert index.search_vector(vectors[250], 1)[0][0] == 250
+        assert not index.needs_maintenance()